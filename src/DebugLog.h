@@ -4,10 +4,13 @@
 
 #pragma once
 #include <stdio.h>
+#include <string>
 
 extern bool g_debug;
 extern std::string g_logFile;
 
+#if defined(RENDERER_PROCESS)
+
 // Defined as "inline" to get rid of the "already defined" errors
 // when linking.
 inline void DebugLog(const char* szString)
@@ -22,3 +25,59 @@ inline void DebugLog(const char* szString)
         fclose(pFile);
     }
 }
+
+#else
+
+// In the Browser process messages are kept in a bounded in-memory
+// buffer, the background log flusher thread in Python drains it with
+// DrainDebugLog() and writes the messages to the console, the log
+// file or Python's logging, see log_buffer.pyx. When the buffer is
+// full the oldest messages are dropped.
+
+#include <deque>
+#include <vector>
+#include "include/base/cef_lock.h"
+
+const size_t kDebugLogBufferSize = 10000;
+
+struct DebugLogBuffer {
+    base::Lock lock;
+    std::deque<std::string> messages;
+    size_t dropped;
+    DebugLogBuffer() : dropped(0) {}
+};
+
+inline DebugLogBuffer& GetDebugLogBuffer()
+{
+    static DebugLogBuffer buffer;
+    return buffer;
+}
+
+inline void DebugLog(const char* szString)
+{
+    if (!g_debug)
+        return;
+    DebugLogBuffer& buffer = GetDebugLogBuffer();
+    base::AutoLock lock_scope(buffer.lock);
+    if (buffer.messages.size() >= kDebugLogBufferSize) {
+        buffer.messages.pop_front();
+        buffer.dropped++;
+    }
+    buffer.messages.push_back(szString);
+}
+
+// Moves all buffered messages to "messages", returns the number
+// of messages dropped since the previous call.
+inline size_t DrainDebugLog(std::vector<std::string>& messages)
+{
+    DebugLogBuffer& buffer = GetDebugLogBuffer();
+    base::AutoLock lock_scope(buffer.lock);
+    messages.insert(messages.end(), buffer.messages.begin(),
+                    buffer.messages.end());
+    buffer.messages.clear();
+    size_t dropped = buffer.dropped;
+    buffer.dropped = 0;
+    return dropped;
+}
+
+#endif
@@ -13,11 +13,121 @@ MOUSEBUTTON_LEFT = cef_types.MBT_LEFT
 MOUSEBUTTON_MIDDLE = cef_types.MBT_MIDDLE
 MOUSEBUTTON_RIGHT = cef_types.MBT_RIGHT
 
+# Client callbacks are kept in PyBrowser.clientCallbackSlots, indexed
+# by the CB_* constants, so that event handlers read them directly
+# instead of looking them up by name on each event. The order of
+# g_clientCallbackNames must match the order of the constants.
+cdef enum:
+    # DisplayHandler
+    CB_OnAddressChange
+    CB_OnTitleChange
+    CB_OnTooltip
+    CB_OnStatusMessage
+    CB_OnConsoleMessage
+    # KeyboardHandler
+    CB_OnPreKeyEvent
+    CB_OnKeyEvent
+    # RequestHandler
+    CB_OnBeforeResourceLoad
+    CB_OnResourceRedirect
+    CB_GetAuthCredentials
+    CB_OnQuotaRequest
+    CB_OnProtocolExecution
+    CB_GetResourceHandler
+    CB_OnBeforeBrowse
+    CB_OnRendererProcessTerminated
+    CB_OnPluginCrashed
+    # RequestContextHandler
+    CB_GetCookieManager
+    # LoadHandler
+    CB_OnLoadingStateChange
+    CB_OnLoadStart
+    CB_OnLoadEnd
+    CB_OnLoadError
+    # LifespanHandler
+    CB_OnBeforePopup
+    CB_DoClose
+    CB_OnBeforeClose
+    # RenderHandler
+    CB_GetRootScreenRect
+    CB_GetViewRect
+    CB_GetScreenRect
+    CB_GetScreenPoint
+    CB_GetScreenInfo
+    CB_OnPopupShow
+    CB_OnPopupSize
+    CB_OnPaint
+    CB_OnCursorChange
+    CB_OnScrollOffsetChanged
+    # JavascriptDialogHandler
+    CB_OnJavascriptDialog
+    CB_OnBeforeUnloadJavascriptDialog
+    CB_OnResetJavascriptDialogState
+    CB_OnJavascriptDialogClosed
+    # V8ContextHandler
+    CB_OnContextCreated
+    CB_OnContextReleased
+    # NetworkIdle, see network_idle.pyx
+    CB_OnNetworkIdle
+    CB_COUNT
+
+cdef tuple g_clientCallbackNames = (
+        # DisplayHandler
+        "OnAddressChange", "OnTitleChange", "OnTooltip", "OnStatusMessage",
+        "OnConsoleMessage",
+        # KeyboardHandler
+        "OnPreKeyEvent", "OnKeyEvent",
+        # RequestHandler
+        "OnBeforeResourceLoad", "OnResourceRedirect", "GetAuthCredentials",
+        "OnQuotaRequest", "OnProtocolExecution", "GetResourceHandler",
+        "OnBeforeBrowse", "OnRendererProcessTerminated", "OnPluginCrashed",
+        # RequestContextHandler
+        "GetCookieManager",
+        # LoadHandler
+        "OnLoadingStateChange", "OnLoadStart", "OnLoadEnd", "OnLoadError",
+        # LifespanHandler
+        "OnBeforePopup", "DoClose", "OnBeforeClose",
+        # RenderHandler
+        "GetRootScreenRect", "GetViewRect", "GetScreenRect", "GetScreenPoint",
+        "GetScreenInfo", "OnPopupShow", "OnPopupSize", "OnPaint",
+        "OnCursorChange", "OnScrollOffsetChanged",
+        # JavascriptDialogHandler
+        "OnJavascriptDialog", "OnBeforeUnloadJavascriptDialog",
+        "OnResetJavascriptDialogState", "OnJavascriptDialogClosed",
+        # V8ContextHandler
+        "OnContextCreated", "OnContextReleased",
+        # NetworkIdle
+        "OnNetworkIdle"
+)
+
+assert len(g_clientCallbackNames) == CB_COUNT, (
+        "g_clientCallbackNames does not match the CB_* constants")
+
+# Callback name -> slot index.
+cdef dict g_clientCallbackSlots = dict(
+        (name, index) for index, name in enumerate(g_clientCallbackNames))
+
+# Callbacks that can be set using Browser.SetClientCallback().
+# NOTE: OnCertificateError, OnBeforePluginLoad and OnAfterCreated are not
+#       included as they must be set using cefpython.SetGlobalClientCallback().
+cdef frozenset g_allowedClientCallbacks = frozenset(g_clientCallbackNames) \
+        - frozenset(["GetScreenRect", "OnContextCreated", "OnContextReleased"])
+
 # If you try to keep PyBrowser() objects inside cpp_vector you will
 # get segmentation faults, as they will be garbage collected.
 
 cdef dict g_pyBrowsers = {}
 
+# Secondary indexes, so that looking up a browser never requires
+# scanning all browsers. Maintained by GetPyBrowser(),
+# IndexPyBrowser() and RemovePyBrowser().
+# window handle -> browserId
+cdef dict g_pyBrowsersByWindowHandle = {}
+# outer window handle passed to CreateBrowserSync() -> browserId
+cdef dict g_pyBrowsersByOuterWindowHandle = {}
+# browserId -> (window handle, outer window handle)
+cdef dict g_pyBrowserWindowHandles = {}
+
 cdef PyBrowser GetPyBrowserById(int browserId):
     if browserId in g_pyBrowsers:
         return g_pyBrowsers[browserId]
@@ -32,24 +142,20 @@ cdef PyBrowser GetPyBrowser(CefRefPtr[CefBrowser] cefBrowser):
 
     cdef PyBrowser pyBrowser
     cdef int browserId
-    cdef int identifier
 
     browserId = cefBrowser.get().GetIdentifier()
     if browserId in g_pyBrowsers:
         return g_pyBrowsers[browserId]
 
-    for identifier, pyBrowser in g_pyBrowsers.items():
-        if not pyBrowser.cefBrowser.get():
-            # noinspection PyUnresolvedReferences
-            Debug("GetPyBrowser(): removing an empty CefBrowser reference, "
-                  "browserId=%s" % identifier)
-            del g_pyBrowsers[identifier]
+    # Browsers are removed from g_pyBrowsers in RemovePyBrowser(),
+    # called from LifespanHandler_OnBeforeClose().
 
     # noinspection PyUnresolvedReferences
     Debug("GetPyBrowser(): creating new PyBrowser, browserId=%s" % browserId)
     pyBrowser = PyBrowser()
     pyBrowser.cefBrowser = cefBrowser
     g_pyBrowsers[browserId] = pyBrowser
+    IndexPyBrowser(pyBrowser)
 
     # Inherit client callbacks and javascript bindings
     # from parent browser.
@@ -63,25 +169,62 @@ cdef PyBrowser GetPyBrowser(CefRefPtr[CefBrowser] cefBrowser):
     # Popups inherit javascript bindings only when "bindToPopups"
     # constructor param was set to True.
 
-    cdef WindowHandle openerHandle
     cdef dict clientCallbacks
     cdef JavascriptBindings javascriptBindings
-    cdef PyBrowser tempPyBrowser
+    cdef PyBrowser openerPyBrowser
 
     if pyBrowser.IsPopup() and \
             not pyBrowser.GetUserData("__outerWindowHandle"):
-        openerHandle = pyBrowser.GetOpenerWindowHandle()
-        for identifier, tempPyBrowser in g_pyBrowsers.items():
-            if tempPyBrowser.GetWindowHandle() == openerHandle:
-                clientCallbacks = tempPyBrowser.GetClientCallbacksDict()
-                if clientCallbacks:
-                    pyBrowser.SetClientCallbacksDict(clientCallbacks)
-                javascriptBindings = tempPyBrowser.GetJavascriptBindings()
-                if javascriptBindings:
-                    if javascriptBindings.GetBindToPopups():
-                        pyBrowser.SetJavascriptBindings(javascriptBindings)
+        openerPyBrowser = GetPyBrowserByWindowHandle(
+                pyBrowser.GetOpenerWindowHandle(), False)
+        if openerPyBrowser:
+            clientCallbacks = openerPyBrowser.GetClientCallbacksDict()
+            if clientCallbacks:
+                # A copy, the slots of each browser must match its dict.
+                pyBrowser.SetClientCallbacksDict(dict(clientCallbacks))
+            javascriptBindings = openerPyBrowser.GetJavascriptBindings()
+            if javascriptBindings:
+                if javascriptBindings.GetBindToPopups():
+                    pyBrowser.SetJavascriptBindings(javascriptBindings)
     return pyBrowser
 
+cdef void IndexPyBrowser(PyBrowser pyBrowser,
+        WindowHandle outerWindowHandle=0) except *:
+    # Called when the browser is created, again from
+    # LifespanHandler_OnAfterCreated() when the window handle is known,
+    # and from CreateBrowserSync() with the outer window handle.
+    cdef int browserId = pyBrowser.GetIdentifier()
+    cdef WindowHandle windowHandle = pyBrowser.GetWindowHandle()
+    cdef tuple handles = g_pyBrowserWindowHandles.get(browserId, (0, 0))
+    if not outerWindowHandle:
+        outerWindowHandle = handles[1]
+    if handles == (windowHandle, outerWindowHandle):
+        return
+    UnindexPyBrowser(browserId)
+    if windowHandle:
+        g_pyBrowsersByWindowHandle[windowHandle] = browserId
+    if outerWindowHandle:
+        g_pyBrowsersByOuterWindowHandle[outerWindowHandle] = browserId
+    g_pyBrowserWindowHandles[browserId] = (windowHandle, outerWindowHandle)
+
+cdef void UnindexPyBrowser(int browserId) except *:
+    cdef tuple handles = g_pyBrowserWindowHandles.pop(browserId, None)
+    if not handles:
+        return
+    if g_pyBrowsersByWindowHandle.get(handles[0]) == browserId:
+        del g_pyBrowsersByWindowHandle[handles[0]]
+    if g_pyBrowsersByOuterWindowHandle.get(handles[1]) == browserId:
+        del g_pyBrowsersByOuterWindowHandle[handles[1]]
+
+cdef PyBrowser GetPyBrowserByWindowHandle(WindowHandle windowHandle,
+        py_bool outer=True):
+    cdef object browserId = g_pyBrowsersByWindowHandle.get(windowHandle)
+    if browserId is None and outer:
+        browserId = g_pyBrowsersByOuterWindowHandle.get(windowHandle)
+    if browserId is None:
+        return None
+    return g_pyBrowsers.get(browserId)
+
 cdef void RemovePyBrowser(int browserId) except *:
     # Called from LifespanHandler_OnBeforeClose().
     global g_pyBrowsers
@@ -96,19 +239,74 @@ cdef void RemovePyBrowser(int browserId) except *:
         # noinspection PyUnresolvedReferences
         Debug("del g_pyBrowsers[%s]" % browserId)
         del g_pyBrowsers[browserId]
+        UnindexPyBrowser(browserId)
     else:
         # noinspection PyUnresolvedReferences
         Debug("RemovePyBrowser() FAILED: browser not found, id = %s" \
                 % browserId)
 
 cpdef PyBrowser GetBrowserByWindowHandle(WindowHandle windowHandle):
+    return GetPyBrowserByWindowHandle(windowHandle, True)
+
+def Broadcast(object browsers, py_string funcName, *args,
+        py_string frames="main"):
+    # Arguments are serialized only once, the same code is then
+    # executed in every target frame.
+    if not IsThread(TID_UI) and IsMultiThreadedMessageLoop():
+        return CallOnUiThread("Broadcast()",
+                functools.partial(Broadcast, frames=frames),
+                (browsers, funcName) + args)
+    assert IsThread(TID_UI), (
+            "cefpython.Broadcast() may only be called on the UI thread")
+    if frames != "main" and frames != "all":
+        raise Exception("Broadcast() failed: invalid frames argument: %s" \
+                % frames)
+    cdef CefString cefCode = PyToCefStringValue(
+            GetJavascriptFunctionCall(funcName, args))
+    cdef cpp_bool allFrames = (frames == "all")
+    cdef dict status = {}
     cdef PyBrowser pyBrowser
-    for browserId in g_pyBrowsers:
-        pyBrowser = g_pyBrowsers[browserId]
-        if (pyBrowser.GetWindowHandle() == windowHandle or
-                pyBrowser.GetUserData("__outerWindowHandle") == long(windowHandle)):
-            return pyBrowser
-    return None
+    if callable(browsers):
+        browsers = [browser for browser in g_pyBrowsers.values()
+                    if browsers(browser)]
+    for pyBrowser in browsers:
+        BroadcastToBrowser(pyBrowser, cefCode, allFrames, status)
+    ScheduleMessagePumpWork()
+    return status
+
+cdef void BroadcastToBrowser(PyBrowser pyBrowser, CefString& cefCode,
+        cpp_bool allFrames, dict status) except *:
+    # status: browser -> list of frame identifiers the code was
+    # executed in, empty when the browser was destroyed.
+    cdef CefString cefScriptUrl
+    cdef CefRefPtr[CefBrowser] cefBrowser = pyBrowser.cefBrowser
+    cdef cpp_vector[CefRefPtr[CefFrame]] cefFrames
+    cdef cpp_vector[CefString] cefNames
+    cdef cpp_vector[CefString].iterator iterator
+    cdef CefRefPtr[CefFrame] cefFrame
+    cdef list frameIds = []
+    cdef size_t i
+    status[pyBrowser] = frameIds
+    if <void*>cefBrowser == NULL or not cefBrowser.get():
+        return
+    # Main frame is not returned by GetFrameNames(), see
+    # CefPythonApp::DoJavascriptBindingsForBrowser().
+    cefFrames.push_back(cefBrowser.get().GetMainFrame())
+    if allFrames:
+        cefBrowser.get().GetFrameNames(cefNames)
+        iterator = cefNames.begin()
+        while iterator != cefNames.end():
+            cefFrames.push_back(cefBrowser.get().GetFrame(deref(iterator)))
+            preinc(iterator)
+    for i in range(cefFrames.size()):
+        cefFrame = cefFrames[i]
+        if not cefFrame.get() or not cefFrame.get().IsValid():
+            continue
+        frameId = cefFrame.get().GetIdentifier()
+        if frameId in frameIds:
+            continue
+        cefFrame.get().ExecuteJavaScript(cefCode, cefScriptUrl, 0)
+        frameIds.append(frameId)
 
 cdef public void PyBrowser_ShowDevTools(CefRefPtr[CefBrowser] cefBrowser
         ) except * with gil:
@@ -127,9 +325,11 @@ cdef class PyBrowser:
     cdef CefRefPtr[CefBrowser] cefBrowser
 
     cdef public dict clientCallbacks
-    cdef public list allowedClientCallbacks
+    # Slot index (CB_* constants) -> callback.
+    cdef list clientCallbackSlots
     cdef public JavascriptBindings javascriptBindings
     cdef public dict userData
+    cdef list userScripts
 
     # Properties used by ToggleFullscreen().
     cdef public int isFullscreen
@@ -140,6 +340,18 @@ cdef class PyBrowser:
 
     # C-level attributes are initialized to 0 automatically.
     cdef void* imageBuffer
+    # Sent by the Renderer process, see ProcessMonitor_OnBrowserCreated().
+    cdef int rendererProcessId
+    # Background throttling state, see throttling.pyx.
+    cdef double lastActivity
+    cdef int throttleState
+    cdef int unthrottledFrameRate
+    cdef py_bool hiddenByApp
+    cdef py_bool unthrottlePending
+    # None when adaptive frame rate is disabled, see frame_pacing.pyx.
+    cdef FramePacer framePacer
+    # Options of the OnNetworkIdle callback, see network_idle.pyx.
+    cdef NetworkIdleWatch networkIdleWatch
 
     cdef CefRefPtr[CefBrowser] GetCefBrowser(self) except *:
         if <void*>self.cefBrowser != NULL and self.cefBrowser.get():
@@ -158,71 +370,45 @@ cdef class PyBrowser:
 
     def __init__(self):
         self.clientCallbacks = {}
-        self.allowedClientCallbacks = []
+        self.clientCallbackSlots = [None] * CB_COUNT
         self.userData = {}
+        self.userScripts = []
 
     def __dealloc__(self):
         if self.imageBuffer:
             free(self.imageBuffer)
 
     cpdef py_void SetClientCallback(self, py_string name, object callback):
-        if not self.allowedClientCallbacks:
-            # DisplayHandler
-            self.allowedClientCallbacks += [
-                    "OnAddressChange", "OnTitleChange", "OnTooltip",
-                    "OnStatusMessage", "OnConsoleMessage"]
-            # KeyboardHandler
-            self.allowedClientCallbacks += ["OnPreKeyEvent", "OnKeyEvent"]
-            # RequestHandler
-            # NOTE: OnCertificateError and OnBeforePluginLoad are not
-            #       included as they must be set using
-            #       cefpython.SetGlobalClientCallback().
-            self.allowedClientCallbacks += ["OnBeforeResourceLoad",
-                    "OnResourceRedirect", "GetAuthCredentials",
-                    "OnQuotaRequest", "OnProtocolExecution",
-                    "GetResourceHandler",
-                    "OnBeforeBrowse", "OnRendererProcessTerminated",
-                    "OnPluginCrashed"]
-            # RequestContextHandler
-            self.allowedClientCallbacks += ["GetCookieManager"]
-            # LoadHandler
-            self.allowedClientCallbacks += ["OnLoadingStateChange",
-                    "OnLoadStart", "OnLoadEnd", "OnLoadError"]
-            # LifespanHandler
-            # NOTE: OnAfterCreated not included as it must be set using
-            #       cefpython.SetGlobalClientCallback().
-            self.allowedClientCallbacks += ["OnBeforePopup",
-                    "DoClose", "OnBeforeClose"]
-            # RenderHandler
-            self.allowedClientCallbacks += ["GetRootScreenRect",
-                    "GetViewRect", "GetScreenPoint", "GetScreenInfo",
-                    "OnPopupShow", "OnPopupSize", "OnPaint", "OnCursorChange",
-                    "OnScrollOffsetChanged"]
-            # JavascriptDialogHandler
-            self.allowedClientCallbacks += ["OnJavascriptDialog",
-                    "OnBeforeUnloadJavascriptDialog",
-                    "OnResetJavascriptDialogState",
-                    "OnJavascriptDialogClosed"]
-
-        if name not in self.allowedClientCallbacks:
+        if name not in g_allowedClientCallbacks:
             raise Exception("Browser.SetClientCallback() failed: unknown "
                             "callback: %s" % name)
         self.clientCallbacks[name] = callback
+        self.clientCallbackSlots[g_clientCallbackSlots[name]] = \
+                ProfileCallback(callback, name)
+        if name == "OnNetworkIdle" and callback:
+            ScheduleNetworkIdleCheck()
 
     cpdef py_void SetClientHandler(self, object clientHandler):
         if not hasattr(clientHandler, "__class__"):
             raise Exception("Browser.SetClientHandler() failed: __class__ "
                             "attribute missing")
-        cdef dict methods = {}
-        cdef py_string key
+        # Only the known callback names are looked up, the handler's
+        # other members are not inspected.
+        cdef py_string name
         cdef object method
-        cdef tuple value
-        for value in inspect.getmembers(clientHandler,
-                predicate=inspect.ismethod):
-            key = value[0]
-            method = value[1]
-            if key and key[0] != '_':
-                self.SetClientCallback(key, method)
+        for name in g_clientCallbackNames:
+            if name not in g_allowedClientCallbacks:
+                continue
+            method = getattr(clientHandler, name, None)
+            if method is not None and callable(method):
+                self.SetClientCallback(name, method)
+
+    property allowedClientCallbacks:
+        # Deprecated, kept for backward compatibility. Names of the
+        # callbacks that can be set with SetClientCallback().
+        def __get__(self):
+            return [name for name in g_clientCallbackNames
+                    if name in g_allowedClientCallbacks]
 
     cpdef object GetClientCallback(self, py_string name):
         if name in self.clientCallbacks:
@@ -230,25 +416,72 @@ cdef class PyBrowser:
 
     cpdef py_void SetClientCallbacksDict(self, dict clientCallbacks):
         self.clientCallbacks = clientCallbacks
+        self.clientCallbackSlots = [None] * CB_COUNT
+        for name, callback in clientCallbacks.items():
+            if name in g_clientCallbackSlots:
+                self.clientCallbackSlots[g_clientCallbackSlots[name]] = \
+                        ProfileCallback(callback, name)
+        if self.clientCallbackSlots[CB_OnNetworkIdle]:
+            ScheduleNetworkIdleCheck()
 
     cpdef dict GetClientCallbacksDict(self):
         return self.clientCallbacks
 
     cpdef py_void SetJavascriptBindings(self, JavascriptBindings bindings):
+        if ShouldCallOnUiThread():
+            return CallOnUiThread("Browser.SetJavascriptBindings()",
+                    self.SetJavascriptBindings, (bindings,))
         self.javascriptBindings = bindings
         self.javascriptBindings.Rebind()
 
     cpdef JavascriptBindings GetJavascriptBindings(self):
         return self.javascriptBindings
 
+    cpdef py_void AddUserScript(self, py_string source,
+            py_string runAt="context_created", py_string frames="main",
+            py_string urlFilter=""):
+        if ShouldCallOnUiThread():
+            return CallOnUiThread("Browser.AddUserScript()",
+                    self.AddUserScript, (source, runAt, frames, urlFilter))
+        if runAt != "context_created" and runAt != "document_end":
+            raise Exception("Browser.AddUserScript() failed: invalid "
+                    "runAt: %s" % runAt)
+        if frames != "main" and frames != "all":
+            raise Exception("Browser.AddUserScript() failed: invalid "
+                    "frames: %s" % frames)
+        self.userScripts.append({
+                "source": source,
+                "runAt": runAt,
+                "frames": frames,
+                "urlFilter": urlFilter})
+        self.SendUserScripts()
+
+    cpdef py_void ClearUserScripts(self):
+        if ShouldCallOnUiThread():
+            return CallOnUiThread("Browser.ClearUserScripts()",
+                    self.ClearUserScripts, ())
+        self.userScripts = []
+        self.SendUserScripts()
+
+    cdef void SendUserScripts(self) except *:
+        # All scripts are sent each time, the Renderer process keeps
+        # them and runs them in CefPythonApp::OnContextCreated().
+        self.SendProcessMessage(cef_types.PID_RENDERER, 0,
+                "SetUserScripts", [self.userScripts])
+
     # --------------
     # CEF API.
     # --------------
 
     cpdef py_bool CanGoBack(self):
+        if ShouldCallOnUiThread():
+            return CallOnUiThread("Browser.CanGoBack()", self.CanGoBack, ())
         return self.GetCefBrowser().get().CanGoBack()
 
     cpdef py_bool CanGoForward(self):
+        if ShouldCallOnUiThread():
+            return CallOnUiThread("Browser.CanGoForward()",
+                    self.CanGoForward, ())
         return self.GetCefBrowser().get().CanGoForward()
 
     cpdef py_void ParentWindowWillClose(self):
@@ -256,6 +489,9 @@ cdef class PyBrowser:
         pass
 
     cpdef py_void CloseBrowser(self, py_bool forceClose=False):
+        if ShouldCallOnUiThread():
+            return CallOnUiThread("Browser.CloseBrowser()",
+                    self.CloseBrowser, (forceClose,))
         if len(g_pyBrowsers) == 1:
             # This is the last browser remaining.
             if g_sharedRequestContext.get():
@@ -267,6 +503,9 @@ cdef class PyBrowser:
         self.GetCefBrowserHost().get().CloseBrowser(bool(forceClose))
 
     cpdef py_void CloseDevTools(self):
+        if ShouldCallOnUiThread():
+            return CallOnUiThread("Browser.CloseDevTools()",
+                    self.CloseDevTools, ())
         self.GetCefBrowserHost().get().CloseDevTools()
 
     def ExecuteFunction(self, *args):
@@ -279,17 +518,27 @@ cdef class PyBrowser:
     cpdef py_void Find(self, int searchId, py_string searchText,
                        py_bool forward, py_bool matchCase,
                        py_bool findNext):
+        if ShouldCallOnUiThread():
+            return CallOnUiThread("Browser.Find()",
+                    self.Find,
+                    (searchId, searchText, forward, matchCase, findNext))
         cdef CefString cefSearchText
         PyToCefString(searchText, cefSearchText)
         self.GetCefBrowserHost().get().Find(searchId, cefSearchText,
                 bool(forward), bool(matchCase), bool(findNext))
 
     cpdef PyFrame GetFocusedFrame(self):
+        if not IsThread(TID_UI) and IsMultiThreadedMessageLoop():
+            return CallOnUiThread("Browser.GetFocusedFrame()",
+                    self.GetFocusedFrame, ())
         assert IsThread(TID_UI), (
                 "Browser.GetFocusedFrame() may only be called on UI thread")
         return GetPyFrame(self.GetCefBrowser().get().GetFocusedFrame())
 
     cpdef PyFrame GetFrame(self, py_string name):
+        if not IsThread(TID_UI) and IsMultiThreadedMessageLoop():
+            return CallOnUiThread("Browser.GetFrame()", self.GetFrame,
+                    (name,))
         assert IsThread(TID_UI), (
                 "Browser.GetFrame() may only be called on the UI thread")
         cdef CefString cefName
@@ -297,10 +546,16 @@ cdef class PyBrowser:
         return GetPyFrame(self.GetCefBrowser().get().GetFrame(cefName))
 
     cpdef object GetFrameByIdentifier(self, object identifier):
+        if ShouldCallOnUiThread():
+            return CallOnUiThread("Browser.GetFrameByIdentifier()",
+                    self.GetFrameByIdentifier, (identifier,))
         return GetPyFrame(self.GetCefBrowser().get().GetFrame(
                 <long long>long(identifier)))
 
     cpdef list GetFrameNames(self):
+        if not IsThread(TID_UI) and IsMultiThreadedMessageLoop():
+            return CallOnUiThread("Browser.GetFrameNames()",
+                    self.GetFrameNames, ())
         assert IsThread(TID_UI), (
                 "Browser.GetFrameNames() may only be called on the UI thread")
         cdef cpp_vector[CefString] cefNames
@@ -327,9 +582,19 @@ cdef class PyBrowser:
         return self.GetCefBrowser().get().GetIdentifier()
 
     cpdef PyFrame GetMainFrame(self):
+        if ShouldCallOnUiThread():
+            return CallOnUiThread("Browser.GetMainFrame()",
+                    self.GetMainFrame, ())
         return GetPyFrame(self.GetCefBrowser().get().GetMainFrame())
 
+    cpdef int GetRendererProcessId(self) except *:
+        # 0 until the Renderer process reports it.
+        return self.rendererProcessId
+
     cpdef WindowHandle GetOpenerWindowHandle(self) except *:
+        if ShouldCallOnUiThread():
+            return CallOnUiThread("Browser.GetOpenerWindowHandle()",
+                    self.GetOpenerWindowHandle, ())
         cdef WindowHandle hwnd
         hwnd = <WindowHandle> \
                 self.GetCefBrowserHost().get().GetOpenerWindowHandle()
@@ -350,31 +615,49 @@ cdef class PyBrowser:
         return None
 
     cpdef WindowHandle GetWindowHandle(self) except *:
+        if ShouldCallOnUiThread():
+            return CallOnUiThread("Browser.GetWindowHandle()",
+                    self.GetWindowHandle, ())
         cdef WindowHandle hwnd
         hwnd = <WindowHandle>self.GetCefBrowserHost().get().GetWindowHandle()
         return hwnd
 
     cpdef double GetZoomLevel(self) except *:
+        if ShouldCallOnUiThread():
+            return CallOnUiThread("Browser.GetZoomLevel()",
+                    self.GetZoomLevel, ())
         cdef double zoomLevel
         zoomLevel = self.GetCefBrowserHost().get().GetZoomLevel()
         return zoomLevel
 
     cpdef py_void GoBack(self):
+        if ShouldCallOnUiThread():
+            return CallOnUiThread("Browser.GoBack()", self.GoBack, ())
         self.GetCefBrowser().get().GoBack()
 
     cpdef py_void GoForward(self):
+        if ShouldCallOnUiThread():
+            return CallOnUiThread("Browser.GoForward()", self.GoForward, ())
         self.GetCefBrowser().get().GoForward()
 
     cpdef py_bool HasDocument(self):
+        if ShouldCallOnUiThread():
+            return CallOnUiThread("Browser.HasDocument()",
+                    self.HasDocument, ())
         return self.GetCefBrowser().get().HasDocument()
 
     cpdef py_bool IsFullscreen(self):
         return bool(self.isFullscreen)
 
     cpdef py_bool IsPopup(self):
+        if ShouldCallOnUiThread():
+            return CallOnUiThread("Browser.IsPopup()", self.IsPopup, ())
         return self.GetCefBrowser().get().IsPopup()
 
     cpdef py_bool IsWindowRenderingDisabled(self):
+        if ShouldCallOnUiThread():
+            return CallOnUiThread("Browser.IsWindowRenderingDisabled()",
+                    self.IsWindowRenderingDisabled, ())
         return self.GetCefBrowserHost().get().IsWindowRenderingDisabled()
 
     cpdef py_string LoadUrl(self, py_string url):
@@ -384,33 +667,55 @@ cdef class PyBrowser:
         self.LoadUrl(url)
 
     cpdef py_void NotifyMoveOrResizeStarted(self):
+        if ShouldCallOnUiThread():
+            return CallOnUiThread("Browser.NotifyMoveOrResizeStarted()",
+                    self.NotifyMoveOrResizeStarted, ())
         self.GetCefBrowserHost().get().NotifyMoveOrResizeStarted()
 
     cpdef py_void Print(self):
+        if ShouldCallOnUiThread():
+            return CallOnUiThread("Browser.Print()", self.Print, ())
         self.GetCefBrowserHost().get().Print()
 
     cpdef py_void Reload(self):
+        if ShouldCallOnUiThread():
+            return CallOnUiThread("Browser.Reload()", self.Reload, ())
         self.GetCefBrowser().get().Reload()
 
     cpdef py_void ReloadIgnoreCache(self):
+        if ShouldCallOnUiThread():
+            return CallOnUiThread("Browser.ReloadIgnoreCache()",
+                    self.ReloadIgnoreCache, ())
         self.GetCefBrowser().get().ReloadIgnoreCache()
 
     cpdef py_void SetBounds(self, int x, int y, int width, int height):
+        if ShouldCallOnUiThread():
+            return CallOnUiThread("Browser.SetBounds()",
+                    self.SetBounds, (x, y, width, height))
         if platform.system() == "Linux":
             x11.SetX11WindowBounds(self.GetCefBrowser(), x, y, width, height)
         else:
             raise Exception("SetBounds() not impplemented on this platform")
 
     cpdef py_void SetFocus(self, enable):
+        if ShouldCallOnUiThread():
+            return CallOnUiThread("Browser.SetFocus()",
+                    self.SetFocus, (enable,))
         self.GetCefBrowserHost().get().SetFocus(bool(enable))
 
     cpdef py_void SetUserData(self, object key, object value):
         self.userData[key] = value
 
     cpdef py_void SetZoomLevel(self, double zoomLevel):
+        if ShouldCallOnUiThread():
+            return CallOnUiThread("Browser.SetZoomLevel()",
+                    self.SetZoomLevel, (zoomLevel,))
         self.GetCefBrowserHost().get().SetZoomLevel(zoomLevel)
 
     cpdef py_void ShowDevTools(self):
+        if ShouldCallOnUiThread():
+            return CallOnUiThread("Browser.ShowDevTools()",
+                    self.ShowDevTools, ())
         cdef CefWindowInfo windowInfo
         cdef CefRefPtr[ClientHandler] clientHandler =\
                 <CefRefPtr[ClientHandler]?>new ClientHandler()
@@ -421,12 +726,20 @@ cdef class PyBrowser:
                 inspect_element_at)
 
     cpdef py_void StopLoad(self):
+        if ShouldCallOnUiThread():
+            return CallOnUiThread("Browser.StopLoad()", self.StopLoad, ())
         self.GetCefBrowser().get().StopLoad()
 
     cpdef py_void StopFinding(self, py_bool clearSelection):
+        if ShouldCallOnUiThread():
+            return CallOnUiThread("Browser.StopFinding()",
+                    self.StopFinding, (clearSelection,))
         self.GetCefBrowserHost().get().StopFinding(bool(clearSelection))
 
     cpdef py_void ToggleFullscreen(self):
+        if ShouldCallOnUiThread():
+            return CallOnUiThread("Browser.ToggleFullscreen()",
+                    self.ToggleFullscreen, ())
         IF UNAME_SYSNAME == "Windows":
             self.ToggleFullscreen_Windows()
 
@@ -510,6 +823,9 @@ cdef class PyBrowser:
             self.isFullscreen = int(not bool(self.isFullscreen))
 
     cpdef py_void SendKeyEvent(self, dict pyEvent):
+        if ShouldCallOnUiThread():
+            return CallOnUiThread("Browser.SendKeyEvent()",
+                    self.SendKeyEvent, (pyEvent,))
         cdef CefKeyEvent cefEvent
         if "type" in pyEvent:
             cefEvent.type = int(pyEvent["type"])
@@ -534,62 +850,183 @@ cdef class PyBrowser:
             cefEvent.focus_on_editable_field = \
                     int(pyEvent["focus_on_editable_field"])
         self.GetCefBrowserHost().get().SendKeyEvent(cefEvent)
+        if g_backgroundThrottling:
+            MarkBrowserActivity(self)
 
     cpdef py_void SendMouseClickEvent(self, int x, int y,
             cef_types.cef_mouse_button_type_t mouseButtonType,
             py_bool mouseUp, int clickCount, int modifiers=0):
+        if ShouldCallOnUiThread():
+            return CallOnUiThread("Browser.SendMouseClickEvent()",
+                    self.SendMouseClickEvent,
+                    (x, y, mouseButtonType, mouseUp, clickCount, modifiers))
         cdef CefMouseEvent mouseEvent
         mouseEvent.x = x
         mouseEvent.y = y
         mouseEvent.modifiers = modifiers
         self.GetCefBrowserHost().get().SendMouseClickEvent(mouseEvent,
                 mouseButtonType, bool(mouseUp), clickCount)
+        if g_backgroundThrottling:
+            MarkBrowserActivity(self)
 
     cpdef py_void SendMouseMoveEvent(self, int x, int y,
             py_bool mouseLeave, int modifiers=0):
+        if ShouldCallOnUiThread():
+            return CallOnUiThread("Browser.SendMouseMoveEvent()",
+                    self.SendMouseMoveEvent, (x, y, mouseLeave, modifiers))
         cdef CefMouseEvent mouseEvent
         mouseEvent.x = x
         mouseEvent.y = y
         mouseEvent.modifiers = modifiers
         self.GetCefBrowserHost().get().SendMouseMoveEvent(mouseEvent,
                 bool(mouseLeave))
+        if g_backgroundThrottling:
+            MarkBrowserActivity(self)
 
     cpdef py_void SendMouseWheelEvent(self, int x, int y,
             int deltaX, int deltaY, int modifiers=0):
+        if ShouldCallOnUiThread():
+            return CallOnUiThread("Browser.SendMouseWheelEvent()",
+                    self.SendMouseWheelEvent,
+                    (x, y, deltaX, deltaY, modifiers))
         cdef CefMouseEvent mouseEvent
         mouseEvent.x = x
         mouseEvent.y = y
         mouseEvent.modifiers = modifiers
         self.GetCefBrowserHost().get().SendMouseWheelEvent(mouseEvent,
                 deltaX, deltaY)
+        if g_backgroundThrottling:
+            MarkBrowserActivity(self)
 
     cpdef py_void SendFocusEvent(self, py_bool setFocus):
+        if ShouldCallOnUiThread():
+            return CallOnUiThread("Browser.SendFocusEvent()",
+                    self.SendFocusEvent, (setFocus,))
         self.GetCefBrowserHost().get().SendFocusEvent(bool(setFocus))
+        if g_backgroundThrottling:
+            MarkBrowserActivity(self)
 
     cpdef py_void SendCaptureLostEvent(self):
+        if ShouldCallOnUiThread():
+            return CallOnUiThread("Browser.SendCaptureLostEvent()",
+                    self.SendCaptureLostEvent, ())
         self.GetCefBrowserHost().get().SendCaptureLostEvent()
 
     cpdef py_void StartDownload(self, py_string url):
+        if ShouldCallOnUiThread():
+            return CallOnUiThread("Browser.StartDownload()",
+                    self.StartDownload, (url,))
         self.GetCefBrowserHost().get().StartDownload(PyToCefStringValue(
                 url))
 
     cpdef py_void SetMouseCursorChangeDisabled(self, py_bool disabled):
+        if ShouldCallOnUiThread():
+            return CallOnUiThread("Browser.SetMouseCursorChangeDisabled()",
+                    self.SetMouseCursorChangeDisabled, (disabled,))
         self.GetCefBrowserHost().get().SetMouseCursorChangeDisabled(
                 bool(disabled))
 
     cpdef py_bool IsMouseCursorChangeDisabled(self):
+        if ShouldCallOnUiThread():
+            return CallOnUiThread("Browser.IsMouseCursorChangeDisabled()",
+                    self.IsMouseCursorChangeDisabled, ())
         return self.GetCefBrowserHost().get().IsMouseCursorChangeDisabled()
 
     cpdef py_bool TryCloseBrowser(self):
+        if ShouldCallOnUiThread():
+            return CallOnUiThread("Browser.TryCloseBrowser()",
+                    self.TryCloseBrowser, ())
         return self.GetCefBrowserHost().get().TryCloseBrowser()
 
     cpdef py_void WasResized(self):
+        if ShouldCallOnUiThread():
+            return CallOnUiThread("Browser.WasResized()", self.WasResized, ())
         self.GetCefBrowserHost().get().WasResized()
 
     cpdef py_void WasHidden(self, py_bool hidden):
+        # Background throttling does not show browsers hidden by the app.
+        # Showing the browser counts as activity, hiding it does not.
+        if ShouldCallOnUiThread():
+            return CallOnUiThread("Browser.WasHidden()",
+                    self.WasHidden, (hidden,))
+        self.hiddenByApp = bool(hidden)
+        if g_backgroundThrottling and not hidden:
+            MarkBrowserActivity(self)
         self.GetCefBrowserHost().get().WasHidden(bool(hidden))
 
+    cpdef dict GetThrottlingState(self):
+        return GetBrowserThrottlingState(self)
+
+    cpdef py_void SetWindowlessFrameRate(self, int frameRate):
+        if ShouldCallOnUiThread():
+            return CallOnUiThread("Browser.SetWindowlessFrameRate()",
+                    self.SetWindowlessFrameRate, (frameRate,))
+        if not 1 <= frameRate <= 60:
+            raise Exception("Browser.SetWindowlessFrameRate() failed: "
+                    "frame rate must be between 1 and 60")
+        if self.framePacer is not None:
+            # Upper limit of the adaptive frame rate.
+            self.framePacer.maxFrameRate = frameRate
+            frameRate = self.framePacer.GetTargetFrameRate()
+            self.framePacer.frameRate = frameRate
+        if self.throttleState:
+            # Set when the browser is unthrottled.
+            self.unthrottledFrameRate = frameRate
+        else:
+            self.GetCefBrowserHost().get().SetWindowlessFrameRate(frameRate)
+
+    cpdef int GetWindowlessFrameRate(self) except *:
+        # Can only be called on the UI thread.
+        if IsMultiThreadedMessageLoop() and not IsThread(TID_UI):
+            return CallOnUiThread("Browser.GetWindowlessFrameRate()",
+                    self.GetWindowlessFrameRate, ())
+        if self.throttleState:
+            return self.unthrottledFrameRate
+        return self.GetCefBrowserHost().get().GetWindowlessFrameRate()
+
+    cpdef py_void SetAdaptiveFrameRate(self, py_bool enabled,
+            int maxFrameRate=0, int refreshRate=60):
+        # maxFrameRate 0 means the current frame rate.
+        cdef FramePacer framePacer
+        if not enabled:
+            self.framePacer = None
+            return
+        if maxFrameRate == 0:
+            maxFrameRate = self.GetWindowlessFrameRate()
+        if not 1 <= maxFrameRate <= 60 or refreshRate < 1:
+            raise Exception("Browser.SetAdaptiveFrameRate() failed: "
+                    "invalid maxFrameRate or refreshRate")
+        framePacer = FramePacer()
+        framePacer.maxFrameRate = maxFrameRate
+        framePacer.refreshRate = refreshRate
+        framePacer.frameRate = self.GetWindowlessFrameRate()
+        self.framePacer = framePacer
+
+    cpdef dict GetAdaptiveFrameRateState(self):
+        if self.framePacer is None:
+            return {"enabled": False}
+        return self.framePacer.GetState()
+
+    cpdef int GetInflightRequestCount(self) except *:
+        cdef int inflight = 0
+        cdef int crossings = 0
+        GetNetworkActivity(self.GetIdentifier(), 0, inflight, crossings)
+        return inflight
+
+    cpdef py_void SetNetworkIdleOptions(self, int idleMs=500,
+            int maxInflight=0):
+        # Options of the OnNetworkIdle callback.
+        self.networkIdleWatch = NetworkIdleWatch(idleMs, maxInflight)
+
+    cpdef py_bool WaitForNetworkIdle(self, int idleMs=500,
+            int maxInflight=0, double timeout=30.0):
+        # Returns False on timeout, timeout 0 means no timeout.
+        return WaitForBrowserNetworkIdle(self, idleMs, maxInflight, timeout)
+
     cpdef py_void NotifyScreenInfoChanged(self):
+        if ShouldCallOnUiThread():
+            return CallOnUiThread("Browser.NotifyScreenInfoChanged()",
+                    self.NotifyScreenInfoChanged, ())
         self.GetCefBrowserHost().get().NotifyScreenInfoChanged()
 
     cdef void SendProcessMessage(self, cef_process_id_t targetProcess,
@@ -608,9 +1045,13 @@ cdef class PyBrowser:
         Debug("SendProcessMessage(): message=%s, arguments size=%d" % (
                 messageName,
                 message.get().GetArgumentList().get().GetSize()))
+        if g_cefpythonTracing:
+            TraceProcessMessage("SendProcessMessage", message)
         cdef cpp_bool success = \
                 self.GetCefBrowser().get().SendProcessMessage(
                         targetProcess, message)
         if not success:
             raise Exception("Browser.SendProcessMessage() failed: "\
                     "messageName=%s" % messageName)
+        CountProcessMessageSent(messageName)
+        ScheduleMessagePumpWork()
@@ -0,0 +1,137 @@
+# Copyright (c) 2012-2014 The CEF Python authors. All rights reserved.
+# License: New BSD License.
+# Website: http://code.google.com/p/cefpython/
+
+# Pool of browsers created in advance on "about:blank", so that their
+# Renderer processes are already running when a browser is needed.
+# Acquire() navigates an idle browser, Release() clears its state and
+# returns it to the pool, or closes it and creates a new one.
+
+include "cefpython.pyx"
+
+# Browser state cleared by BrowserPool.Release(), see the "clear"
+# argument.
+BROWSER_POOL_CLEAR_ALL = ("clientCallbacks", "javascriptBindings",
+        "userScripts", "userData", "zoomLevel")
+
+class BrowserPool(object):
+
+    def __init__(self, size, windowInfoFactory, browserSettings=None,
+            clear=BROWSER_POOL_CLEAR_ALL, maxUses=0):
+        # windowInfoFactory() returns a WindowInfo for each new browser.
+        # maxUses: browsers are replaced after that many Acquire() calls,
+        # 0 means no limit.
+        if size < 0:
+            raise Exception("BrowserPool failed: size must not be negative")
+        for name in clear:
+            if name not in BROWSER_POOL_CLEAR_ALL:
+                raise Exception("BrowserPool failed: invalid clear option: "
+                        "%s" % name)
+        self.size = size
+        self.windowInfoFactory = windowInfoFactory
+        self.browserSettings = browserSettings or {}
+        self.clear = tuple(clear)
+        self.maxUses = maxUses
+        self.idleBrowsers = collections.deque()
+        # Ids of the browsers returned by Acquire() and not released.
+        self.acquiredBrowsers = set()
+        # browserId -> number of Acquire() calls
+        self.uses = {}
+        self.closed = False
+        self.Fill()
+
+    def CreateBrowser(self, url="about:blank"):
+        browser = CreateBrowserSync(self.windowInfoFactory(),
+                self.browserSettings, url)
+        if browser is None:
+            raise Exception("BrowserPool failed: CreateBrowserSync() failed")
+        self.uses[browser.GetIdentifier()] = 0
+        return browser
+
+    def GetBrowserCount(self):
+        # Idle and acquired browsers.
+        return len(self.idleBrowsers) + len(self.acquiredBrowsers)
+
+    def Fill(self):
+        # Creates idle browsers until the pool has "size" browsers,
+        # acquired browsers are counted as they return to the pool.
+        if IsMultiThreadedMessageLoop() and not IsThread(TID_UI):
+            return CallOnUiThread("BrowserPool.Fill()", self.Fill, ())
+        while not self.closed and self.GetBrowserCount() < self.size:
+            self.idleBrowsers.append(self.CreateBrowser())
+        Debug("BrowserPool.Fill(): %s idle browsers" % len(self.idleBrowsers))
+
+    def ScheduleFill(self):
+        # Replacements are created later on the UI thread, so that
+        # Release() returns immediately.
+        PostPythonTask(TID_UI, self.Fill, [])
+
+    def Acquire(self, url):
+        if IsMultiThreadedMessageLoop() and not IsThread(TID_UI):
+            return CallOnUiThread("BrowserPool.Acquire()", self.Acquire,
+                    (url,))
+        if self.closed:
+            raise Exception("BrowserPool.Acquire() failed: pool was closed")
+        if self.idleBrowsers:
+            browser = self.idleBrowsers.popleft()
+            browser.LoadUrl(url)
+        else:
+            Debug("BrowserPool.Acquire() WARNING: no idle browsers, "
+                    "creating a new one")
+            browser = self.CreateBrowser(url)
+        self.uses[browser.GetIdentifier()] += 1
+        self.acquiredBrowsers.add(browser.GetIdentifier())
+        return browser
+
+    def Release(self, browser, replace=False):
+        # Returns the browser to the pool, or closes it when "replace"
+        # is True, when "maxUses" was reached or when the pool is full
+        # because Acquire() had to create an extra browser.
+        if IsMultiThreadedMessageLoop() and not IsThread(TID_UI):
+            return CallOnUiThread("BrowserPool.Release()", self.Release,
+                    (browser, replace))
+        browserId = browser.GetIdentifier()
+        if browserId not in self.acquiredBrowsers:
+            raise Exception("BrowserPool.Release() failed: browser was "
+                    "not acquired from this pool, id = %s" % browserId)
+        self.acquiredBrowsers.remove(browserId)
+        if replace or self.closed \
+                or self.GetBrowserCount() >= self.size \
+                or (self.maxUses and self.uses[browserId] >= self.maxUses):
+            del self.uses[browserId]
+            browser.CloseBrowser(True)
+            self.ScheduleFill()
+            return
+        self.ClearBrowser(browser)
+        self.idleBrowsers.append(browser)
+
+    def ClearBrowser(self, browser):
+        browser.StopLoad()
+        if "clientCallbacks" in self.clear:
+            browser.SetClientCallbacksDict({})
+        if "javascriptBindings" in self.clear \
+                and browser.GetJavascriptBindings() is not None:
+            browser.SetJavascriptBindings(JavascriptBindings())
+        if "userScripts" in self.clear:
+            browser.ClearUserScripts()
+        if "userData" in self.clear:
+            outerWindowHandle = browser.GetUserData("__outerWindowHandle")
+            browser.userData.clear()
+            browser.SetUserData("__outerWindowHandle", outerWindowHandle)
+        if "zoomLevel" in self.clear:
+            browser.SetZoomLevel(0)
+        browser.LoadUrl("about:blank")
+
+    def GetIdleCount(self):
+        return len(self.idleBrowsers)
+
+    def Close(self):
+        # Closes the idle browsers, acquired browsers are closed
+        # when released.
+        if IsMultiThreadedMessageLoop() and not IsThread(TID_UI):
+            return CallOnUiThread("BrowserPool.Close()", self.Close, ())
+        self.closed = True
+        while self.idleBrowsers:
+            browser = self.idleBrowsers.popleft()
+            del self.uses[browser.GetIdentifier()]
+            browser.CloseBrowser(True)
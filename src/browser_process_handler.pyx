@@ -9,7 +9,8 @@ cdef public void BrowserProcessHandler_OnRenderProcessThreadCreated(
         ) except * with gil:
     try:
         # Keys 0 and 1 are already set in C++ code - to pass debug options.
-        pass
+        extra_info.get().SetInt(2, int(g_applicationSettings.get(
+                "javascript_callbacks_limit", 0)))
     except:
         (exc_type, exc_value, exc_trace) = sys.exc_info()
         sys.excepthook(exc_type, exc_value, exc_trace)
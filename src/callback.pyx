@@ -10,6 +10,7 @@ cdef PyCallback CreatePyCallback(
     pyCallback.cefCallback = cefCallback
     return pyCallback
 
+@cython.freelist(8)
 cdef class PyCallback:
     cdef CefRefPtr[CefCallback] cefCallback
     
@@ -282,6 +282,14 @@ import json
 import datetime
 # noinspection PyUnresolvedReferences
 import random
+# noinspection PyUnresolvedReferences
+import collections
+# noinspection PyUnresolvedReferences
+import functools
+# noinspection PyUnresolvedReferences
+import logging
+# noinspection PyUnresolvedReferences
+import atexit
 
 if sys.version_info.major == 2:
     # noinspection PyUnresolvedReferences
@@ -297,8 +305,19 @@ else:
     # noinspection PyUnresolvedReferences
     from urllib.request import pathname2url as urllib_pathname2url
 
+# Frame.EvaluateJavascript() returns a future. On Python 2 this requires
+# the "futures" package.
+try:
+    # noinspection PyUnresolvedReferences
+    from concurrent import futures as concurrent_futures
+except ImportError:
+    concurrent_futures = None
+
 # noinspection PyUnresolvedReferences
 from cpython.version cimport PY_MAJOR_VERSION
+# Required by the @cython.freelist() decorator.
+# noinspection PyUnresolvedReferences
+cimport cython
 # noinspection PyUnresolvedReferences
 import weakref
 
@@ -339,7 +358,7 @@ from wstring cimport wstring as cpp_wstring
 # noinspection PyUnresolvedReferences
 from libc.string cimport strlen
 # noinspection PyUnresolvedReferences
-from libc.string cimport memcpy
+from libc.string cimport memcpy, memset
 # preincrement and dereference must be "as" otherwise not seen.
 # noinspection PyUnresolvedReferences
 from cython.operator cimport preincrement as preinc, dereference as deref
@@ -425,6 +444,9 @@ from cef_request_context_handler cimport *
 from request_context_handler cimport *
 from cef_jsdialog_handler cimport *
 from cef_path_util cimport *
+from debug_log cimport *
+from process_message_stats cimport *
+from network_activity cimport *
 
 
 # -----------------------------------------------------------------------------
@@ -472,6 +494,19 @@ ELIF UNAME_SYSNAME == "Darwin":
     include "window_utils_mac.pyx"
 
 include "task.pyx"
+include "message_pump.pyx"
+include "dispatch.pyx"
+include "profiler.pyx"
+include "tracing.pyx"
+include "log_buffer.pyx"
+include "metrics.pyx"
+include "diagnostics.pyx"
+include "process_monitor.pyx"
+include "throttling.pyx"
+include "frame_pacing.pyx"
+include "browser_pool.pyx"
+include "network_idle.pyx"
+include "render_queue.pyx"
 
 include "javascript_bindings.pyx"
 include "virtual_keys.pyx"
@@ -481,6 +516,7 @@ include "process_message_utils.pyx"
 include "v8context_handler.pyx"
 include "v8function_handler.pyx"
 include "javascript_callback.pyx"
+include "javascript_evaluation.pyx"
 include "python_callback.pyx"
 include "lifespan_handler.pyx"
 include "display_handler.pyx"
@@ -603,6 +639,10 @@ def Initialize(applicationSettings=None, commandLineSwitches=None):
         applicationSettings["downloads_enabled"] = True
     if "remote_debugging_port" not in applicationSettings:
         applicationSettings["remote_debugging_port"] = 0
+    if "python_callbacks_limit" not in applicationSettings:
+        applicationSettings["python_callbacks_limit"] = 0
+    if "javascript_callbacks_limit" not in applicationSettings:
+        applicationSettings["javascript_callbacks_limit"] = 0
     if "auto_zooming" not in applicationSettings:
         IF UNAME_SYSNAME == "Windows":
             if DpiAware.IsProcessDpiAware():
@@ -672,8 +712,17 @@ def Initialize(applicationSettings=None, commandLineSwitches=None):
             g_commandLineSwitches[key] = copy.deepcopy(
                     commandLineSwitches[key])
 
-    Debug("CefInitialize()")
     cdef cpp_bool ret
+    IF UNAME_SYSNAME == "Linux":
+        if applicationSettings["multi_threaded_message_loop"]:
+            # CEF supports this option on Windows only, see
+            # StartUiThread().
+            ret = StartUiThread(applicationSettings)
+            if not ret:
+                Debug("CefInitialize() failed")
+            return ret
+
+    Debug("CefInitialize()")
     with nogil:
         ret = CefInitialize(cefMainArgs, cefApplicationSettings, cefApp, NULL)
 
@@ -683,11 +732,21 @@ def Initialize(applicationSettings=None, commandLineSwitches=None):
 
 def CreateBrowserSync(windowInfo, browserSettings, navigateUrl, requestContext=None):
     Debug("CreateBrowserSync() called")
+    if not IsThread(TID_UI) and IsMultiThreadedMessageLoop():
+        return CallOnUiThread("CreateBrowserSync()", CreateBrowserSync,
+                (windowInfo, browserSettings, navigateUrl, requestContext))
     assert IsThread(TID_UI), (
             "cefpython.CreateBrowserSync() may only be called on the UI thread")
 
     if not isinstance(windowInfo, WindowInfo):
         raise Exception("CreateBrowserSync() failed: windowInfo: invalid object")
+    IF UNAME_SYSNAME == "Linux":
+        if IsMultiThreadedMessageLoop() \
+                and windowInfo.windowType != "offscreen":
+            # The UI thread does not run the application's GTK loop.
+            raise Exception("CreateBrowserSync() failed: only off-screen "
+                    "browsers are supported with multi_threaded_message_loop"
+                    " on Linux")
 
     cdef CefBrowserSettings cefBrowserSettings
     SetBrowserSettings(browserSettings, &cefBrowserSettings)
@@ -748,11 +807,15 @@ def CreateBrowserSync(windowInfo, browserSettings, navigateUrl, requestContext=N
 
     cdef PyBrowser pyBrowser = GetPyBrowser(cefBrowser)
     pyBrowser.SetUserData("__outerWindowHandle", int(windowInfo.parentWindowHandle))
+    IndexPyBrowser(pyBrowser, <WindowHandle>windowInfo.parentWindowHandle)
 
     return pyBrowser
 
 def MessageLoop():
     Debug("MessageLoop()")
+    if IsMultiThreadedMessageLoop():
+        raise Exception("MessageLoop() failed: not allowed when "
+                "multi_threaded_message_loop is enabled")
     with nogil:
         CefRunMessageLoop()
 
@@ -771,6 +834,14 @@ def MessageLoopWork():
         global _MessageLoopWork_wasused
         _MessageLoopWork_wasused = True
 
+    cdef double profilerStart
+    if g_callbackProfiling or g_cefpythonTracing:
+        profilerStart = ProfilerClock()
+        with nogil:
+            CefDoMessageLoopWork()
+        RecordMessageLoopWork(profilerStart)
+        return
+
     with nogil:
         CefDoMessageLoopWork()
 
@@ -784,12 +855,24 @@ def QuitMessageLoop():
         CefQuitMessageLoop()
 
 def Shutdown():
+    # Pumps must not call MessageLoopWork() after CefShutdown().
+    UninstallMessagePumps()
+    StopTracing()
+    StopMetricsServer()
+    StopObjectRegistryCheck()
+    DisableBackgroundThrottling()
     if g_sharedRequestContext.get():
         # A similar release is done in RemovePyBrowser and CloseBrowser.
         # This one is probably redundant. Additional testing should be done.
         Debug("Shutdown: releasing shared request context")
         g_sharedRequestContext.Assign(NULL)
     Debug("Shutdown()")
+    IF UNAME_SYSNAME == "Linux":
+        if IsUiThreadRunning():
+            # CefShutdown() is called by the UI thread.
+            StopUiThread()
+            FlushLog()
+            return
     with nogil:
         # Temporary fix for possible errors on shutdown. See this post:
         # https://magpcss.org/ceforum/viewtopic.php?p=30858#p30858
@@ -802,7 +885,7 @@ def Shutdown():
         if _MessageLoopWork_wasused:
             for i in range(10):
                 CefDoMessageLoopWork()
-
+    FlushLog()
 
 
 def SetOsModalLoop(py_bool modalLoop):
@@ -10,6 +10,8 @@
 #include "cefpython_public_api.h"
 #include "DebugLog.h"
 #include "LOG_DEBUG.h"
+#include "process_message_stats.h"
+#include "network_activity.h"
 
 #if defined(OS_WIN)
 #include <Shellapi.h>
@@ -67,7 +69,11 @@ bool ClientHandler::OnProcessMessageReceived(CefRefPtr<CefBrowser> browser,
     if (source_process != PID_RENDERER) {
         return false;
     }
+    if (g_cefpythonTracing) {
+        Tracing_OnProcessMessageReceived(message);
+    }
     std::string messageName = message->GetName().ToString();
+    CountProcessMessageReceived(messageName);
     std::string logMessage = "Browser: OnProcessMessageReceived(): ";
     logMessage.append(messageName.c_str());
     DebugLog(logMessage.c_str());
@@ -139,6 +145,52 @@ bool ClientHandler::OnProcessMessageReceived(CefRefPtr<CefBrowser> browser,
                     ", messageName = ExecutePythonCallback");
             return false;
         }
+    } else if (messageName == "EvaluateJavascriptResult") {
+        CefRefPtr<CefListValue> arguments = message->GetArgumentList();
+        if (arguments->GetSize() == 4
+                && arguments->GetType(0) == VTYPE_INT // requestId
+                && arguments->GetType(1) == VTYPE_BOOL // success
+                && arguments->GetType(2) == VTYPE_LIST // [result]
+                && arguments->GetType(3) == VTYPE_STRING) { // error
+            JavascriptEvaluation_OnResult(browser, arguments->GetInt(0),
+                    arguments->GetBool(1), arguments->GetList(2),
+                    arguments->GetString(3));
+            return true;
+        } else {
+            DebugLog("Browser: OnProcessMessageReceived(): invalid arguments" \
+                    ", messageName = EvaluateJavascriptResult");
+            return false;
+        }
+    } else if (messageName == "OnBrowserCreated") {
+        CefRefPtr<CefListValue> arguments = message->GetArgumentList();
+        if (arguments->GetSize() == 1 && arguments->GetType(0) == VTYPE_INT) {
+            int processId = arguments->GetInt(0);
+            ProcessMonitor_OnBrowserCreated(browser, processId);
+            return true;
+        } else {
+            DebugLog("Browser: OnProcessMessageReceived(): invalid arguments" \
+                    ", messageName = OnBrowserCreated");
+            return false;
+        }
+    } else if (messageName == "JavascriptCallbackStats") {
+        CefRefPtr<CefListValue> arguments = message->GetArgumentList();
+        if (arguments->GetSize() == 6
+                && arguments->GetType(0) == VTYPE_INT // processId
+                && arguments->GetType(1) == VTYPE_INT // live
+                && arguments->GetType(2) == VTYPE_INT // created
+                && arguments->GetType(3) == VTYPE_INT // deduplicated
+                && arguments->GetType(4) == VTYPE_INT // released
+                && arguments->GetType(5) == VTYPE_INT) { // evicted
+            JavascriptCallback_OnRendererStats(arguments->GetInt(0),
+                    arguments->GetInt(1), arguments->GetInt(2),
+                    arguments->GetInt(3), arguments->GetInt(4),
+                    arguments->GetInt(5));
+            return true;
+        } else {
+            DebugLog("Browser: OnProcessMessageReceived(): invalid arguments" \
+                    ", messageName = JavascriptCallbackStats");
+            return false;
+        }
     }
     return false;
 }
@@ -188,6 +240,7 @@ bool ClientHandler::DoClose(CefRefPtr<CefBrowser> browser) {
 
 void ClientHandler::OnBeforeClose(CefRefPtr<CefBrowser> browser) {
     REQUIRE_UI_THREAD();
+    RemoveNetworkActivity(browser->GetIdentifier());
     LifespanHandler_OnBeforeClose(browser);
 }
 
@@ -270,6 +323,11 @@ ReturnValue ClientHandler::OnBeforeResourceLoad(
                                 CefRefPtr<CefRequest> request,
                                 CefRefPtr<CefRequestCallback> callback) {
     REQUIRE_IO_THREAD();
+    // Cancelled requests are counted too, OnResourceLoadComplete() is
+    // called for them with the UR_CANCELED status.
+    if (browser.get()) {
+        CountResourceLoadStarted(browser->GetIdentifier());
+    }
     bool retval = RequestHandler_OnBeforeResourceLoad(browser, frame, request);
     if (retval) {
         return RV_CANCEL;
@@ -287,6 +345,19 @@ CefRefPtr<CefResourceHandler> ClientHandler::GetResourceHandler(
     return RequestHandler_GetResourceHandler(browser, frame, request);
 }
 
+void ClientHandler::OnResourceLoadComplete(CefRefPtr<CefBrowser> browser,
+                                  CefRefPtr<CefFrame> frame,
+                                  CefRefPtr<CefRequest> request,
+                                  CefRefPtr<CefResponse> response,
+                                  URLRequestStatus status,
+                                  int64 received_content_length) {
+    REQUIRE_IO_THREAD();
+    // Only counted, not exposed as a client callback.
+    if (browser.get()) {
+        CountResourceLoadCompleted(browser->GetIdentifier());
+    }
+}
+
 void ClientHandler::OnResourceRedirect(CefRefPtr<CefBrowser> browser,
                               CefRefPtr<CefFrame> frame,
                               CefRefPtr<CefRequest> request,
@@ -0,0 +1,97 @@
+// Copyright (c) 2012-2014 The CEF Python authors. All rights reserved.
+// License: New BSD License.
+// Website: http://code.google.com/p/cefpython/
+
+// Number of resource requests in flight, by browser id. Counted on the
+// IO thread in ClientHandler::OnBeforeResourceLoad() and
+// ClientHandler::OnResourceLoadComplete() without acquiring the GIL,
+// read by Browser.WaitForNetworkIdle() and the OnNetworkIdle callback,
+// see network_idle.pyx.
+
+#pragma once
+#include <map>
+#include <utility>
+#include "include/base/cef_lock.h"
+
+// Thresholds for which crossings are counted, see
+// BrowserNetworkActivity::crossings.
+#define NETWORK_IDLE_MAX_INFLIGHT 16
+
+struct BrowserNetworkActivity {
+    int inflight;
+    // crossings[n] is incremented each time "inflight" goes from n to
+    // n + 1. A reader that sees the same value twice, with "inflight"
+    // not above n both times, knows that there were never more than
+    // n requests in flight between the two reads.
+    int crossings[NETWORK_IDLE_MAX_INFLIGHT + 1];
+};
+
+struct NetworkActivity {
+    base::Lock lock;
+    std::map<int, BrowserNetworkActivity> browsers;
+};
+
+// Defined as "inline" to get rid of the "already defined" errors
+// when linking.
+inline NetworkActivity& GetNetworkActivityState()
+{
+    static NetworkActivity activity;
+    return activity;
+}
+
+inline void CountResourceLoadStarted(int browserId)
+{
+    NetworkActivity& activity = GetNetworkActivityState();
+    base::AutoLock lock_scope(activity.lock);
+    std::map<int, BrowserNetworkActivity>::iterator it =
+            activity.browsers.find(browserId);
+    if (it == activity.browsers.end()) {
+        BrowserNetworkActivity browser = {};
+        it = activity.browsers.insert(std::make_pair(browserId,
+                                                     browser)).first;
+    }
+    if (it->second.inflight <= NETWORK_IDLE_MAX_INFLIGHT) {
+        it->second.crossings[it->second.inflight]++;
+    }
+    it->second.inflight++;
+}
+
+inline void CountResourceLoadCompleted(int browserId)
+{
+    NetworkActivity& activity = GetNetworkActivityState();
+    base::AutoLock lock_scope(activity.lock);
+    std::map<int, BrowserNetworkActivity>::iterator it =
+            activity.browsers.find(browserId);
+    // Requests that were started before the browser was removed
+    // are not counted.
+    if (it != activity.browsers.end() && it->second.inflight > 0) {
+        it->second.inflight--;
+    }
+}
+
+// Called in ClientHandler::OnBeforeClose().
+inline void RemoveNetworkActivity(int browserId)
+{
+    NetworkActivity& activity = GetNetworkActivityState();
+    base::AutoLock lock_scope(activity.lock);
+    activity.browsers.erase(browserId);
+}
+
+// Sets "inflight" and "crossings" of the "maxInflight" threshold.
+// Returns false when no requests were counted for the browser.
+inline bool GetNetworkActivity(int browserId, int maxInflight,
+                               int& inflight, int& crossings)
+{
+    NetworkActivity& activity = GetNetworkActivityState();
+    base::AutoLock lock_scope(activity.lock);
+    std::map<int, BrowserNetworkActivity>::iterator it =
+            activity.browsers.find(browserId);
+    if (it == activity.browsers.end()) {
+        inflight = 0;
+        crossings = 0;
+        return false;
+    }
+    inflight = it->second.inflight;
+    crossings = it->second.crossings[maxInflight];
+    return true;
+}
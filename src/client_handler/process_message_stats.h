@@ -0,0 +1,42 @@
+// Copyright (c) 2012-2014 The CEF Python authors. All rights reserved.
+// License: New BSD License.
+// Website: http://code.google.com/p/cefpython/
+
+// Number of process messages received from the Renderer process,
+// by message name. Counted in ClientHandler::OnProcessMessageReceived()
+// without acquiring the GIL, read by the metrics server, see
+// metrics.pyx.
+
+#pragma once
+#include <map>
+#include <string>
+#include "include/base/cef_lock.h"
+
+struct ProcessMessageStats {
+    base::Lock lock;
+    std::map<std::string, long long> received;
+};
+
+// Defined as "inline" to get rid of the "already defined" errors
+// when linking.
+inline ProcessMessageStats& GetProcessMessageStats()
+{
+    static ProcessMessageStats stats;
+    return stats;
+}
+
+inline void CountProcessMessageReceived(const std::string& messageName)
+{
+    ProcessMessageStats& stats = GetProcessMessageStats();
+    base::AutoLock lock_scope(stats.lock);
+    stats.received[messageName]++;
+}
+
+// Copies the counts to "counts".
+inline void GetProcessMessagesReceived(
+        std::map<std::string, long long>& counts)
+{
+    ProcessMessageStats& stats = GetProcessMessageStats();
+    base::AutoLock lock_scope(stats.lock);
+    counts = stats.received;
+}
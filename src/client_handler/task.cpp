@@ -9,13 +9,17 @@ void PostTaskWrapper(int threadId, int taskId) {
     // better responsiveness than CefPostTask. In wxpython.py 
     // on Windows the freeze when creating popup window feels 
     // shorter, when compared to a call to CefPostTask.
+    PostDelayedTaskWrapper(threadId, taskId, 0);
+}
+
+void PostDelayedTaskWrapper(int threadId, int taskId, long long delayMs) {
     CefPostDelayedTask(
             static_cast<CefThreadId>(threadId),
             CefCreateClosureTask(base::Bind(
                     &PyTaskRunnable,
                     taskId
             )),
-            0
+            static_cast<int64>(delayMs)
     );
 }
 
@@ -7,6 +7,7 @@
 #include "include/cef_task.h"
 
 void PostTaskWrapper(int threadId, int taskId);
+void PostDelayedTaskWrapper(int threadId, int taskId, long long delayMs);
 
 CefRefPtr<CefTask> CreateTask_SetCookie(
         CefCookieManager* obj,
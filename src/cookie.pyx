@@ -42,6 +42,7 @@ cdef PyCookie CreatePyCookie(CefCookie cefCookie):
     pyCookie.cefCookie = cefCookie
     return pyCookie
 
+@cython.freelist(8)
 cdef class Cookie:
     cdef CefCookie cefCookie
 
@@ -298,7 +299,8 @@ cdef class PyCookieVisitor:
         if self.userCookieVisitor and (
                 hasattr(self.userCookieVisitor, funcName) and (
                 callable(getattr(self.userCookieVisitor, funcName)))):
-            return getattr(self.userCookieVisitor, funcName)
+            return ProfileCallback(getattr(self.userCookieVisitor,
+                    funcName), funcName, "CookieVisitor")
 
 # ------------------------------------------------------------------------------
 # C++ CookieVisitor
@@ -315,14 +317,15 @@ cdef public cpp_bool CookieVisitor_Visit(
     cdef object callback
     cdef py_bool ret
     cdef PyCookie pyCookie
-    cdef list pyDeleteCookie = [False]
+    cdef list pyDeleteCookie
     try:
         assert IsThread(TID_IO), "Must be called on the IO thread"
         pyCookieVisitor = GetPyCookieVisitor(cookieVisitorId)
-        pyCookie = CreatePyCookie(cookie)
         if pyCookieVisitor:
             callback = pyCookieVisitor.GetCallback("Visit")
             if callback:
+                pyCookie = CreatePyCookie(cookie)
+                pyDeleteCookie = [False]
                 ret = callback(pyCookie, count, total, pyDeleteCookie)
                 (&deleteCookie)[0] = bool(pyDeleteCookie[0])
                 return bool(ret)
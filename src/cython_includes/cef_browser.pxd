@@ -40,6 +40,8 @@ cdef extern from "include/cef_browser.h":
         cpp_bool IsWindowRenderingDisabled()
         void WasResized()
         void WasHidden(cpp_bool hidden)
+        int GetWindowlessFrameRate()
+        void SetWindowlessFrameRate(int frame_rate)
         void NotifyScreenInfoChanged()
         void NotifyMoveOrResizeStarted()
 
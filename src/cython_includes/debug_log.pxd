@@ -0,0 +1,12 @@
+# Copyright (c) 2012-2014 The CEF Python authors. All rights reserved.
+# License: New BSD License.
+# Website: http://code.google.com/p/cefpython/
+
+from libcpp cimport bool as cpp_bool
+from libcpp.vector cimport vector as cpp_vector
+from libcpp.string cimport string as cpp_string
+
+cdef extern from "DebugLog.h":
+    # Named g_debug in C++, defined in subprocess/cefpython_app.cpp.
+    cpp_bool g_cppDebug "g_debug"
+    size_t DrainDebugLog(cpp_vector[cpp_string]& messages) nogil
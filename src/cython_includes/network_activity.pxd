@@ -0,0 +1,10 @@
+# Copyright (c) 2012-2014 The CEF Python authors. All rights reserved.
+# License: New BSD License.
+# Website: http://code.google.com/p/cefpython/
+
+from libcpp cimport bool as cpp_bool
+
+cdef extern from "client_handler/network_activity.h":
+    enum: NETWORK_IDLE_MAX_INFLIGHT
+    cpp_bool GetNetworkActivity(int browserId, int maxInflight,
+            int& inflight, int& crossings) nogil
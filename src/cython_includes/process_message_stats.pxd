@@ -0,0 +1,10 @@
+# Copyright (c) 2012-2014 The CEF Python authors. All rights reserved.
+# License: New BSD License.
+# Website: http://code.google.com/p/cefpython/
+
+from libcpp.map cimport map as cpp_map
+from libcpp.string cimport string as cpp_string
+
+cdef extern from "client_handler/process_message_stats.h":
+    void GetProcessMessagesReceived(
+            cpp_map[cpp_string, long long]& counts) nogil
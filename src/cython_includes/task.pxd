@@ -16,6 +16,8 @@ from libcpp cimport bool as cpp_bool
 cdef extern from "client_handler/task.h":
 
     void PostTaskWrapper(int threadId, int taskId) nogil
+    void PostDelayedTaskWrapper(int threadId, int taskId,
+                                long long delayMs) nogil
 
     cdef CefRefPtr[CefTask] CreateTask_SetCookie(
             CefCookieManager* obj,
@@ -0,0 +1,150 @@
+# Copyright (c) 2012-2014 The CEF Python authors. All rights reserved.
+# License: New BSD License.
+# Website: http://code.google.com/p/cefpython/
+
+# Diagnostics of the global registries that keep Python objects alive,
+# to find leaks in long running applications. GetObjectCounts() returns
+# the registry sizes, CheckObjectRegistries() additionally reports the
+# age of the oldest entries and the entries belonging to browsers that
+# were closed (orphans), optionally removing them. The check can run
+# periodically on the UI thread, see StartObjectRegistryCheck().
+
+include "cefpython.pyx"
+
+# Incremented when the periodic check is started or stopped, a pending
+# check with a different id does nothing.
+cdef int g_registryCheckId = 0
+cdef double g_registryCheckInterval = 0
+cdef object g_registryCheckCallback = None
+cdef py_bool g_registryCheckPurge = False
+
+def GetObjectCounts():
+    cdef int frames = 0
+    for browserFrames in g_pyFrames.values():
+        frames += len(browserFrames)
+    return {
+        "browsers": len(g_pyBrowsers),
+        "frames": frames,
+        "pythonCallbacks": len(g_pythonCallbacks),
+        "javascriptCallbacks": g_javascriptCallbackCount,
+        "rendererJavascriptCallbacks": GetJavascriptCallbackStats()["live"],
+        "javascriptEvaluations": len(g_javascriptEvaluations),
+        "tasks": len(g_tasks),
+        "resourceHandlers": len(g_userResourceHandler),
+        "cookieVisitors": len(g_userCookieVisitors),
+        "stringVisitors": len(g_userStringVisitors),
+        "webRequests": len(g_pyWebRequests),
+    }
+
+cdef object GetOldestAge(list createdTimes, double now):
+    # Age in seconds, None when the registry is empty.
+    if not createdTimes:
+        return None
+    return now - min(createdTimes)
+
+def CheckObjectRegistries(py_bool purge=False):
+    cdef double now = time.time()
+    cdef PyFrame pyFrame
+    cdef PythonCallbackEntry callbackEntry
+    cdef JavascriptEvaluation evaluation
+    cdef set orphanBrowsers = set()
+    cdef dict orphans
+    cdef list frameTimes = []
+    if IsMultiThreadedMessageLoop() and not IsThread(TID_UI):
+        return CallOnUiThread("CheckObjectRegistries()",
+                CheckObjectRegistries, (purge,))
+
+    orphans = {
+        "frames": 0,
+        "pythonCallbacks": 0,
+        "javascriptEvaluations": 0,
+        "windowHandles": 0,
+    }
+    for browserId in g_pyFrames:
+        if browserId not in g_pyBrowsers:
+            orphanBrowsers.add(browserId)
+            orphans["frames"] += len(g_pyFrames[browserId])
+        for pyFrame in g_pyFrames[browserId].values():
+            frameTimes.append(pyFrame.created)
+    for callbackEntry in g_pythonCallbacks.values():
+        if callbackEntry.browserId not in g_pyBrowsers:
+            orphanBrowsers.add(callbackEntry.browserId)
+            orphans["pythonCallbacks"] += 1
+    for evaluation in g_javascriptEvaluations.values():
+        if evaluation.browserId not in g_pyBrowsers:
+            orphanBrowsers.add(evaluation.browserId)
+            orphans["javascriptEvaluations"] += 1
+    for browserId in g_pyBrowserWindowHandles:
+        if browserId not in g_pyBrowsers:
+            orphanBrowsers.add(browserId)
+            orphans["windowHandles"] += 1
+
+    report = {
+        "counts": GetObjectCounts(),
+        "oldestAge": {
+            "frames": GetOldestAge(frameTimes, now),
+            "pythonCallbacks": GetOldestAge([(<PythonCallbackEntry>entry)
+                    .created for entry in g_pythonCallbacks.values()], now),
+            "javascriptEvaluations": GetOldestAge([(<JavascriptEvaluation>
+                    entry).created
+                    for entry in g_javascriptEvaluations.values()], now),
+            "tasks": GetOldestAge([(<PyTask>entry).created
+                    for entry in g_tasks.values()], now),
+            "webRequests": GetOldestAge([(<PyWebRequest>entry).created
+                    for entry in list(g_pyWebRequests.values())], now),
+        },
+        "orphans": orphans,
+        "purged": False,
+    }
+
+    if purge and orphanBrowsers:
+        # The same cleanup as in LifespanHandler_OnBeforeClose().
+        for browserId in orphanBrowsers:
+            RemovePythonCallbacksForBrowser(browserId)
+            RejectJavascriptEvaluations(browserId, None, "Browser closed")
+            RemovePyFramesForBrowser(browserId)
+            UnindexPyBrowser(browserId)
+        report["purged"] = True
+    if orphanBrowsers:
+        Debug("CheckObjectRegistries() WARNING: entries of closed browsers "
+                "found: %s, browserIds = %s, purged = %s" % (orphans,
+                        sorted(orphanBrowsers), report["purged"]))
+    return report
+
+def RunObjectRegistryCheck(int checkId):
+    if checkId != g_registryCheckId:
+        # Stopped or restarted.
+        return
+    try:
+        report = CheckObjectRegistries(g_registryCheckPurge)
+        Debug("Object registries: %s" % report["counts"])
+        if g_registryCheckCallback:
+            # Exceptions are reported by the task with sys.excepthook,
+            # the check continues.
+            g_registryCheckCallback(report)
+    finally:
+        if checkId == g_registryCheckId:
+            PostPythonTask(TID_UI, RunObjectRegistryCheck, [checkId],
+                    <long long>(g_registryCheckInterval * 1000))
+
+def StartObjectRegistryCheck(double interval, object callback=None,
+        py_bool purge=False):
+    # interval in seconds. callback is called with the report
+    # returned by CheckObjectRegistries().
+    global g_registryCheckId, g_registryCheckInterval
+    global g_registryCheckCallback, g_registryCheckPurge
+    if interval <= 0:
+        raise Exception("StartObjectRegistryCheck() failed: interval "
+                "must be positive")
+    g_registryCheckId += 1
+    g_registryCheckInterval = interval
+    g_registryCheckCallback = callback
+    g_registryCheckPurge = purge
+    PostPythonTask(TID_UI, RunObjectRegistryCheck, [g_registryCheckId],
+            <long long>(interval * 1000))
+
+def StopObjectRegistryCheck():
+    global g_registryCheckId, g_registryCheckCallback
+    # Pending task will see a different id and return.
+    g_registryCheckId += 1
+    g_registryCheckCallback = None
@@ -0,0 +1,210 @@
+# Copyright (c) 2012-2014 The CEF Python authors. All rights reserved.
+# License: New BSD License.
+# Website: http://code.google.com/p/cefpython/
+
+# Support for the "multi_threaded_message_loop" option. In this mode
+# CEF runs its UI thread on a separate native thread, the application
+# thread does not need to pump CEF and may block in its own code.
+#  - Browser, Frame and JavascriptCallback methods and functions like
+#    CreateBrowserSync() are posted to the UI thread when called from
+#    an application thread and the calling thread waits for the result,
+#    see ShouldCallOnUiThread() and CallOnUiThread().
+#  - Client callbacks that do not return a value can be dispatched to
+#    a queue or an executor, so that they run on the application
+#    thread instead of the CEF UI thread, see SetCallbackDispatcher().
+#  - CEF supports the option on Windows only. On Linux the UI thread
+#    is a thread started by Initialize(), see StartUiThread().
+
+include "cefpython.pyx"
+
+# noinspection PyUnresolvedReferences
+import threading
+
+if sys.version_info.major == 2:
+    # noinspection PyUnresolvedReferences
+    import Queue as queue
+else:
+    # noinspection PyUnresolvedReferences
+    import queue
+
+# An object with a submit(func, *args) method: a CallbackQueue
+# or a concurrent.futures.Executor. None calls the callbacks
+# on the CEF UI thread.
+cdef object g_callbackDispatcher = None
+
+class CallbackQueue(object):
+    # Client callbacks are put here on the CEF UI thread and run
+    # by the application thread when it calls ProcessCallbacks().
+
+    def __init__(self):
+        self.queue = queue.Queue()
+
+    def submit(self, func, *args):
+        self.queue.put((func, args))
+
+    def ProcessCallbacks(self, timeout=0):
+        # Runs all queued callbacks. Waits up to "timeout" seconds
+        # for the first callback, None waits forever. Returns the
+        # number of callbacks that were run.
+        count = 0
+        try:
+            if timeout == 0:
+                item = self.queue.get_nowait()
+            else:
+                item = self.queue.get(True, timeout)
+            while True:
+                item[0](*item[1])
+                count += 1
+                item = self.queue.get_nowait()
+        except queue.Empty:
+            pass
+        return count
+
+def SetCallbackDispatcher(object dispatcher):
+    global g_callbackDispatcher
+    if dispatcher is not None and not hasattr(dispatcher, "submit"):
+        raise Exception("SetCallbackDispatcher() failed: dispatcher "
+                "must have a submit() method")
+    g_callbackDispatcher = dispatcher
+
+def GetCallbackDispatcher():
+    return g_callbackDispatcher
+
+def RunDispatchedCallback(object callback, tuple args):
+    # Exceptions are reported the same way as in callbacks
+    # called on the CEF UI thread.
+    try:
+        callback(*args)
+    except:
+        (exc_type, exc_value, exc_trace) = sys.exc_info()
+        sys.excepthook(exc_type, exc_value, exc_trace)
+
+cdef void DispatchClientCallback(object callback, tuple args) except *:
+    # Only for callbacks that return no value and do not use
+    # out parameters.
+    if g_callbackDispatcher is None:
+        callback(*args)
+    else:
+        g_callbackDispatcher.submit(RunDispatchedCallback, callback, args)
+
+cdef class UiThreadCall:
+    cdef object func
+    cdef tuple args
+    cdef object result
+    cdef tuple excInfo
+    cdef object done
+
+    def Run(self):
+        try:
+            self.result = self.func(*self.args)
+        except:
+            self.excInfo = sys.exc_info()
+        finally:
+            self.done.set()
+
+cdef py_bool IsMultiThreadedMessageLoop():
+    return bool(g_applicationSettings.get("multi_threaded_message_loop"))
+
+cdef py_bool ShouldCallOnUiThread():
+    # True on application threads in the multi_threaded_message_loop
+    # mode. CEF threads call CEF directly, the same as without that
+    # mode.
+    if not IsMultiThreadedMessageLoop() or IsThread(TID_UI):
+        return False
+    for threadId in g_browserProcessThreads:
+        if IsThread(threadId):
+            return False
+    return True
+
+cdef object CallOnUiThread(py_string funcName, object func, tuple args):
+    # Posts func to the UI thread and waits for it to finish. Allowed
+    # only from threads that are not CEF threads, a CEF thread waiting
+    # for the UI thread could deadlock.
+    cdef UiThreadCall call
+    if IsThread(TID_UI):
+        return func(*args)
+    for threadId in g_browserProcessThreads:
+        if IsThread(threadId):
+            raise Exception("%s failed: may only be called on the UI "
+                    "thread or on an application thread" % funcName)
+    IF UNAME_SYSNAME == "Linux":
+        if not IsUiThreadRunning():
+            # The task would never run.
+            raise Exception("%s failed: CEF is not initialized" % funcName)
+    call = UiThreadCall()
+    call.func = func
+    call.args = args
+    call.done = threading.Event()
+    PostPythonTask(TID_UI, call.Run, [])
+    # Event.wait() releases the GIL.
+    call.done.wait()
+    if call.excInfo:
+        raise call.excInfo[1]
+    return call.result
+
+IF UNAME_SYSNAME == "Linux":
+
+    # On Linux CEF runs in the single threaded mode on a thread started
+    # by Initialize(). That thread calls CefInitialize(), runs the CEF
+    # message loop and calls CefShutdown(), which must be called on the
+    # thread that initialized CEF.
+    cdef object g_uiThread = None
+
+    def RunUiThread(object applicationSettings, list result,
+            object initialized):
+        cdef CefRefPtr[CefApp] cefApp = <CefRefPtr[CefApp]?>new CefPythonApp()
+        cdef CefMainArgs cefMainArgs
+        cdef CefSettings cefApplicationSettings
+        cdef cpp_bool ret = False
+        try:
+            cefApplicationSettings.no_sandbox = 1
+            SetApplicationSettings(applicationSettings,
+                    &cefApplicationSettings)
+            cefApplicationSettings.multi_threaded_message_loop = 0
+            Debug("CefInitialize() on the UI thread")
+            with nogil:
+                ret = CefInitialize(cefMainArgs, cefApplicationSettings,
+                        cefApp, NULL)
+        except:
+            (exc_type, exc_value, exc_trace) = sys.exc_info()
+            sys.excepthook(exc_type, exc_value, exc_trace)
+        finally:
+            result.append(ret)
+            initialized.set()
+        if not ret:
+            return
+        with nogil:
+            CefRunMessageLoop()
+            CefShutdown()
+        Debug("CefShutdown() on the UI thread done")
+
+    cdef py_bool StartUiThread(object applicationSettings):
+        # Returns the result of CefInitialize().
+        global g_uiThread
+        cdef list result = []
+        initialized = threading.Event()
+        g_uiThread = threading.Thread(target=RunUiThread,
+                name="CefUiThread",
+                args=(applicationSettings, result, initialized))
+        # Does not keep the application alive when Shutdown() was not
+        # called.
+        g_uiThread.daemon = True
+        g_uiThread.start()
+        initialized.wait()
+        if not result[0]:
+            g_uiThread.join()
+            g_uiThread = None
+            return False
+        return True
+
+    cdef void StopUiThread() except *:
+        global g_uiThread
+        if g_uiThread is None:
+            return
+        PostPythonTask(TID_UI, QuitMessageLoop, [])
+        # Thread.join() releases the GIL.
+        g_uiThread.join()
+        g_uiThread = None
+
+    cdef py_bool IsUiThreadRunning():
+        return g_uiThread is not None
@@ -17,9 +17,9 @@ cdef public void DisplayHandler_OnAddressChange(
         pyBrowser = GetPyBrowser(cefBrowser)
         pyFrame = GetPyFrame(cefFrame)
         pyUrl = CefToPyString(cefUrl)
-        callback = pyBrowser.GetClientCallback("OnAddressChange")
+        callback = pyBrowser.clientCallbackSlots[CB_OnAddressChange]
         if callback:
-            callback(pyBrowser, pyFrame, pyUrl)
+            DispatchClientCallback(callback, (pyBrowser, pyFrame, pyUrl))
     except:
         (exc_type, exc_value, exc_trace) = sys.exc_info()
         sys.excepthook(exc_type, exc_value, exc_trace)
@@ -34,9 +34,9 @@ cdef public void DisplayHandler_OnTitleChange(
     try:
         pyBrowser = GetPyBrowser(cefBrowser)
         pyTitle = CefToPyString(cefTitle)
-        callback = pyBrowser.GetClientCallback("OnTitleChange")
+        callback = pyBrowser.clientCallbackSlots[CB_OnTitleChange]
         if callback:
-            callback(pyBrowser, pyTitle)
+            DispatchClientCallback(callback, (pyBrowser, pyTitle))
     except:
         (exc_type, exc_value, exc_trace) = sys.exc_info()
         sys.excepthook(exc_type, exc_value, exc_trace)
@@ -54,7 +54,7 @@ cdef public cpp_bool DisplayHandler_OnTooltip(
         pyBrowser = GetPyBrowser(cefBrowser)
         pyText = CefToPyString(cefText)
         pyTextOut = [pyText]
-        callback = pyBrowser.GetClientCallback("OnTooltip")
+        callback = pyBrowser.clientCallbackSlots[CB_OnTooltip]
         if callback:
             returnValue = callback(pyBrowser, pyTextOut)
             # pyText and pyTextOut[0] are not the same strings!
@@ -75,9 +75,9 @@ cdef public void DisplayHandler_OnStatusMessage(
     try:
         pyBrowser = GetPyBrowser(cefBrowser)
         pyValue = CefToPyString(cefValue)
-        callback = pyBrowser.GetClientCallback("OnStatusMessage")
+        callback = pyBrowser.clientCallbackSlots[CB_OnStatusMessage]
         if callback:
-            callback(pyBrowser, pyValue)
+            DispatchClientCallback(callback, (pyBrowser, pyValue))
     except:
         (exc_type, exc_value, exc_trace) = sys.exc_info()
         sys.excepthook(exc_type, exc_value, exc_trace)
@@ -97,7 +97,7 @@ cdef public cpp_bool DisplayHandler_OnConsoleMessage(
         pyBrowser = GetPyBrowser(cefBrowser)
         pyMessage = CefToPyString(cefMessage)
         pySource = CefToPyString(cefSource)
-        callback = pyBrowser.GetClientCallback("OnConsoleMessage")
+        callback = pyBrowser.clientCallbackSlots[CB_OnConsoleMessage]
         if callback:
             returnValue = callback(pyBrowser, pyMessage, pySource, line)
             return bool(returnValue)
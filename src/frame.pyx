@@ -4,16 +4,14 @@
 
 include "cefpython.pyx"
 
+# browserId -> {frameId: PyFrame}
 cdef dict g_pyFrames = {}
 
-cdef object GetUniqueFrameId(int browserId, object frameId):
-    return str(browserId) +"#"+ str(frameId)
-
-cdef PyFrame GetPyFrameById(int browserId, object frameId):
-    cdef object uniqueFrameId = GetUniqueFrameId(browserId, frameId)
-    if uniqueFrameId in g_pyFrames:
-        return g_pyFrames[uniqueFrameId]
-    return None
+cdef PyFrame GetPyFrameById(int browserId, int64 frameId):
+    cdef dict browserFrames = g_pyFrames.get(browserId)
+    if browserFrames is None:
+        return None
+    return browserFrames.get(frameId)
 
 cdef PyFrame GetPyFrame(CefRefPtr[CefFrame] cefFrame):
     global g_pyFrames
@@ -21,51 +19,60 @@ cdef PyFrame GetPyFrame(CefRefPtr[CefFrame] cefFrame):
         Debug("GetPyFrame(): returning None")
         return
     cdef PyFrame pyFrame
-    # long long
-    cdef object frameId = cefFrame.get().GetIdentifier()
+    cdef int64 frameId = cefFrame.get().GetIdentifier()
     cdef int browserId = cefFrame.get().GetBrowser().get().GetIdentifier()
     assert (frameId and browserId), "frameId or browserId empty"
-    cdef object uniqueFrameId = GetUniqueFrameId(browserId, frameId)
-    if uniqueFrameId in g_pyFrames:
-        return g_pyFrames[uniqueFrameId]
-    for uFid, pyFrame in g_pyFrames.items():
-        if not pyFrame.cefFrame.get():
-            Debug("GetPyFrame(): removing an empty CefFrame reference, " \
-                    "uniqueFrameId = %s" % uniqueFrameId)
-            del g_pyFrames[uFid]
+    cdef dict browserFrames = g_pyFrames.get(browserId)
+    if browserFrames is None:
+        browserFrames = {}
+        g_pyFrames[browserId] = browserFrames
+    else:
+        pyFrame = browserFrames.get(frameId)
+        if pyFrame is not None:
+            return pyFrame
+    # Frames are removed in RemovePyFrame() when the frame's context
+    # is released and in RemovePyFramesForBrowser() when the browser
+    # is closed, there is no need to look for dead frames here.
     # Debug("GetPyFrame(): creating new PyFrame, frameId=%s" % frameId)
     pyFrame = PyFrame(browserId, frameId)
     pyFrame.cefFrame = cefFrame
-    g_pyFrames[uniqueFrameId] = pyFrame
+    pyFrame.created = time.time()
+    browserFrames[frameId] = pyFrame
     return pyFrame
 
-cdef void RemovePyFrame(int browserId, object frameId) except *:
+cdef void RemovePyFrame(int browserId, int64 frameId) except *:
     # Called from V8ContextHandler_OnContextReleased().
     global g_pyFrames
-    cdef object uniqueFrameId = GetUniqueFrameId(browserId, frameId)
-    if uniqueFrameId in g_pyFrames:
-        Debug("del g_pyFrames[%s]" % uniqueFrameId)
-        del g_pyFrames[uniqueFrameId]
+    cdef dict browserFrames = g_pyFrames.get(browserId)
+    if browserFrames is not None and frameId in browserFrames:
+        Debug("RemovePyFrame(): browserId = %s, frameId = %s" \
+                % (browserId, frameId))
+        del browserFrames[frameId]
+        if not browserFrames:
+            del g_pyFrames[browserId]
     else:
-        Debug("RemovePyFrame() FAILED: uniqueFrameId = %s" % uniqueFrameId)
+        Debug("RemovePyFrame() FAILED: browserId = %s, frameId = %s" \
+                % (browserId, frameId))
 
 cdef void RemovePyFramesForBrowser(int browserId) except *:
     # Called from LifespanHandler_BeforeClose().
-    cdef list toRemove = []
-    cdef object uniqueFrameId
-    cdef PyFrame pyFrame
     global g_pyFrames
-    for uniqueFrameId, pyFrame in g_pyFrames.iteritems():
-        if pyFrame.GetBrowserIdentifier() == browserId:
-            toRemove.append(uniqueFrameId)
-    for uniqueFrameId in toRemove:
-        Debug("del g_pyFrames[%s]" % uniqueFrameId)
-        del g_pyFrames[uniqueFrameId]
+    cdef dict browserFrames = g_pyFrames.pop(browserId, None)
+    if browserFrames:
+        Debug("RemovePyFramesForBrowser(): browserId = %s, frames = %s" \
+                % (browserId, len(browserFrames)))
+
+cdef py_string GetJavascriptFunctionCall(py_string funcName, tuple args):
+    # Used by Frame.ExecuteFunction() and cefpython.Broadcast().
+    return funcName + "(" + ", ".join([json.dumps(arg) for arg in args]) \
+            + ")"
 
 cdef class PyFrame:
     cdef CefRefPtr[CefFrame] cefFrame
     cdef int browserId
     cdef object frameId
+    # Creation time, see CheckObjectRegistries().
+    cdef double created
 
     cdef CefRefPtr[CefFrame] GetCefFrame(self) except *:
         # Do not call IsValid() here, if the frame does not exist
@@ -80,6 +87,8 @@ cdef class PyFrame:
         self.frameId = frameId
 
     cpdef py_bool IsValid(self):
+        if ShouldCallOnUiThread():
+            return CallOnUiThread("Frame.IsValid()", self.IsValid, ())
         if <void*>self.cefFrame != NULL and self.cefFrame.get() \
                 and self.cefFrame.get().IsValid():
             return True
@@ -90,29 +99,47 @@ cdef class PyFrame:
         self.ExecuteFunction(*args)
 
     cpdef py_void Copy(self):
+        if ShouldCallOnUiThread():
+            return CallOnUiThread("Frame.Copy()", self.Copy, ())
         self.GetCefFrame().get().Copy()
 
     cpdef py_void Cut(self):
+        if ShouldCallOnUiThread():
+            return CallOnUiThread("Frame.Cut()", self.Cut, ())
         self.GetCefFrame().get().Cut()
 
     cpdef py_void Delete(self):
+        if ShouldCallOnUiThread():
+            return CallOnUiThread("Frame.Delete()", self.Delete, ())
         self.GetCefFrame().get().Delete()
 
+    def CallFunctionAsync(self, py_string funcName, *args):
+        # Arguments are passed as CEF values, not as javascript source.
+        if ShouldCallOnUiThread():
+            return CallOnUiThread("Frame.CallFunctionAsync()",
+                    self.CallFunctionAsync, (funcName,) + args)
+        return PutJavascriptEvaluation(self, "CallFunctionAsync",
+                [funcName, list(args)])
+
+    cpdef object EvaluateJavascript(self, py_string jsCode):
+        if ShouldCallOnUiThread():
+            return CallOnUiThread("Frame.EvaluateJavascript()",
+                    self.EvaluateJavascript, (jsCode,))
+        return PutJavascriptEvaluation(self, "EvaluateJavascript", [jsCode])
+
     def ExecuteFunction(self, funcName, *args):
         # No need to enter V8 context as we're calling javascript
         # asynchronously using ExecuteJavascript() function.
-        code = funcName+"("
-        for i in range(0, len(args)):
-            if i != 0:
-                code += ", "
-            code += json.dumps(args[i])
-        code += ")"
-        self.ExecuteJavascript(code)
+        self.ExecuteJavascript(GetJavascriptFunctionCall(funcName, args))
 
     cpdef py_void ExecuteJavascript(self, py_string jsCode,
             py_string scriptUrl="", int startLine=0):
+        if ShouldCallOnUiThread():
+            return CallOnUiThread("Frame.ExecuteJavascript()",
+                    self.ExecuteJavascript, (jsCode, scriptUrl, startLine))
         self.GetCefFrame().get().ExecuteJavaScript(PyToCefStringValue(jsCode),
                 PyToCefStringValue(scriptUrl), startLine)
+        ScheduleMessagePumpWork()
 
     cpdef object GetIdentifier(self):
         # It is better to save browser and frame identifiers during
@@ -123,33 +150,53 @@ cdef class PyFrame:
         return self.frameId
 
     cpdef PyFrame GetParent(self):
+        if ShouldCallOnUiThread():
+            return CallOnUiThread("Frame.GetParent()", self.GetParent, ())
         return GetPyFrame(self.GetCefFrame().get().GetParent())
 
     cpdef PyBrowser GetBrowser(self):
+        if ShouldCallOnUiThread():
+            return CallOnUiThread("Frame.GetBrowser()", self.GetBrowser, ())
         return GetPyBrowser(self.GetCefFrame().get().GetBrowser())
 
     cpdef int GetBrowserIdentifier(self) except *:
         return self.browserId
 
     cpdef str GetName(self):
+        if ShouldCallOnUiThread():
+            return CallOnUiThread("Frame.GetName()", self.GetName, ())
         return CefToPyString(self.GetCefFrame().get().GetName())
 
     cpdef py_void GetSource(self, object visitor):
+        if ShouldCallOnUiThread():
+            return CallOnUiThread("Frame.GetSource()",
+                    self.GetSource, (visitor,))
         self.GetCefFrame().get().GetSource(CreateStringVisitor(visitor))
 
     cpdef py_void GetText(self, object visitor):
+        if ShouldCallOnUiThread():
+            return CallOnUiThread("Frame.GetText()", self.GetText, (visitor,))
         self.GetCefFrame().get().GetText(CreateStringVisitor(visitor))
 
     cpdef str GetUrl(self):
+        if ShouldCallOnUiThread():
+            return CallOnUiThread("Frame.GetUrl()", self.GetUrl, ())
         return CefToPyString(self.GetCefFrame().get().GetURL())
 
     cpdef py_bool IsFocused(self):
+        if ShouldCallOnUiThread():
+            return CallOnUiThread("Frame.IsFocused()", self.IsFocused, ())
         return self.GetCefFrame().get().IsFocused()
 
     cpdef py_bool IsMain(self):
+        if ShouldCallOnUiThread():
+            return CallOnUiThread("Frame.IsMain()", self.IsMain, ())
         return self.GetCefFrame().get().IsMain()
 
     cpdef py_void LoadString(self, py_string value, py_string url):
+        if ShouldCallOnUiThread():
+            return CallOnUiThread("Frame.LoadString()",
+                    self.LoadString, (value, url))
         cdef CefString cefValue
         cdef CefString cefUrl
         PyToCefString(value, cefValue)
@@ -157,22 +204,35 @@ cdef class PyFrame:
         self.GetCefFrame().get().LoadString(cefValue, cefUrl)
 
     cpdef py_void LoadUrl(self, py_string url):
+        if ShouldCallOnUiThread():
+            return CallOnUiThread("Frame.LoadUrl()", self.LoadUrl, (url,))
         url = GetNavigateUrl(url)
         cdef CefString cefUrl
         PyToCefString(url, cefUrl)
         self.GetCefFrame().get().LoadURL(cefUrl)
+        ScheduleMessagePumpWork()
 
     cpdef py_void Paste(self):
+        if ShouldCallOnUiThread():
+            return CallOnUiThread("Frame.Paste()", self.Paste, ())
         self.GetCefFrame().get().Paste()
 
     cpdef py_void Redo(self):
+        if ShouldCallOnUiThread():
+            return CallOnUiThread("Frame.Redo()", self.Redo, ())
         self.GetCefFrame().get().Redo()
 
     cpdef py_void SelectAll(self):
+        if ShouldCallOnUiThread():
+            return CallOnUiThread("Frame.SelectAll()", self.SelectAll, ())
         self.GetCefFrame().get().SelectAll()
 
     cpdef py_void Undo(self):
+        if ShouldCallOnUiThread():
+            return CallOnUiThread("Frame.Undo()", self.Undo, ())
         self.GetCefFrame().get().Undo()
 
     cpdef py_void ViewSource(self):
+        if ShouldCallOnUiThread():
+            return CallOnUiThread("Frame.ViewSource()", self.ViewSource, ())
         self.GetCefFrame().get().ViewSource()
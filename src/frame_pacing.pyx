@@ -0,0 +1,69 @@
+# Copyright (c) 2012-2014 The CEF Python authors. All rights reserved.
+# License: New BSD License.
+# Website: http://code.google.com/p/cefpython/
+
+# Adaptive windowless frame rate. The time the OnPaint callback takes
+# to process a frame is averaged and the frame rate of the browser
+# is lowered when the consumer can't keep up, so that CEF does not
+# render frames that would be dropped. The frame rate never exceeds
+# the display's refresh rate. See Browser.SetAdaptiveFrameRate().
+
+include "cefpython.pyx"
+
+# Weight of a new sample in the moving average of the paint time.
+DEF PAINT_TIME_SMOOTHING = 0.1
+# Fraction of the frame interval the OnPaint callback may use.
+DEF PAINT_TIME_BUDGET = 0.8
+# Seconds between frame rate changes.
+DEF FRAME_RATE_ADJUST_INTERVAL = 0.5
+DEF MAX_WINDOWLESS_FRAME_RATE = 60
+
+cdef class FramePacer:
+    cdef int maxFrameRate
+    cdef int refreshRate
+    cdef int frameRate
+    cdef double paintTime
+    cdef double lastAdjustment
+
+    cdef int GetTargetFrameRate(self) except *:
+        cdef int limit = min(self.maxFrameRate, self.refreshRate,
+                MAX_WINDOWLESS_FRAME_RATE)
+        if self.paintTime <= 0:
+            return limit
+        return max(1, min(limit, <int>(PAINT_TIME_BUDGET / self.paintTime)))
+
+    cdef void Record(self, PyBrowser pyBrowser, double elapsed) except *:
+        cdef double now
+        cdef int target
+        if self.paintTime:
+            self.paintTime += PAINT_TIME_SMOOTHING \
+                    * (elapsed - self.paintTime)
+        else:
+            self.paintTime = elapsed
+        now = ProfilerClock()
+        if now - self.lastAdjustment < FRAME_RATE_ADJUST_INTERVAL:
+            return
+        target = self.GetTargetFrameRate()
+        # Changes of 1 fps are ignored to not change the rate on every
+        # adjustment, except when reaching the limits.
+        if target == self.frameRate or (abs(target - self.frameRate) < 2
+                and target != 1 and target != min(self.maxFrameRate,
+                        self.refreshRate, MAX_WINDOWLESS_FRAME_RATE)):
+            return
+        self.lastAdjustment = now
+        self.frameRate = target
+        if pyBrowser.throttleState == THROTTLE_ACTIVE:
+            pyBrowser.GetCefBrowserHost().get().SetWindowlessFrameRate(
+                    target)
+        else:
+            # Applied when the browser is unthrottled.
+            pyBrowser.unthrottledFrameRate = target
+
+    cdef dict GetState(self):
+        return {
+            "enabled": True,
+            "frameRate": self.frameRate,
+            "maxFrameRate": self.maxFrameRate,
+            "refreshRate": self.refreshRate,
+            "paintTime": self.paintTime,
+        }
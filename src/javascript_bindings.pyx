@@ -84,6 +84,9 @@ cdef class JavascriptBindings:
 
     cpdef py_void Rebind(self):
         # Rebind() is called for both first-time binding and rebinding.
+        if ShouldCallOnUiThread():
+            return CallOnUiThread("JavascriptBindings.Rebind()",
+                    self.Rebind, ())
         cdef PyBrowser pyBrowser
         cdef dict functions
         cdef dict properties
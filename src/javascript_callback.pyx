@@ -4,6 +4,89 @@
 
 include "cefpython.pyx"
 
+# Releases of callbacks that were garbage collected, (browserId, frameId,
+# callbackId) tuples. __dealloc__ may run on any thread and during
+# shutdown, so it doesn't send process messages, the releases are sent
+# by a task on the UI thread. Both globals are only accessed with the
+# GIL held and without calling Python code in between, no lock is taken
+# as __dealloc__ may run while the flushing thread holds it.
+cdef list g_pendingJavascriptCallbackReleases = []
+cdef py_bool g_javascriptCallbackReleaseScheduled = False
+
+cdef void QueueJavascriptCallbackRelease(int browserId, object frameId,
+        int callbackId) except *:
+    global g_javascriptCallbackReleaseScheduled
+    if browserId not in g_pyBrowsers:
+        # Browser was closed, the callbacks in the Renderer process
+        # were removed along with the frames.
+        return
+    g_pendingJavascriptCallbackReleases.append(
+            (browserId, frameId, callbackId))
+    if not g_javascriptCallbackReleaseScheduled:
+        g_javascriptCallbackReleaseScheduled = True
+        PostPythonTask(TID_UI, ReleasePendingJavascriptCallbacks, [])
+
+def ReleasePendingJavascriptCallbacks():
+    global g_pendingJavascriptCallbackReleases
+    global g_javascriptCallbackReleaseScheduled
+    cdef list releases = g_pendingJavascriptCallbackReleases
+    cdef PyBrowser pyBrowser
+    g_pendingJavascriptCallbackReleases = []
+    g_javascriptCallbackReleaseScheduled = False
+    for (browserId, frameId, callbackId) in releases:
+        pyBrowser = GetPyBrowserById(browserId)
+        if pyBrowser:
+            pyBrowser.SendProcessMessage(cef_types.PID_RENDERER, frameId,
+                    "ReleaseJavascriptCallback", [callbackId])
+
+# Stats of the javascript functions kept alive in Renderer processes,
+# reported with the "JavascriptCallbackStats" process message, see
+# subprocess/javascript_callback.cpp. processId -> dict.
+cdef dict g_rendererJavascriptCallbackStats = {}
+
+cdef public void JavascriptCallback_OnRendererStats(
+        int processId,
+        int live,
+        int created,
+        int deduplicated,
+        int released,
+        int evicted
+        ) except * with gil:
+    try:
+        g_rendererJavascriptCallbackStats[processId] = {
+            "live": live,
+            "created": created,
+            "deduplicated": deduplicated,
+            "released": released,
+            "evicted": evicted,
+        }
+    except:
+        (exc_type, exc_value, exc_trace) = sys.exc_info()
+        sys.excepthook(exc_type, exc_value, exc_trace)
+
+cpdef dict GetJavascriptCallbackStats():
+    # Renderer processes that no longer host a browser are forgotten,
+    # the last stats they sent may predate the release of their frames.
+    cdef dict rendererBrowserIds = GetRendererBrowserIds()
+    cdef dict stats = {
+        "live": 0,
+        "created": 0,
+        "deduplicated": 0,
+        "released": 0,
+        "evicted": 0,
+        "processes": 0,
+    }
+    cdef dict processStats
+    for processId in list(g_rendererJavascriptCallbackStats):
+        if processId not in rendererBrowserIds:
+            del g_rendererJavascriptCallbackStats[processId]
+            continue
+        processStats = g_rendererJavascriptCallbackStats[processId]
+        for key in processStats:
+            stats[key] += processStats[key]
+        stats["processes"] += 1
+    return stats
+
 cdef JavascriptCallback CreateJavascriptCallback(int callbackId,
         CefRefPtr[CefBrowser] cefBrowser, object frameId, py_string functionName):
     # frameId is int64
@@ -20,10 +103,31 @@ cdef class JavascriptCallback:
     cdef int callbackId
     cdef PyFrame frame
     cdef py_string functionName
+    cdef cpp_bool released
+
+    def __cinit__(self):
+        global g_javascriptCallbackCount
+        g_javascriptCallbackCount += 1
+
+    def __dealloc__(self):
+        global g_javascriptCallbackCount
+        g_javascriptCallbackCount -= 1
+        # The js function is kept alive in the Renderer process until
+        # this object is released, or until the frame's context is
+        # released.
+        if not self.released and self.frame:
+            self.released = True
+            QueueJavascriptCallbackRelease(self.frame.GetBrowserIdentifier(),
+                    self.frame.GetIdentifier(), self.callbackId)
 
     def Call(self, *args):
         # Send process message "ExecuteJavascriptCallback".
-        if self.frame:
+        if ShouldCallOnUiThread():
+            return CallOnUiThread("JavascriptCallback.Call()", self.Call, args)
+        if self.released:
+            Debug("JavascriptCallback.Call() FAILED: callback was " \
+                    "released, callbackId = %s" % self.callbackId)
+        elif self.frame:
             browser = self.frame.GetBrowser()
             if browser:
                 browser.SendProcessMessage(
@@ -38,6 +142,26 @@ cdef class JavascriptCallback:
             Debug("JavascriptCallback.Call() FAILED: frame not found, " \
                     "callbackId = %s" % self.callbackId)
 
+    def Release(self):
+        # Send process message "ReleaseJavascriptCallback".
+        if ShouldCallOnUiThread():
+            return CallOnUiThread("JavascriptCallback.Release()",
+                    self.Release, ())
+        if self.released:
+            return
+        self.released = True
+        if not self.frame:
+            return
+        if self.frame.GetBrowserIdentifier() not in g_pyBrowsers:
+            # Browser was closed, the callbacks in the Renderer process
+            # were removed along with the frames.
+            return
+        self.frame.GetBrowser().SendProcessMessage(
+                cef_types.PID_RENDERER,
+                self.frame.GetIdentifier(),
+                "ReleaseJavascriptCallback",
+                [self.callbackId])
+
     def GetFunctionName(self):
         return self.functionName
 
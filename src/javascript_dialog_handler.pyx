@@ -55,7 +55,7 @@ cdef public cpp_bool JavascriptDialogHandler_OnJavascriptDialog(
         pyCallback = CreatePyJavascriptDialogCallback(callback)
         pySuppressMessage = [bool(suppress_message)]
         
-        clientCallback = pyBrowser.GetClientCallback("OnJavascriptDialog")
+        clientCallback = pyBrowser.clientCallbackSlots[CB_OnJavascriptDialog]
         if clientCallback:
             returnValue = clientCallback(pyBrowser, pyOriginUrl,
                     dialog_type, pyMessageText, pyDefaultPromptText,
@@ -86,8 +86,8 @@ cdef public cpp_bool JavascriptDialogHandler_OnBeforeUnloadJavascriptDialog(
         pyIsReload = bool(is_reload)
         pyCallback = CreatePyJavascriptDialogCallback(callback)
 
-        clientCallback = pyBrowser.GetClientCallback(
-                "OnBeforeUnloadJavascriptDialog")
+        clientCallback = pyBrowser.clientCallbackSlots[
+                CB_OnBeforeUnloadJavascriptDialog]
         if clientCallback:
             returnValue = clientCallback(pyBrowser, pyMessageText, pyIsReload,
                     pyCallback)
@@ -103,10 +103,10 @@ cdef public void JavascriptDialogHandler_OnResetJavascriptDialogState(
     cdef PyBrowser pyBrowser
     try:
         pyBrowser = GetPyBrowser(cefBrowser)
-        callback = pyBrowser.GetClientCallback(
-                "OnResetJavascriptDialogState")
+        callback = pyBrowser.clientCallbackSlots[
+                CB_OnResetJavascriptDialogState]
         if callback:
-            callback(pyBrowser)
+            DispatchClientCallback(callback, (pyBrowser,))
     except:
         (exc_type, exc_value, exc_trace) = sys.exc_info()
         sys.excepthook(exc_type, exc_value, exc_trace)
@@ -117,9 +117,9 @@ cdef public void JavascriptDialogHandler_OnJavascriptDialogClosed(
     cdef PyBrowser pyBrowser
     try:
         pyBrowser = GetPyBrowser(cefBrowser)
-        callback = pyBrowser.GetClientCallback("OnJavascriptDialogClosed")
+        callback = pyBrowser.clientCallbackSlots[CB_OnJavascriptDialogClosed]
         if callback:
-            callback(pyBrowser)
+            DispatchClientCallback(callback, (pyBrowser,))
     except:
         (exc_type, exc_value, exc_trace) = sys.exc_info()
         sys.excepthook(exc_type, exc_value, exc_trace)
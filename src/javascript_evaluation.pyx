@@ -0,0 +1,92 @@
+# Copyright (c) 2012-2014 The CEF Python authors. All rights reserved.
+# License: New BSD License.
+# Website: http://code.google.com/p/cefpython/
+
+# Frame.EvaluateJavascript() and Frame.CallFunctionAsync() send a single
+# process message to the Renderer process, which evaluates the code and
+# sends back the "EvaluateJavascriptResult" message. Futures are kept
+# here until the result arrives, or until the frame or browser are
+# released.
+
+include "cefpython.pyx"
+
+cdef int g_javascriptEvaluationMaxId = 0
+# requestId -> JavascriptEvaluation
+cdef dict g_javascriptEvaluations = {}
+
+class JavascriptError(Exception):
+    pass
+
+cdef class JavascriptEvaluation:
+    cdef int requestId
+    cdef int browserId
+    cdef object frameId
+    cdef object future
+    cdef double created
+
+cdef object CreateFuture():
+    if not concurrent_futures:
+        raise Exception("Creating a future failed: the concurrent.futures "
+                "module is not available. On Python 2 install the "
+                "\"futures\" package.")
+    return concurrent_futures.Future()
+
+cdef object PutJavascriptEvaluation(PyFrame pyFrame,
+        py_string messageName, list arguments):
+    global g_javascriptEvaluationMaxId
+    cdef JavascriptEvaluation evaluation = JavascriptEvaluation()
+    cdef PyBrowser pyBrowser = pyFrame.GetBrowser()
+    evaluation.future = CreateFuture()
+    evaluation.created = time.time()
+    g_javascriptEvaluationMaxId += 1
+    evaluation.requestId = g_javascriptEvaluationMaxId
+    evaluation.browserId = pyBrowser.GetIdentifier()
+    evaluation.frameId = pyFrame.GetIdentifier()
+    g_javascriptEvaluations[evaluation.requestId] = evaluation
+    try:
+        pyBrowser.SendProcessMessage(cef_types.PID_RENDERER,
+                evaluation.frameId, messageName,
+                [evaluation.requestId, evaluation.frameId] + arguments)
+    except:
+        del g_javascriptEvaluations[evaluation.requestId]
+        raise
+    evaluation.future.set_running_or_notify_cancel()
+    return evaluation.future
+
+cdef public void JavascriptEvaluation_OnResult(
+        CefRefPtr[CefBrowser] cefBrowser,
+        int requestId,
+        cpp_bool success,
+        CefRefPtr[CefListValue] cefResult,
+        const CefString& cefError
+        ) except * with gil:
+    cdef JavascriptEvaluation evaluation
+    cdef list result
+    try:
+        evaluation = g_javascriptEvaluations.pop(requestId, None)
+        if evaluation is None:
+            Debug("JavascriptEvaluation_OnResult() WARNING: request not " \
+                    "found, requestId = %s" % requestId)
+            return
+        if success:
+            result = CefListValueToPyList(cefBrowser, cefResult)
+            evaluation.future.set_result(result[0] if result else None)
+        else:
+            evaluation.future.set_exception(JavascriptError(
+                    CefToPyString(cefError)))
+    except:
+        (exc_type, exc_value, exc_trace) = sys.exc_info()
+        sys.excepthook(exc_type, exc_value, exc_trace)
+
+cdef void RejectJavascriptEvaluations(int browserId, object frameId,
+        py_string reason) except *:
+    # frameId None means all frames in the browser.
+    cdef JavascriptEvaluation evaluation
+    for requestId in list(g_javascriptEvaluations):
+        evaluation = g_javascriptEvaluations[requestId]
+        if evaluation.browserId == browserId \
+                and (frameId is None or evaluation.frameId == frameId):
+            del g_javascriptEvaluations[requestId]
+            evaluation.future.set_exception(JavascriptError(reason))
+            Debug("RejectJavascriptEvaluations(): %s, requestId = %s" \
+                    % (reason, requestId))
@@ -57,7 +57,7 @@ cdef public cpp_bool KeyboardHandler_OnPreKeyEvent(
         pyBrowser = GetPyBrowser(cefBrowser)
         pyEvent = CefToPyKeyEvent(cefEvent)
         pyIsKeyboardShortcutOut = [cefIsKeyboardShortcut[0]]
-        callback = pyBrowser.GetClientCallback("OnPreKeyEvent")
+        callback = pyBrowser.clientCallbackSlots[CB_OnPreKeyEvent]
         if callback:
             returnValue = callback(pyBrowser, pyEvent, 
                     <object>PyLong_FromVoidPtr(cefEventHandle),
@@ -82,7 +82,7 @@ cdef public cpp_bool KeyboardHandler_OnKeyEvent(
     try:
         pyBrowser = GetPyBrowser(cefBrowser)
         pyEvent = CefToPyKeyEvent(cefEvent)
-        callback = pyBrowser.GetClientCallback("OnKeyEvent")
+        callback = pyBrowser.clientCallbackSlots[CB_OnKeyEvent]
         if callback:
             returnValue = callback(pyBrowser, pyEvent,
                     <object>PyLong_FromVoidPtr(cefEventHandle))
@@ -54,7 +54,7 @@ cdef public cpp_bool LifespanHandler_OnBeforePopup(
         pyNoJavascriptAccess = [noJavascriptAccess[0]]
         pyWindowInfo = []
         pyBrowserSettings = []
-        callback = pyBrowser.GetClientCallback("OnBeforePopup")
+        callback = pyBrowser.clientCallbackSlots[CB_OnBeforePopup]
         if callback:
             returnValue = bool(callback(pyBrowser, pyFrame, pyTargetUrl,
                     pyTargetFrameName, targetDisposition, userGesture, None,
@@ -77,6 +77,8 @@ cdef public void LifespanHandler_OnAfterCreated(
     cdef PyBrowser pyBrowser
     try:
         pyBrowser = GetPyBrowser(cefBrowser)
+        # Window handle may not be available when PyBrowser is created.
+        IndexPyBrowser(pyBrowser)
         callback = GetGlobalClientCallback("OnAfterCreated")
         if callback:
             callback(pyBrowser)
@@ -90,7 +92,7 @@ cdef public cpp_bool LifespanHandler_DoClose(
     cdef PyBrowser pyBrowser
     try:
         pyBrowser = GetPyBrowser(cefBrowser)
-        callback = pyBrowser.GetClientCallback("DoClose")
+        callback = pyBrowser.clientCallbackSlots[CB_DoClose]
         if callback:
             return bool(callback(pyBrowser))
         return False
@@ -105,10 +107,12 @@ cdef public void LifespanHandler_OnBeforeClose(
     cdef object callback
     try:
         pyBrowser = GetPyBrowser(cefBrowser)
-        callback = pyBrowser.GetClientCallback("OnBeforeClose")
+        callback = pyBrowser.clientCallbackSlots[CB_OnBeforeClose]
         if callback:
             callback(pyBrowser)
         RemovePythonCallbacksForBrowser(pyBrowser.GetIdentifier())
+        RejectJavascriptEvaluations(pyBrowser.GetIdentifier(), None,
+                "browser was closed")
         RemovePyFramesForBrowser(pyBrowser.GetIdentifier())
         RemovePyBrowser(pyBrowser.GetIdentifier())
     except:
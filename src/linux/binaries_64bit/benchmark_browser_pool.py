@@ -0,0 +1,104 @@
+# Time to first paint of a new browser session, with and without
+# cefpython.BrowserPool. Each session loads a page from a local HTTP
+# server in an off-screen browser, the time is measured from
+# CreateBrowserSync() or BrowserPool.Acquire() to the first OnPaint
+# of that page.
+#
+# Usage: python benchmark_browser_pool.py [sessions] [poolSize]
+
+import sys
+import time
+
+from benchmark_utils import cefpython, Initialize, CreateWindowInfo, Pump, \
+        Sleep, PaintRecorder, StaticServer, PrintTable
+
+PAGE = """<!DOCTYPE html>
+<html><body style="background: #336699">
+<h1>BrowserPool benchmark</h1>
+</body></html>
+"""
+
+
+class SessionRecorder(PaintRecorder):
+    # First paint after the main frame of the session's page started
+    # loading, paints of "about:blank" are ignored.
+
+    def __init__(self, url):
+        PaintRecorder.__init__(self)
+        self.url = url
+        self.started = set()
+
+    def GetClientCallbacks(self):
+        callbacks = PaintRecorder.GetClientCallbacks(self)
+        callbacks["OnLoadStart"] = self.OnLoadStart
+        return callbacks
+
+    def OnLoadStart(self, browser, frame):
+        if frame.IsMain() and frame.GetUrl().startswith(self.url):
+            self.started.add(browser.GetIdentifier())
+
+    def OnPaint(self, browser, element, dirtyRects, paintBuffer, width,
+            height):
+        if browser.GetIdentifier() in self.started:
+            PaintRecorder.OnPaint(self, browser, element, dirtyRects,
+                    paintBuffer, width, height)
+
+    def Reset(self, browser):
+        PaintRecorder.Reset(self, browser)
+        self.started.discard(browser.GetIdentifier())
+
+
+def RunSession(recorder, url, createBrowser, releaseBrowser):
+    start = time.time()
+    browser = createBrowser(url)
+    browser.SetClientCallbacksDict(recorder.GetClientCallbacks())
+    browserId = browser.GetIdentifier()
+    if not Pump(lambda: browserId in recorder.firstPaint):
+        raise Exception("No paint within the timeout: %s" % url)
+    elapsed = recorder.firstPaint[browserId] - start
+    recorder.Reset(browser)
+    releaseBrowser(browser)
+    return elapsed
+
+
+def Measure(name, sessions, url, createBrowser, releaseBrowser):
+    recorder = SessionRecorder(url)
+    times = []
+    for i in range(sessions):
+        times.append(RunSession(recorder, url, createBrowser,
+                                releaseBrowser))
+        # Let the pool refill and closed browsers go away, as between
+        # sessions of a real application.
+        Sleep(0.2)
+    times.sort()
+    return (name, "%.1f" % (1000 * sum(times) / len(times)),
+            "%.1f" % (1000 * times[len(times) // 2]),
+            "%.1f" % (1000 * times[-1]))
+
+
+def Main():
+    sessions = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    poolSize = int(sys.argv[2]) if len(sys.argv) > 2 else 2
+    Initialize()
+    server = StaticServer({"index.html": PAGE})
+    try:
+        cold = Measure("CreateBrowserSync", sessions, server.url,
+                lambda url: cefpython.CreateBrowserSync(CreateWindowInfo(),
+                        {}, url),
+                lambda browser: browser.CloseBrowser(True))
+        pool = cefpython.BrowserPool(poolSize, CreateWindowInfo)
+        # Let the idle browsers start their Renderer processes.
+        Sleep(2.0)
+        pooled = Measure("BrowserPool(%s)" % poolSize, sessions,
+                server.url, pool.Acquire, pool.Release)
+        pool.Close()
+        Sleep(0.5)
+        print("Time to first paint, %s sessions, milliseconds:" % sessions)
+        PrintTable([("", "mean", "median", "max"), cold, pooled])
+    finally:
+        server.Close()
+        cefpython.Shutdown()
+
+
+if __name__ == "__main__":
+    Main()
@@ -0,0 +1,140 @@
+# Cost of client callbacks in the built extension, run it with the
+# module built before and after a change to compare:
+#  - Browser.SetClientHandler() with a handler implementing the common
+#    callbacks, microseconds per call
+#  - event dispatch: the page logs console messages and changes its
+#    title in a tight loop, OnConsoleMessage and OnTitleChange are set.
+#    Reported is the CPU time of this (browser) process per callback,
+#    it includes the work CEF does for each message.
+#
+# Usage: python benchmark_dispatch.py [seconds] [number]
+
+import os
+import sys
+import timeit
+
+from benchmark_utils import cefpython, Initialize, CreateWindowInfo, Pump, \
+        Sleep, StaticServer, PrintTable, VIEW_WIDTH, VIEW_HEIGHT
+
+PAGE = """<!DOCTYPE html>
+<html><body>
+<script>
+var count = 0;
+function Burst() {
+    for (var i = 0; i < 100; i++) {
+        count++;
+        console.log("message " + count);
+        document.title = "title " + count;
+    }
+    setTimeout(Burst, 0);
+}
+Burst();
+</script>
+</body></html>
+"""
+
+
+def GetCpuTime():
+    times = os.times()
+    return times[0] + times[1]
+
+
+class ClientHandler(object):
+    # Implements the callbacks most applications set. Helpers have
+    # names starting with an underscore.
+
+    def __init__(self):
+        self._Reset()
+
+    def _Reset(self):
+        self.consoleMessages = 0
+        self.titleChanges = 0
+
+    def GetViewRect(self, browser, rect):
+        rect.extend([0, 0, VIEW_WIDTH, VIEW_HEIGHT])
+        return True
+
+    def OnPaint(self, browser, element, dirtyRects, paintBuffer, width,
+            height):
+        pass
+
+    def OnConsoleMessage(self, browser, message, source, line):
+        self.consoleMessages += 1
+        return False
+
+    def OnTitleChange(self, browser, title):
+        self.titleChanges += 1
+
+    def OnAddressChange(self, browser, frame, url):
+        pass
+
+    def OnLoadingStateChange(self, browser, isLoading, canGoBack,
+            canGoForward):
+        pass
+
+    def OnLoadStart(self, browser, frame):
+        pass
+
+    def OnLoadEnd(self, browser, frame, httpStatusCode):
+        pass
+
+    def OnLoadError(self, browser, frame, errorCode, errorTextList,
+            failedUrl):
+        pass
+
+    def OnBeforePopup(self, browser, frame, targetUrl, targetFrameName,
+            popupFeatures, windowInfo, client, browserSettings,
+            noJavascriptAccess):
+        return True
+
+    def OnBeforeResourceLoad(self, browser, frame, request):
+        return False
+
+    def OnBeforeClose(self, browser):
+        pass
+
+
+def MeasureSetClientHandler(browser, handler, number):
+    timer = timeit.Timer(lambda: browser.SetClientHandler(handler))
+    return min(timer.repeat(repeat=5, number=number)) / number
+
+
+def MeasureDispatch(handler, seconds):
+    handler._Reset()
+    cpuStart = GetCpuTime()
+    Sleep(seconds)
+    cpu = GetCpuTime() - cpuStart
+    calls = handler.consoleMessages + handler.titleChanges
+    return (cpu, calls)
+
+
+def Main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 10.0
+    number = int(sys.argv[2]) if len(sys.argv) > 2 else 10000
+    Initialize()
+    server = StaticServer({"index.html": PAGE})
+    try:
+        handler = ClientHandler()
+        browser = cefpython.CreateBrowserSync(CreateWindowInfo(), {},
+                "about:blank")
+        setHandler = MeasureSetClientHandler(browser, handler, number)
+        browser.GetMainFrame().LoadUrl(server.url)
+        if not Pump(lambda: handler.consoleMessages > 0):
+            raise Exception("No console message within the timeout")
+        (cpu, calls) = MeasureDispatch(handler, seconds)
+        PrintTable([
+            ("", "value"),
+            ("SetClientHandler() us per call",
+             "%.2f" % (setHandler * 1e6)),
+            ("callbacks in %s seconds" % seconds, calls),
+            ("CPU us per callback", "%.2f" % (1e6 * cpu / max(calls, 1))),
+        ])
+        browser.CloseBrowser(True)
+        Sleep(0.5)
+    finally:
+        server.Close()
+        cefpython.Shutdown()
+
+
+if __name__ == "__main__":
+    Main()
@@ -0,0 +1,194 @@
+# Idle CPU usage and input-to-paint latency of a wx application
+# servicing the CEF message loop with a fixed wx.Timer, as chromectrl
+# does by default, and with cefpython.InstallMessagePump("wx").
+#
+# An off-screen browser shows a page that changes its background color
+# on each click. Idle CPU is the CPU time of this (browser) process
+# while the page is idle. Latency is measured from SendMouseClickEvent()
+# to the next OnPaint, clicks are sent after the page was idle for a
+# while, so the adaptive pump is at its maximum interval.
+#
+# Usage: python benchmark_message_pump.py [timerMillis] [idleSeconds]
+
+import os
+import sys
+import time
+
+import wx
+
+from benchmark_utils import cefpython, Initialize, CreateWindowInfo, \
+        PaintRecorder, StaticServer, PrintTable
+
+CLICKS = 20
+# Pause before each click, longer than the adaptive pump needs to back
+# off to its maximum interval.
+CLICK_PAUSE_MILLIS = 500
+
+PAGE = """<!DOCTYPE html>
+<html><body style="margin: 0">
+<div id="target" style="width: 100%; height: 600px; background: #336699">
+</div>
+<script>
+var colors = ["#336699", "#993366"];
+var index = 0;
+document.getElementById("target").onmousedown = function() {
+    index = (index + 1) % colors.length;
+    this.style.background = colors[index];
+};
+</script>
+</body></html>
+"""
+
+
+def Fail(message):
+    # An exception raised in a wx.CallLater callback would not stop
+    # the main loop.
+    sys.stderr.write("Failed: %s\n" % message)
+    wx.GetApp().ExitMainLoop()
+
+
+def GetCpuTime():
+    times = os.times()
+    return times[0] + times[1]
+
+
+class FixedTimer(object):
+    # The timer chromectrl uses by default.
+
+    def __init__(self, timerMillis):
+        self.timer = wx.Timer()
+        self.timer.Bind(wx.EVT_TIMER, self.OnTimer)
+        self.timer.Start(timerMillis)
+
+    def OnTimer(self, event):
+        cefpython.MessageLoopWork()
+
+    def Uninstall(self):
+        self.timer.Stop()
+
+
+class LatencyRecorder(PaintRecorder):
+
+    def __init__(self):
+        PaintRecorder.__init__(self)
+        self.lastPaint = 0
+
+    def OnPaint(self, browser, element, dirtyRects, paintBuffer, width,
+            height):
+        PaintRecorder.OnPaint(self, browser, element, dirtyRects,
+                paintBuffer, width, height)
+        self.lastPaint = time.time()
+
+
+class Measurement(object):
+    # Runs in the wx main loop, each step schedules the next one with
+    # wx.CallLater.
+
+    def __init__(self, name, createPump, url, idleSeconds, done):
+        self.name = name
+        self.idleSeconds = idleSeconds
+        self.done = done
+        self.pump = createPump()
+        self.recorder = LatencyRecorder()
+        self.browser = cefpython.CreateBrowserSync(CreateWindowInfo(), {},
+                url)
+        self.browser.SetClientCallbacksDict(
+                self.recorder.GetClientCallbacks())
+        self.latencies = []
+        self.clickTime = 0
+        self.idleCpu = 0
+        self.WaitForFirstPaint(time.time() + 30)
+
+    def WaitForFirstPaint(self, deadline):
+        if self.browser.GetIdentifier() in self.recorder.firstPaint:
+            # Let the page settle before measuring idle CPU.
+            wx.CallLater(1000, self.StartIdle)
+        elif time.time() > deadline:
+            Fail("no paint within the timeout")
+        else:
+            wx.CallLater(10, self.WaitForFirstPaint, deadline)
+
+    def StartIdle(self):
+        wx.CallLater(int(self.idleSeconds * 1000), self.EndIdle,
+                GetCpuTime(), time.time())
+
+    def EndIdle(self, cpuStart, wallStart):
+        self.idleCpu = 100 * (GetCpuTime() - cpuStart) \
+                / (time.time() - wallStart)
+        wx.CallLater(CLICK_PAUSE_MILLIS, self.Click)
+
+    def Click(self):
+        self.clickTime = time.time()
+        self.browser.SendMouseClickEvent(100, 100,
+                cefpython.MOUSEBUTTON_LEFT, False, 1)
+        self.browser.SendMouseClickEvent(100, 100,
+                cefpython.MOUSEBUTTON_LEFT, True, 1)
+        wx.CallLater(1, self.WaitForPaint)
+
+    def WaitForPaint(self):
+        if self.recorder.lastPaint < self.clickTime:
+            if time.time() - self.clickTime > 5:
+                Fail("no paint after a click")
+            else:
+                wx.CallLater(1, self.WaitForPaint)
+            return
+        self.latencies.append(self.recorder.lastPaint - self.clickTime)
+        if len(self.latencies) < CLICKS:
+            wx.CallLater(CLICK_PAUSE_MILLIS, self.Click)
+        else:
+            self.Finish()
+
+    def Finish(self):
+        self.browser.CloseBrowser(True)
+        self.browser = None
+        self.latencies.sort()
+        # Closing the browser needs the message loop, the pump is
+        # stopped a bit later.
+        wx.CallLater(500, self.pump.Uninstall)
+        wx.CallLater(600, self.done, (self.name,
+                "%.2f" % self.idleCpu,
+                "%.1f" % (1000 * sum(self.latencies) / len(self.latencies)),
+                "%.1f" % (1000 * self.latencies[len(self.latencies) // 2]),
+                "%.1f" % (1000 * self.latencies[-1])))
+
+
+def Main():
+    timerMillis = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    idleSeconds = float(sys.argv[2]) if len(sys.argv) > 2 else 10.0
+    app = wx.App(False)
+    Initialize()
+    server = StaticServer({"index.html": PAGE})
+    pumps = [
+        ("wx.Timer(%s ms)" % timerMillis,
+         lambda: FixedTimer(timerMillis)),
+        ("InstallMessagePump(max %s ms)" % timerMillis,
+         lambda: cefpython.InstallMessagePump("wx",
+                maxInterval=timerMillis / 1000.0)),
+    ]
+    rows = [("", "idle CPU %", "latency mean ms", "median ms", "max ms")]
+
+    def RunNext(row=None):
+        if row:
+            rows.append(row)
+        if not pumps:
+            app.ExitMainLoop()
+            return
+        (name, createPump) = pumps.pop(0)
+        Measurement(name, createPump, server.url, idleSeconds, RunNext)
+
+    try:
+        # Keeps the main loop running without a window.
+        frame = wx.Frame(None)
+        wx.CallAfter(RunNext)
+        app.MainLoop()
+        frame.Destroy()
+        print("Idle CPU over %s seconds, latency of %s clicks:" % (
+                idleSeconds, CLICKS))
+        PrintTable(rows)
+    finally:
+        server.Close()
+        cefpython.Shutdown()
+
+
+if __name__ == "__main__":
+    Main()
@@ -0,0 +1,124 @@
+# Overhead of cefpython.EnableCallbackProfiling(). An off-screen
+# browser animates a canvas at 60 frames per second, OnPaint and the
+# load and display callbacks are set. The CPU time of this (browser)
+# process per painted frame is compared with profiling disabled and
+# enabled, the rounds alternate to even out drift. The target is an
+# overhead below 1%.
+#
+# Usage: python benchmark_profiler.py [seconds] [rounds]
+
+import os
+import sys
+
+from benchmark_utils import cefpython, Initialize, CreateWindowInfo, Pump, \
+        Sleep, PaintRecorder, StaticServer, PrintTable
+
+PAGE = """<!DOCTYPE html>
+<html><body style="margin: 0">
+<canvas id="canvas" width="800" height="600"></canvas>
+<script>
+var context = document.getElementById("canvas").getContext("2d");
+var frame = 0;
+function Draw() {
+    frame++;
+    context.fillStyle = "hsl(" + (frame % 360) + ", 60%, 50%)";
+    context.fillRect(0, 0, 800, 600);
+    document.title = "frame " + frame;
+    requestAnimationFrame(Draw);
+}
+requestAnimationFrame(Draw);
+</script>
+</body></html>
+"""
+
+
+def GetCpuTime():
+    times = os.times()
+    return times[0] + times[1]
+
+
+class FrameRecorder(PaintRecorder):
+
+    def __init__(self):
+        PaintRecorder.__init__(self)
+        self.paints = 0
+
+    def GetClientCallbacks(self):
+        callbacks = PaintRecorder.GetClientCallbacks(self)
+        callbacks["OnTitleChange"] = self.OnTitleChange
+        callbacks["OnLoadingStateChange"] = self.OnLoadingStateChange
+        return callbacks
+
+    def OnPaint(self, browser, element, dirtyRects, paintBuffer, width,
+            height):
+        PaintRecorder.OnPaint(self, browser, element, dirtyRects,
+                paintBuffer, width, height)
+        self.paints += 1
+
+    def OnTitleChange(self, browser, title):
+        pass
+
+    def OnLoadingStateChange(self, browser, isLoading, canGoBack,
+            canGoForward):
+        pass
+
+
+def MeasureRound(recorder, seconds, profiling):
+    cefpython.EnableCallbackProfiling(profiling)
+    cefpython.ResetCallbackStats()
+    paints = recorder.paints
+    cpuStart = GetCpuTime()
+    Sleep(seconds)
+    cpu = GetCpuTime() - cpuStart
+    paints = recorder.paints - paints
+    calls = 0
+    if profiling:
+        stats = cefpython.GetCallbackStats()
+        calls = sum([stats[name]["count"] for name in stats
+                     if name != "MessageLoopWork"])
+    cefpython.EnableCallbackProfiling(False)
+    return (cpu, paints, calls)
+
+
+def Main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 10.0
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    Initialize()
+    server = StaticServer({"index.html": PAGE})
+    try:
+        recorder = FrameRecorder()
+        browser = cefpython.CreateBrowserSync(CreateWindowInfo(),
+                {"windowless_frame_rate": 60}, server.url)
+        browser.SetClientCallbacksDict(recorder.GetClientCallbacks())
+        if not Pump(lambda: recorder.firstPaint):
+            raise Exception("No paint within the timeout")
+        Sleep(1.0)
+        totals = {False: [0.0, 0, 0], True: [0.0, 0, 0]}
+        for i in range(rounds):
+            for profiling in (False, True):
+                (cpu, paints, calls) = MeasureRound(recorder, seconds,
+                                                    profiling)
+                totals[profiling][0] += cpu
+                totals[profiling][1] += paints
+                totals[profiling][2] += calls
+        rows = [("profiling", "paints", "callbacks", "CPU ms per paint")]
+        perPaint = {}
+        for profiling in (False, True):
+            (cpu, paints, calls) = totals[profiling]
+            perPaint[profiling] = cpu / max(paints, 1)
+            rows.append(("enabled" if profiling else "disabled", paints,
+                         calls if profiling else "-",
+                         "%.3f" % (1000 * perPaint[profiling])))
+        print("%s rounds of %s seconds:" % (rounds, seconds))
+        PrintTable(rows)
+        print("Overhead: %.2f%% (target < 1%%)" % (
+                100 * (perPaint[True] / perPaint[False] - 1)))
+        browser.CloseBrowser(True)
+        Sleep(0.5)
+    finally:
+        server.Close()
+        cefpython.Shutdown()
+
+
+if __name__ == "__main__":
+    Main()
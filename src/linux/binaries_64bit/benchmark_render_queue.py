@@ -0,0 +1,82 @@
+# Throughput of cefpython.RenderQueue at different concurrency levels.
+# Pages are served by a local HTTP server, each page loads a script
+# and fetches a JSON file after it has loaded, so that network idle
+# detection waits for the request.
+#
+# Usage: python benchmark_render_queue.py [pages] [idleMs]
+
+import sys
+import time
+
+from benchmark_utils import cefpython, Initialize, Sleep, StaticServer, \
+        PrintTable
+
+CONCURRENCY = (1, 2, 4, 8, 16)
+
+PAGE = """<!DOCTYPE html>
+<html><head><title>Page %(index)s</title>
+<script src="script.js"></script>
+</head><body>
+<h1>Page %(index)s</h1>
+%(paragraphs)s
+<div id="data"></div>
+</body></html>
+"""
+
+SCRIPT = """
+window.onload = function() {
+    var request = new XMLHttpRequest();
+    request.onload = function() {
+        document.getElementById("data").textContent = request.responseText;
+    };
+    request.open("GET", "data.json");
+    request.send();
+};
+"""
+
+
+def CreatePages(count):
+    pages = {"script.js": SCRIPT, "data.json": '{"value": 1}'}
+    paragraphs = "\n".join(["<p>Paragraph %s of the page.</p>" % i
+                            for i in range(50)])
+    for index in range(count):
+        pages["page%s.html" % index] = PAGE % {"index": index,
+                                               "paragraphs": paragraphs}
+    return pages
+
+
+def Measure(urls, concurrency, idleMs):
+    renderQueue = cefpython.RenderQueue(concurrency=concurrency,
+            idleMs=idleMs, steps=[("text", cefpython.RenderQueue.Text)])
+    errors = 0
+    start = time.time()
+    for result in renderQueue.Run(urls):
+        if result["error"] or not result["results"]["text"]:
+            errors += 1
+    elapsed = time.time() - start
+    return (concurrency, "%.1f" % elapsed, "%.2f" % (len(urls) / elapsed),
+            errors)
+
+
+def Main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    idleMs = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    Initialize()
+    server = StaticServer(CreatePages(count))
+    try:
+        urls = ["%spage%s.html" % (server.url, index)
+                for index in range(count)]
+        rows = [("concurrency", "seconds", "pages/s", "errors")]
+        for concurrency in CONCURRENCY:
+            rows.append(Measure(urls, concurrency, idleMs))
+            # Let the closed browsers go away.
+            Sleep(1.0)
+        print("RenderQueue, %s pages, idleMs=%s:" % (count, idleMs))
+        PrintTable(rows)
+    finally:
+        server.Close()
+        cefpython.Shutdown()
+
+
+if __name__ == "__main__":
+    Main()
@@ -0,0 +1,143 @@
+# Helpers shared by the benchmark_*.py and *_check.py scripts: headless
+# CEF initialization, off-screen browsers, pumping the message loop
+# until a condition is met and a local static HTTP server.
+
+import ctypes, os, sys
+libcef_so = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+        'libcef.so')
+if os.path.exists(libcef_so):
+    # Import local module
+    ctypes.CDLL(libcef_so, ctypes.RTLD_GLOBAL)
+    if 0x02070000 <= sys.hexversion < 0x03000000:
+        import cefpython_py27 as cefpython
+    else:
+        raise Exception("Unsupported python version: %s" % sys.version)
+else:
+    # Import from package
+    from cefpython3 import cefpython
+
+import shutil
+import tempfile
+import threading
+import time
+
+if sys.version_info.major == 2:
+    import BaseHTTPServer as http_server
+    import SimpleHTTPServer as http_handler
+else:
+    import http.server as http_server
+    http_handler = http_server
+
+VIEW_WIDTH = 800
+VIEW_HEIGHT = 600
+
+
+def Initialize(settings=None):
+    appSettings = {
+        "debug": False,
+        "log_severity": cefpython.LOGSEVERITY_ERROR,
+        "log_file": "",
+        "locales_dir_path": cefpython.GetModuleDirectory()+"/locales",
+        "resources_dir_path": cefpython.GetModuleDirectory(),
+        "browser_subprocess_path": "%s/%s" % (
+            cefpython.GetModuleDirectory(), "subprocess"),
+        "windowless_rendering_enabled": True,
+    }
+    appSettings.update(settings or {})
+    switches = {
+        # Same flags as in the kivy_.py off-screen example.
+        "disable-surfaces": "",
+        "disable-gpu": "",
+        "disable-gpu-compositing": "",
+        "enable-begin-frame-scheduling": "",
+    }
+    cefpython.Initialize(appSettings, switches)
+
+
+def CreateWindowInfo():
+    windowInfo = cefpython.WindowInfo()
+    windowInfo.SetAsOffscreen(0)
+    return windowInfo
+
+
+def Pump(condition, timeout=30.0):
+    # Runs the message loop until condition() returns True, returns
+    # False on timeout.
+    deadline = time.time() + timeout
+    while not condition():
+        if time.time() > deadline:
+            return False
+        cefpython.MessageLoopWork()
+        time.sleep(0.001)
+    return True
+
+
+def Sleep(seconds):
+    Pump(lambda: False, seconds)
+
+
+class PaintRecorder(object):
+    # Render handler recording the time of the first paint of each
+    # browser, see GetClientCallbacks().
+
+    def __init__(self):
+        self.firstPaint = {}
+
+    def GetClientCallbacks(self):
+        # For Browser.SetClientCallbacksDict().
+        return {"GetViewRect": self.GetViewRect, "OnPaint": self.OnPaint}
+
+    def GetViewRect(self, browser, rect):
+        rect.extend([0, 0, VIEW_WIDTH, VIEW_HEIGHT])
+        return True
+
+    def OnPaint(self, browser, element, dirtyRects, paintBuffer, width,
+            height):
+        self.firstPaint.setdefault(browser.GetIdentifier(), time.time())
+
+    def Reset(self, browser):
+        self.firstPaint.pop(browser.GetIdentifier(), None)
+
+
+class QuietRequestHandler(http_handler.SimpleHTTPRequestHandler):
+
+    def translate_path(self, path):
+        # Pages are served from the server's directory, not from the
+        # current directory.
+        name = path.split("?", 1)[0].split("#", 1)[0].rsplit("/", 1)[-1]
+        return os.path.join(self.server.directory, name or "index.html")
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StaticServer(object):
+    # Serves generated pages from a temporary directory on 127.0.0.1.
+
+    def __init__(self, pages):
+        # pages: file name -> contents
+        self.directory = tempfile.mkdtemp(prefix="cefpython_benchmark_")
+        for (name, contents) in pages.items():
+            with open(os.path.join(self.directory, name), "w") as pageFile:
+                pageFile.write(contents)
+        self.server = http_server.HTTPServer(("127.0.0.1", 0),
+                QuietRequestHandler)
+        self.server.directory = self.directory
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+        self.url = "http://127.0.0.1:%s/" % self.server.server_address[1]
+
+    def Close(self):
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+def PrintTable(rows):
+    # rows: list of tuples, the first one is the header.
+    widths = [max(len(str(row[i])) for row in rows)
+              for i in range(len(rows[0]))]
+    for row in rows:
+        print("  ".join(str(value).ljust(width)
+                        for (value, width) in zip(row, widths)))
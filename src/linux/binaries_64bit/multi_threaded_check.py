@@ -0,0 +1,117 @@
+# Checks the multi_threaded_message_loop mode on Linux: CEF runs on
+# the UI thread started by cefpython.Initialize(), this (application)
+# thread never calls MessageLoopWork(). Browser and Frame methods are
+# called from this thread, the load callbacks and a function bound to
+# javascript are dispatched to it with a CallbackQueue, OnPaint keeps
+# being called on the UI thread while this thread sleeps.
+#
+# Usage: python multi_threaded_check.py
+
+import threading
+import time
+
+from benchmark_utils import cefpython, Initialize, CreateWindowInfo, \
+        PaintRecorder, StaticServer
+
+PAGE = """<!DOCTYPE html>
+<html><head><title>Check</title></head><body>
+<canvas id="canvas" width="800" height="600"></canvas>
+<script>
+var context = document.getElementById("canvas").getContext("2d");
+var frame = 0;
+function Draw() {
+    frame++;
+    context.fillStyle = "hsl(" + (frame % 360) + ", 60%, 50%)";
+    context.fillRect(0, 0, 800, 600);
+    requestAnimationFrame(Draw);
+}
+requestAnimationFrame(Draw);
+window.onload = function() { Loaded(document.title); };
+</script>
+</body></html>
+"""
+
+
+class Recorder(PaintRecorder):
+
+    def __init__(self):
+        PaintRecorder.__init__(self)
+        self.paints = 0
+        self.paintThreads = set()
+        self.loadEndThreads = set()
+        self.loadedTitle = None
+        self.loadedThread = None
+
+    def GetClientCallbacks(self):
+        callbacks = PaintRecorder.GetClientCallbacks(self)
+        callbacks["OnLoadEnd"] = self.OnLoadEnd
+        return callbacks
+
+    def OnPaint(self, browser, element, dirtyRects, paintBuffer, width,
+            height):
+        PaintRecorder.OnPaint(self, browser, element, dirtyRects,
+                paintBuffer, width, height)
+        self.paints += 1
+        self.paintThreads.add(threading.current_thread().name)
+
+    def OnLoadEnd(self, browser, frame, httpStatusCode):
+        self.loadEndThreads.add(threading.current_thread().name)
+
+    def Loaded(self, title):
+        self.loadedTitle = title
+        self.loadedThread = threading.current_thread().name
+
+
+def WaitFor(callbackQueue, condition, timeout=30.0):
+    deadline = time.time() + timeout
+    while not condition():
+        if time.time() > deadline:
+            raise Exception("Condition not met within the timeout")
+        callbackQueue.ProcessCallbacks(timeout=0.1)
+
+
+def Main():
+    Initialize({"multi_threaded_message_loop": True})
+    callbackQueue = cefpython.CallbackQueue()
+    cefpython.SetCallbackDispatcher(callbackQueue)
+    server = StaticServer({"index.html": PAGE})
+    mainThread = threading.current_thread().name
+    try:
+        recorder = Recorder()
+        browser = cefpython.CreateBrowserSync(CreateWindowInfo(),
+                {"windowless_frame_rate": 30}, server.url)
+        browser.SetClientCallbacksDict(recorder.GetClientCallbacks())
+        bindings = cefpython.JavascriptBindings(bindToFrames=False,
+                bindToPopups=False)
+        bindings.SetFunction("Loaded", recorder.Loaded)
+        browser.SetJavascriptBindings(bindings)
+        WaitFor(callbackQueue, lambda: recorder.loadedTitle is not None)
+        assert recorder.loadedTitle == "Check", recorder.loadedTitle
+        assert recorder.loadedThread == mainThread, recorder.loadedThread
+        assert recorder.loadEndThreads == set([mainThread]), \
+                recorder.loadEndThreads
+        assert browser.GetUrl() == server.url, browser.GetUrl()
+        assert browser.GetMainFrame().IsMain()
+        future = browser.GetMainFrame().EvaluateJavascript("1 + 2")
+        assert future.result(10) == 3, future.result()
+
+        # Rendering goes on while the application thread is busy.
+        paints = recorder.paints
+        time.sleep(2.0)
+        paints = recorder.paints - paints
+        assert paints > 10, "only %s paints in 2 seconds" % paints
+        assert mainThread not in recorder.paintThreads, \
+                recorder.paintThreads
+        print("OK, %s paints while the application thread slept, paint "
+              "threads: %s" % (paints, sorted(recorder.paintThreads)))
+        browser.CloseBrowser(True)
+        del browser
+        time.sleep(0.5)
+        callbackQueue.ProcessCallbacks()
+    finally:
+        server.Close()
+        cefpython.Shutdown()
+
+
+if __name__ == "__main__":
+    Main()
@@ -0,0 +1,114 @@
+# Opens and closes off-screen browsers and checks that the registries
+# reported by cefpython.GetObjectCounts() return to their baseline, see
+# also cefpython.CheckObjectRegistries(). Each page has an iframe and
+# calls the bound Ping() function with a javascript callback, Python
+# calls that callback with a Python function that the page calls in
+# turn. So frames, javascript callbacks and python callbacks are created
+# for every browser.
+#
+# Usage: python registry_leak_check.py [browsers] [concurrency]
+
+import sys
+
+from benchmark_utils import cefpython, Initialize, CreateWindowInfo, Pump, \
+        Sleep, StaticServer
+
+PAGE = """<!DOCTYPE html>
+<html><body>
+<iframe src="frame.html"></iframe>
+<script>
+window.onload = function() {
+    Ping(function(value, pong) { pong(value); });
+};
+</script>
+</body></html>
+"""
+
+FRAME = """<!DOCTYPE html>
+<html><body>frame</body></html>
+"""
+
+
+class PingHandler(object):
+    # Ping() is bound to javascript, Pong() is passed to javascript as
+    # a python callback. Records the browsers whose page called Pong().
+
+    def __init__(self):
+        self.done = set()
+
+    def Ping(self, callback):
+        callback.Call(callback.GetFrame().GetBrowser().GetIdentifier(),
+                self.Pong)
+
+    def Pong(self, browserId):
+        self.done.add(browserId)
+
+
+def GetViewRect(browser, rect):
+    rect.extend([0, 0, 320, 240])
+    return True
+
+
+def OpenBrowser(url, handler):
+    browser = cefpython.CreateBrowserSync(CreateWindowInfo(), {}, url)
+    browser.SetClientCallbacksDict({"GetViewRect": GetViewRect})
+    bindings = cefpython.JavascriptBindings(bindToFrames=False,
+            bindToPopups=False)
+    bindings.SetFunction("Ping", handler.Ping)
+    browser.SetJavascriptBindings(bindings)
+    return browser
+
+
+def Main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    Initialize()
+    server = StaticServer({"index.html": PAGE, "frame.html": FRAME})
+    try:
+        Sleep(0.5)
+        baseline = cefpython.GetObjectCounts()
+        print("Baseline: %s" % baseline)
+        handler = PingHandler()
+        opened = 0
+        peakPythonCallbacks = 0
+        while opened < total:
+            browsers = []
+            for i in range(min(concurrency, total - opened)):
+                browsers.append(OpenBrowser(server.url, handler))
+            opened += len(browsers)
+            browserIds = [browser.GetIdentifier() for browser in browsers]
+            if not Pump(lambda: all([browserId in handler.done
+                                     for browserId in browserIds])):
+                raise Exception("Pages did not call back within the "
+                                "timeout, browsers opened: %s" % opened)
+            peakPythonCallbacks = max(peakPythonCallbacks,
+                    cefpython.GetObjectCounts()["pythonCallbacks"])
+            for browser in browsers:
+                browser.CloseBrowser(True)
+            del browser, browsers
+            if opened % 100 < concurrency:
+                print("Opened and closed %s browsers: %s" % (
+                        opened, cefpython.GetObjectCounts()))
+        # OnBeforeClose and the releases of javascript callbacks arrive
+        # asynchronously.
+        Pump(lambda: cefpython.GetObjectCounts() == baseline, 30.0)
+        counts = cefpython.GetObjectCounts()
+        report = cefpython.CheckObjectRegistries()
+        print("After: %s" % counts)
+        print("Orphans: %s" % report["orphans"])
+        assert peakPythonCallbacks > baseline["pythonCallbacks"], \
+                "Python callbacks registry was not exercised"
+        leaked = dict([(name, counts[name] - baseline[name])
+                       for name in counts if counts[name] != baseline[name]])
+        assert not leaked, "Registries did not return to baseline: %s" \
+                % leaked
+        assert not any(report["orphans"].values()), \
+                "Orphans found: %s" % report["orphans"]
+        print("OK, %s browsers" % total)
+    finally:
+        server.Close()
+        cefpython.Shutdown()
+
+
+if __name__ == "__main__":
+    Main()
@@ -14,9 +14,10 @@ cdef public void LoadHandler_OnLoadingStateChange(
     cdef object callback
     try:
         pyBrowser = GetPyBrowser(cefBrowser)
-        callback = pyBrowser.GetClientCallback("OnLoadingStateChange")
+        callback = pyBrowser.clientCallbackSlots[CB_OnLoadingStateChange]
         if callback:
-            callback(pyBrowser, isLoading, canGoBack, canGoForward)
+            DispatchClientCallback(callback,
+                    (pyBrowser, isLoading, canGoBack, canGoForward))
     except:
         (exc_type, exc_value, exc_trace) = sys.exc_info()
         sys.excepthook(exc_type, exc_value, exc_trace)
@@ -31,9 +32,9 @@ cdef public void LoadHandler_OnLoadStart(
     try:
         pyBrowser = GetPyBrowser(cefBrowser)
         pyFrame = GetPyFrame(cefFrame)
-        clientCallback = pyBrowser.GetClientCallback("OnLoadStart")
+        clientCallback = pyBrowser.clientCallbackSlots[CB_OnLoadStart]
         if clientCallback:
-            clientCallback(pyBrowser, pyFrame)
+            DispatchClientCallback(clientCallback, (pyBrowser, pyFrame))
     except:
         (exc_type, exc_value, exc_trace) = sys.exc_info()
         sys.excepthook(exc_type, exc_value, exc_trace)
@@ -49,9 +50,10 @@ cdef public void LoadHandler_OnLoadEnd(
     try:
         pyBrowser = GetPyBrowser(cefBrowser)
         pyFrame = GetPyFrame(cefFrame)
-        clientCallback = pyBrowser.GetClientCallback("OnLoadEnd")
+        clientCallback = pyBrowser.clientCallbackSlots[CB_OnLoadEnd]
         if clientCallback:
-            clientCallback(pyBrowser, pyFrame, httpStatusCode)
+            DispatchClientCallback(clientCallback,
+                    (pyBrowser, pyFrame, httpStatusCode))
     except:
         (exc_type, exc_value, exc_trace) = sys.exc_info()
         sys.excepthook(exc_type, exc_value, exc_trace)
@@ -75,11 +77,11 @@ cdef public void LoadHandler_OnLoadError(
         pyBrowser = GetPyBrowser(cefBrowser)
         pyFrame = GetPyFrame(cefFrame)
         errorTextOut = [CefToPyString(cefErrorText)]
-        clientCallback = pyBrowser.GetClientCallback("OnLoadError")
+        clientCallback = pyBrowser.clientCallbackSlots[CB_OnLoadError]
         if clientCallback:
-            clientCallback(
-                    pyBrowser, pyFrame, cefErrorCode, errorTextOut,
-                    CefToPyString(cefFailedUrl))
+            DispatchClientCallback(clientCallback,
+                    (pyBrowser, pyFrame, cefErrorCode, errorTextOut,
+                     CefToPyString(cefFailedUrl)))
             # Providing custom error messsage not yet supported in CEF 3.
             # | PyToCefString(errorTextOut[0], cefErrorText)
     except:
@@ -0,0 +1,169 @@
+# Copyright (c) 2012-2014 The CEF Python authors. All rights reserved.
+# License: New BSD License.
+# Website: http://code.google.com/p/cefpython/
+
+# Debug() and DebugLog() in C++ do not write messages immediately.
+# Messages are appended to in-memory ring buffers (a deque in Python,
+# see DebugLog.h for C++) and a background flusher thread writes them
+# in batches to the console and to the log file, which is kept open,
+# or routes them to Python's logging module. Messages have a level
+# and a category, the level can be changed at runtime with
+# SetLogLevel(). Call FlushLog() to write pending messages immediately.
+
+include "cefpython.pyx"
+
+# noinspection PyUnresolvedReferences
+import threading
+
+# Same values as in Python's logging module.
+LOGLEVEL_DEBUG = 10
+LOGLEVEL_INFO = 20
+LOGLEVEL_WARNING = 30
+LOGLEVEL_ERROR = 40
+
+DEF LOG_BUFFER_SIZE = 10000
+# Seconds between flushes, the flusher is woken up earlier when
+# the buffer is half full.
+DEF LOG_FLUSH_INTERVAL = 0.2
+
+cdef int g_logLevel = 10
+# category -> level, overrides g_logLevel. Categories: "cefpython"
+# for Debug() messages, "cpp" for DebugLog() messages in C++.
+cdef dict g_logCategoryLevels = {}
+# (time, level, category, message) tuples. Appending to a deque
+# is thread-safe, no lock is required.
+cdef object g_logBuffer = collections.deque(maxlen=LOG_BUFFER_SIZE)
+cdef long long g_logDropped = 0
+# Logger name when routing messages to Python's logging, or None.
+cdef object g_logRouting = None
+cdef object g_logFlusher = None
+cdef object g_logFlushEvent = threading.Event()
+# Only one thread writes at a time, see FlushLog().
+cdef object g_logFlushLock = threading.Lock()
+cdef object g_logFileHandle = None
+
+cdef int GetMessageLogLevel(py_string msg) except *:
+    # Existing Debug() messages mark errors and warnings in their text.
+    if "ERROR" in msg or "FAILED" in msg:
+        return LOGLEVEL_ERROR
+    if "WARNING" in msg:
+        return LOGLEVEL_WARNING
+    return LOGLEVEL_DEBUG
+
+cdef int GetCategoryLogLevel(py_string category) except *:
+    if g_logCategoryLevels:
+        return g_logCategoryLevels.get(category, g_logLevel)
+    return g_logLevel
+
+cdef void LogMessage(int level, py_string category, py_string msg) except *:
+    global g_logDropped
+    if level < GetCategoryLogLevel(category):
+        return
+    if len(g_logBuffer) == LOG_BUFFER_SIZE:
+        g_logDropped += 1
+    g_logBuffer.append((time.time(), level, category, msg))
+    if g_logFlusher is None:
+        StartLogFlusher()
+    elif len(g_logBuffer) > LOG_BUFFER_SIZE // 2:
+        g_logFlushEvent.set()
+
+cdef void StartLogFlusher() except *:
+    global g_logFlusher
+    g_logFlusher = threading.Thread(target=RunLogFlusher,
+            name="CefPythonLogFlusher")
+    g_logFlusher.daemon = True
+    g_logFlusher.start()
+    # The flusher is a daemon thread, write the remaining messages
+    # when Shutdown() was not called.
+    atexit.register(FlushLog)
+
+def RunLogFlusher():
+    while True:
+        g_logFlushEvent.wait(LOG_FLUSH_INTERVAL)
+        g_logFlushEvent.clear()
+        try:
+            FlushLog()
+        except:
+            (exc_type, exc_value, exc_trace) = sys.exc_info()
+            sys.excepthook(exc_type, exc_value, exc_trace)
+
+cdef list DrainCppLog():
+    # Messages from DebugLog() in C++ code, category "cpp".
+    cdef cpp_vector[cpp_string] cppMessages
+    cdef size_t dropped
+    cdef list messages = []
+    cdef size_t i
+    cdef double now = time.time()
+    cdef py_string msg
+    with nogil:
+        dropped = DrainDebugLog(cppMessages)
+    if dropped:
+        messages.append((now, LOGLEVEL_WARNING, "cpp",
+                "WARNING: %s C++ log messages were dropped" % dropped))
+    for i in range(cppMessages.size()):
+        msg = CharToPyString(cppMessages[i].c_str())
+        messages.append((now, GetMessageLogLevel(msg), "cpp", msg))
+    return messages
+
+def FlushLog():
+    global g_logDropped, g_logFileHandle
+    cdef list messages
+    cdef list lines
+    with g_logFlushLock:
+        messages = DrainCppLog()
+        if g_logDropped:
+            messages.append((time.time(), LOGLEVEL_WARNING, "cefpython",
+                    "WARNING: %s log messages were dropped" % g_logDropped))
+            g_logDropped = 0
+        while g_logBuffer:
+            messages.append(g_logBuffer.popleft())
+        if not messages:
+            return
+        if g_logRouting is not None:
+            for (created, level, category, msg) in messages:
+                if level >= GetCategoryLogLevel(category):
+                    logging.getLogger("%s.%s" % (g_logRouting, category)) \
+                            .log(level, msg)
+            return
+        lines = []
+        for (created, level, category, msg) in messages:
+            if level >= GetCategoryLogLevel(category):
+                if category == "cpp":
+                    lines.append("[CEF Python] App: %s" % msg)
+                else:
+                    lines.append("[CEF Python] %s" % msg)
+        if not lines:
+            return
+        print("\n".join(lines))
+        if g_debugFile:
+            try:
+                if g_logFileHandle is None \
+                        or g_logFileHandle.name != g_debugFile:
+                    if g_logFileHandle is not None:
+                        g_logFileHandle.close()
+                    g_logFileHandle = open(g_debugFile, "a")
+                g_logFileHandle.write("\n".join(lines) + "\n")
+                g_logFileHandle.flush()
+            except:
+                g_logFileHandle = None
+                print("[CEF Python] WARNING: failed writing to debug file: "
+                        "%s" % g_debugFile)
+
+def SetLogLevel(int level, py_string category=None):
+    global g_logLevel
+    if category:
+        g_logCategoryLevels[category] = level
+    else:
+        g_logLevel = level
+
+def GetLogLevel(py_string category=None):
+    if category:
+        return GetCategoryLogLevel(category)
+    return g_logLevel
+
+def SetLogRouting(object loggerName):
+    # Route messages to logging.getLogger(loggerName + "." + category),
+    # None to write them to the console and the log file.
+    global g_logRouting
+    FlushLog()
+    g_logRouting = loggerName
@@ -0,0 +1,258 @@
+# Copyright (c) 2012-2014 The CEF Python authors. All rights reserved.
+# License: New BSD License.
+# Website: http://code.google.com/p/cefpython/
+
+# Integration of the CEF message loop with the asyncio event loop
+# and with GUI toolkits (wx, GTK, Qt, kivy).
+#
+# CEF binaries used by CEF Python do not support the external message
+# pump (CefSettings.external_message_pump and OnScheduleMessagePumpWork
+# are not available), so CEF cannot tell when it has work to do. The
+# pump estimates it instead: while MessageLoopWork() keeps doing work
+# it is called again after "minInterval", when CEF is idle the interval
+# doubles up to "maxInterval". Calls that post work to CEF, for example
+# PostTask() or Frame.ExecuteJavascript(), wake up the pump so that
+# the work is not delayed by a long idle interval.
+
+include "cefpython.pyx"
+
+try:
+    # noinspection PyUnresolvedReferences
+    import asyncio
+except ImportError:
+    asyncio = None
+
+# MessageLoopWork() taking longer than this (in seconds) means that
+# CEF had some work to do.
+DEF MESSAGE_PUMP_BUSY_THRESHOLD = 0.001
+
+# Installed pumps, only one per event loop.
+cdef list g_messagePumps = []
+
+cdef class AdaptiveMessagePump:
+    cdef double minInterval
+    cdef double maxInterval
+    cdef double interval
+    cdef py_bool wakeUpRequested
+    cdef py_bool installed
+
+    cdef double DoWork(self) except -1:
+        # Returns the number of seconds until the next call.
+        cdef double start = time.time()
+        cdef double elapsed
+        self.wakeUpRequested = False
+        MessageLoopWork()
+        elapsed = time.time() - start
+        if elapsed >= MESSAGE_PUMP_BUSY_THRESHOLD or self.wakeUpRequested:
+            self.interval = self.minInterval
+        else:
+            self.interval = min(self.interval * 2, self.maxInterval)
+        return self.interval
+
+    cdef void ScheduleWork(self) except *:
+        # Called on any thread with the GIL held.
+        self.wakeUpRequested = True
+
+    cpdef py_bool IsInstalled(self):
+        return self.installed
+
+    cpdef double GetInterval(self) except *:
+        return self.interval
+
+    cpdef py_void Uninstall(self):
+        self.installed = False
+        if self in g_messagePumps:
+            g_messagePumps.remove(self)
+
+cdef class AsyncioMessagePump(AdaptiveMessagePump):
+    cdef object loop
+    cdef object timerHandle
+    cdef py_bool wakeUpPending
+
+    def OnTimer(self):
+        self.timerHandle = None
+        if not self.installed:
+            return
+        self.timerHandle = self.loop.call_later(self.DoWork(), self.OnTimer)
+
+    def OnWakeUp(self):
+        self.wakeUpPending = False
+        if not self.installed:
+            return
+        if self.timerHandle is not None:
+            self.timerHandle.cancel()
+        self.OnTimer()
+
+    cdef void ScheduleWork(self) except *:
+        AdaptiveMessagePump.ScheduleWork(self)
+        if self.installed and not self.wakeUpPending:
+            self.wakeUpPending = True
+            self.loop.call_soon_threadsafe(self.OnWakeUp)
+
+    cpdef py_void Uninstall(self):
+        AdaptiveMessagePump.Uninstall(self)
+        if self.timerHandle is not None:
+            self.timerHandle.cancel()
+            self.timerHandle = None
+
+cdef class TimerMessagePump(AdaptiveMessagePump):
+    # Arms a single-shot toolkit timer for each MessageLoopWork() call.
+    # Toolkit timers may only be armed on the UI thread, wake ups
+    # requested from other threads are picked up by the next timer.
+    cdef object setTimer
+    # Incremented each time a timer is armed, timers armed earlier
+    # are ignored when they fire.
+    cdef int timerGeneration
+
+    cdef void ArmTimer(self, double delay) except *:
+        self.timerGeneration += 1
+        self.setTimer(delay, functools.partial(self.OnTimer,
+                self.timerGeneration))
+
+    def OnTimer(self, int timerGeneration):
+        if not self.installed or timerGeneration != self.timerGeneration:
+            return
+        self.ArmTimer(self.DoWork())
+
+    cdef void ScheduleWork(self) except *:
+        AdaptiveMessagePump.ScheduleWork(self)
+        if self.installed and self.interval > self.minInterval \
+                and IsThread(TID_UI):
+            self.interval = self.minInterval
+            self.ArmTimer(0)
+
+    cpdef py_void Uninstall(self):
+        AdaptiveMessagePump.Uninstall(self)
+        # Timer that is already armed will be ignored.
+        self.timerGeneration += 1
+
+cdef object GetToolkitTimer(py_string toolkit):
+    # Returns a function that arms a single-shot timer:
+    # setTimer(delaySeconds, callback).
+    if toolkit == "wx":
+        import wx
+        return lambda delay, callback: wx.CallLater(
+                max(1, int(delay * 1000)), callback)
+    elif toolkit == "gtk":
+        try:
+            # noinspection PyUnresolvedReferences
+            from gi.repository import GLib as glib
+        except ImportError:
+            # PyGTK.
+            # noinspection PyUnresolvedReferences
+            import gobject as glib
+        def SetGtkTimer(delay, callback):
+            # Returning False from the timeout function stops the timer.
+            glib.timeout_add(int(delay * 1000),
+                    lambda: bool(callback()))
+        return SetGtkTimer
+    elif toolkit == "qt":
+        try:
+            # noinspection PyUnresolvedReferences
+            from PyQt5 import QtCore
+        except ImportError:
+            try:
+                # noinspection PyUnresolvedReferences
+                from PyQt4 import QtCore
+            except ImportError:
+                # noinspection PyUnresolvedReferences
+                from PySide import QtCore
+        return lambda delay, callback: QtCore.QTimer.singleShot(
+                int(delay * 1000), callback)
+    elif toolkit == "kivy":
+        # noinspection PyUnresolvedReferences
+        from kivy.clock import Clock
+        return lambda delay, callback: Clock.schedule_once(
+                lambda dt: callback(), delay)
+    raise Exception("InstallMessagePump() failed: unknown toolkit: %s" \
+            % toolkit)
+
+def InstallMessagePump(object toolkit, double minInterval=0.001,
+        double maxInterval=0.05):
+    cdef TimerMessagePump pump
+    if g_applicationSettings.get("multi_threaded_message_loop"):
+        raise Exception("InstallMessagePump() failed: not allowed when "
+                "multi_threaded_message_loop is enabled")
+    if minInterval <= 0 or maxInterval < minInterval:
+        raise Exception("InstallMessagePump() failed: invalid interval")
+    assert IsThread(TID_UI), (
+            "cefpython.InstallMessagePump() may only be called on the "
+            "UI thread")
+    for installed in g_messagePumps:
+        if isinstance(installed, TimerMessagePump):
+            raise Exception("InstallMessagePump() failed: a toolkit pump "
+                    "is already installed")
+    pump = TimerMessagePump()
+    if callable(toolkit):
+        pump.setTimer = toolkit
+    else:
+        pump.setTimer = GetToolkitTimer(toolkit)
+    pump.minInterval = minInterval
+    pump.maxInterval = maxInterval
+    pump.interval = minInterval
+    pump.installed = True
+    g_messagePumps.append(pump)
+    pump.ArmTimer(0)
+    Debug("InstallMessagePump(): toolkit = %s, minInterval = %s, " \
+            "maxInterval = %s" % (toolkit, minInterval, maxInterval))
+    return pump
+
+cdef void ScheduleMessagePumpWork() except *:
+    # Called when work was posted to CEF.
+    cdef AdaptiveMessagePump pump
+    for pump in g_messagePumps:
+        pump.ScheduleWork()
+
+cdef void UninstallMessagePumps() except *:
+    cdef AdaptiveMessagePump pump
+    for pump in list(g_messagePumps):
+        pump.Uninstall()
+
+def InstallAsyncioPump(object loop=None, double minInterval=0.001,
+        double maxInterval=0.05):
+    cdef AsyncioMessagePump pump
+    if not asyncio:
+        raise Exception("InstallAsyncioPump() failed: the asyncio module "
+                "is not available")
+    if g_applicationSettings.get("multi_threaded_message_loop"):
+        raise Exception("InstallAsyncioPump() failed: not allowed when "
+                "multi_threaded_message_loop is enabled")
+    if minInterval <= 0 or maxInterval < minInterval:
+        raise Exception("InstallAsyncioPump() failed: invalid interval")
+    if loop is None:
+        loop = asyncio.get_event_loop()
+    for installed in g_messagePumps:
+        if isinstance(installed, AsyncioMessagePump) \
+                and (<AsyncioMessagePump>installed).loop is loop:
+            raise Exception("InstallAsyncioPump() failed: a pump is "
+                    "already installed in this event loop")
+    pump = AsyncioMessagePump()
+    pump.loop = loop
+    pump.minInterval = minInterval
+    pump.maxInterval = maxInterval
+    pump.interval = minInterval
+    pump.installed = True
+    g_messagePumps.append(pump)
+    pump.timerHandle = loop.call_soon(pump.OnTimer)
+    Debug("InstallAsyncioPump(): minInterval = %s, maxInterval = %s" \
+            % (minInterval, maxInterval))
+    return pump
+
+def AsyncioRun(object main, **pumpOptions):
+    cdef AsyncioMessagePump pump
+    if not asyncio:
+        raise Exception("AsyncioRun() failed: the asyncio module "
+                "is not available")
+    if callable(main):
+        main = main()
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        pump = InstallAsyncioPump(loop, **pumpOptions)
+        try:
+            return loop.run_until_complete(main)
+        finally:
+            pump.Uninstall()
+    finally:
+        asyncio.set_event_loop(None)
+        loop.close()
@@ -0,0 +1,176 @@
+# Copyright (c) 2012-2014 The CEF Python authors. All rights reserved.
+# License: New BSD License.
+# Website: http://code.google.com/p/cefpython/
+
+# HTTP server exposing CEF Python counters and gauges in the Prometheus
+# text format, see StartMetricsServer(). The counters are plain C
+# variables incremented by handlers that already run with the GIL,
+# process messages received are counted in C++ without acquiring
+# the GIL (see client_handler/process_message_stats.h). The server
+# runs on a background thread and only reads snapshots, CEF threads
+# never wait for it.
+
+include "cefpython.pyx"
+
+# noinspection PyUnresolvedReferences
+import threading
+
+if sys.version_info.major == 2:
+    # noinspection PyUnresolvedReferences
+    import BaseHTTPServer as http_server
+else:
+    # noinspection PyUnresolvedReferences
+    import http.server as http_server
+
+cdef long long g_paintsDelivered = 0
+# OnPaint() called when no OnPaint callback was set.
+cdef long long g_paintsDropped = 0
+cdef long long g_resourceHandlerBytes = 0
+cdef int g_webRequestsInFlight = 0
+cdef int g_javascriptCallbackCount = 0
+# message name -> count
+cdef dict g_processMessagesSent = {}
+cdef object g_metricsServer = None
+
+class MetricsRequestHandler(http_server.BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+        body = GetMetricsText().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type",
+                "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        Debug("MetricsServer: %s" % (format % args))
+
+cdef void CountProcessMessageSent(py_string messageName) except *:
+    g_processMessagesSent[messageName] = \
+            g_processMessagesSent.get(messageName, 0) + 1
+
+cdef py_string EscapeMetricLabel(object value):
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"") \
+            .replace("\n", "\\n")
+
+cdef void AddMetric(list lines, py_string name, py_string metricType,
+        py_string help, list samples) except *:
+    # samples: list of (labels dict or None, value) tuples.
+    lines.append("# HELP %s %s" % (name, help))
+    lines.append("# TYPE %s %s" % (name, metricType))
+    for (labels, value) in samples:
+        if labels:
+            lines.append("%s{%s} %s" % (name, ",".join([
+                    "%s=\"%s\"" % (key, EscapeMetricLabel(labels[key]))
+                    for key in sorted(labels)]), repr(float(value))))
+        else:
+            lines.append("%s %s" % (name, repr(float(value))))
+
+cdef py_string GetMetricsText():
+    cdef cpp_map[cpp_string, long long] cppReceived
+    cdef cpp_map[cpp_string, long long].iterator iterator
+    cdef list lines = []
+    cdef list samples
+    cdef CallbackProfile profile
+    cdef dict rendererStats
+    with nogil:
+        GetProcessMessagesReceived(cppReceived)
+
+    AddMetric(lines, "cefpython_browsers", "gauge",
+            "Number of live browsers.", [(None, len(g_pyBrowsers))])
+    AddMetric(lines, "cefpython_frames", "gauge",
+            "Number of live frames.", [(None, sum([len(browserFrames)
+                    for browserFrames in list(g_pyFrames.values())]))])
+    AddMetric(lines, "cefpython_pending_tasks", "gauge",
+            "Number of tasks posted and not yet run.",
+            [(None, len(g_tasks))])
+    AddMetric(lines, "cefpython_python_callbacks", "gauge",
+            "Number of Python callbacks registered in javascript.",
+            [(None, len(g_pythonCallbacks))])
+    AddMetric(lines, "cefpython_javascript_callbacks", "gauge",
+            "Number of javascript callbacks held in Python.",
+            [(None, g_javascriptCallbackCount)])
+    rendererStats = GetJavascriptCallbackStats()
+    AddMetric(lines, "cefpython_renderer_javascript_callbacks", "gauge",
+            "Number of javascript functions kept alive in Renderer "
+            "processes for Python.", [(None, rendererStats["live"])])
+    AddMetric(lines, "cefpython_renderer_javascript_callback_events",
+            "gauge", "Javascript callback events in Renderer processes "
+            "that host browsers.", [({"event": event}, rendererStats[event])
+                    for event in ("created", "deduplicated", "released",
+                                  "evicted")])
+
+    samples = [({"name": name}, count)
+            for (name, count) in sorted(g_processMessagesSent.items())]
+    AddMetric(lines, "cefpython_process_messages_sent_total", "counter",
+            "Process messages sent to the Renderer process.", samples)
+    samples = []
+    iterator = cppReceived.begin()
+    while iterator != cppReceived.end():
+        samples.append(({"name": CharToPyString(
+                deref(iterator).first.c_str())}, deref(iterator).second))
+        preinc(iterator)
+    AddMetric(lines, "cefpython_process_messages_received_total", "counter",
+            "Process messages received from the Renderer process.", samples)
+
+    AddMetric(lines, "cefpython_paints_total", "counter",
+            "OnPaint calls, dropped when no OnPaint callback was set.",
+            [({"result": "delivered"}, g_paintsDelivered),
+             ({"result": "dropped"}, g_paintsDropped)])
+    AddMetric(lines, "cefpython_resource_handler_bytes_total", "counter",
+            "Bytes served by resource handlers.",
+            [(None, g_resourceHandlerBytes)])
+    AddMetric(lines, "cefpython_web_requests_in_flight", "gauge",
+            "Web requests created and not yet completed.",
+            [(None, g_webRequestsInFlight)])
+
+    # Latencies are recorded only when callback profiling is enabled,
+    # see profiler.pyx.
+    samples = []
+    for (name, profile) in sorted(g_callbackProfiles.items()):
+        for quantile in (0.5, 0.9, 0.99):
+            samples.append(({"callback": name, "quantile": quantile},
+                    profile.GetPercentile(quantile)))
+    AddMetric(lines, "cefpython_callback_duration_seconds", "summary",
+            "Time spent in Python callbacks called by CEF.", samples)
+    for (name, profile) in sorted(g_callbackProfiles.items()):
+        lines.append("cefpython_callback_duration_seconds_sum{callback=\"%s\"}"
+                " %s" % (EscapeMetricLabel(name), repr(profile.totalTime)))
+        lines.append("cefpython_callback_duration_seconds_count"
+                "{callback=\"%s\"} %s" % (EscapeMetricLabel(name),
+                        repr(float(profile.count))))
+    AddMetric(lines, "cefpython_message_loop_work_total", "counter",
+            "MessageLoopWork() calls, counted when profiling is enabled.",
+            [(None, g_messageLoopWorkCount)])
+    AddMetric(lines, "cefpython_message_loop_work_seconds_total", "counter",
+            "Time spent in MessageLoopWork(), including Python callbacks.",
+            [(None, g_messageLoopWorkTime)])
+    return "\n".join(lines) + "\n"
+
+def StartMetricsServer(int port, py_string host="127.0.0.1"):
+    # Returns the port, pass 0 to choose a free port.
+    global g_metricsServer
+    if g_metricsServer is not None:
+        raise Exception("StartMetricsServer() failed: server already "
+                "started on port %s" % g_metricsServer.server_address[1])
+    g_metricsServer = http_server.HTTPServer((host, port),
+            MetricsRequestHandler)
+    thread = threading.Thread(target=g_metricsServer.serve_forever,
+            name="CefPythonMetricsServer")
+    thread.daemon = True
+    thread.start()
+    Debug("StartMetricsServer(): %s:%s" % g_metricsServer.server_address)
+    return g_metricsServer.server_address[1]
+
+def StopMetricsServer():
+    global g_metricsServer
+    if g_metricsServer is None:
+        return
+    g_metricsServer.shutdown()
+    g_metricsServer.server_close()
+    g_metricsServer = None
+    Debug("StopMetricsServer()")
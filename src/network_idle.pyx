@@ -0,0 +1,120 @@
+# Copyright (c) 2012-2014 The CEF Python authors. All rights reserved.
+# License: New BSD License.
+# Website: http://code.google.com/p/cefpython/
+
+# Network idle detection. Resource requests in flight are counted per
+# browser on the IO thread, see client_handler/network_activity.h.
+# A browser is network idle when it had no more than "maxInflight"
+# requests in flight for "idleMs" milliseconds. The counters are
+# polled, by Browser.WaitForNetworkIdle() in the waiting thread and
+# for the OnNetworkIdle callback by a periodic task on the UI thread.
+
+include "cefpython.pyx"
+
+DEF NETWORK_IDLE_CHECK_INTERVAL = 0.05
+
+# Whether RunNetworkIdleCheck() is scheduled, guarded by
+# g_networkIdleCheckLock.
+cdef py_bool g_networkIdleCheckScheduled = False
+cdef object g_networkIdleCheckLock = threading.Lock()
+
+cdef class NetworkIdleWatch:
+    cdef int idleMs
+    cdef int maxInflight
+    cdef int inflight
+    # Value of the crossings counter when the browser became idle,
+    # -1 when not read yet.
+    cdef int crossings
+    # 0 when the browser is not idle.
+    cdef double idleSince
+    # Whether OnNetworkIdle was called for the current idle period.
+    cdef py_bool notified
+
+    def __init__(self, int idleMs=500, int maxInflight=0):
+        if idleMs < 0:
+            raise Exception("NetworkIdleWatch failed: idleMs must not "
+                    "be negative")
+        if not 0 <= maxInflight <= NETWORK_IDLE_MAX_INFLIGHT:
+            raise Exception("NetworkIdleWatch failed: maxInflight must "
+                    "be between 0 and %s" % NETWORK_IDLE_MAX_INFLIGHT)
+        self.idleMs = idleMs
+        self.maxInflight = maxInflight
+        self.crossings = -1
+
+    cdef cpp_bool Update(self, int browserId, double now) except *:
+        # Returns True when the browser has been idle for idleMs.
+        cdef int inflight = 0
+        cdef int crossings = 0
+        with nogil:
+            GetNetworkActivity(browserId, self.maxInflight, inflight,
+                    crossings)
+        self.inflight = inflight
+        if inflight > self.maxInflight or crossings != self.crossings:
+            # Busy, or was busy since the previous read.
+            self.crossings = crossings
+            self.idleSince = now if inflight <= self.maxInflight else 0
+            self.notified = False
+            if not self.idleSince:
+                # Crossings are read again when idle.
+                self.crossings = -1
+        return self.idleSince != 0 \
+                and (now - self.idleSince) * 1000 >= self.idleMs
+
+cdef void ScheduleNetworkIdleCheck() except *:
+    # Called when an OnNetworkIdle callback is set, on any thread.
+    global g_networkIdleCheckScheduled
+    with g_networkIdleCheckLock:
+        if g_networkIdleCheckScheduled:
+            return
+        g_networkIdleCheckScheduled = True
+    PostPythonTask(TID_UI, RunNetworkIdleCheck, [],
+            <long long>(NETWORK_IDLE_CHECK_INTERVAL * 1000))
+
+def RunNetworkIdleCheck():
+    global g_networkIdleCheckScheduled
+    cdef PyBrowser pyBrowser
+    cdef object callback
+    cdef double now = time.time()
+    cdef py_bool watching = False
+    with g_networkIdleCheckLock:
+        g_networkIdleCheckScheduled = False
+    try:
+        for pyBrowser in list(g_pyBrowsers.values()):
+            callback = pyBrowser.clientCallbackSlots[CB_OnNetworkIdle]
+            if not callback:
+                continue
+            watching = True
+            if pyBrowser.networkIdleWatch is None:
+                pyBrowser.networkIdleWatch = NetworkIdleWatch()
+            if pyBrowser.networkIdleWatch.Update(pyBrowser.GetIdentifier(),
+                    now) and not pyBrowser.networkIdleWatch.notified:
+                pyBrowser.networkIdleWatch.notified = True
+                DispatchClientCallback(callback,
+                        (pyBrowser, pyBrowser.networkIdleWatch.inflight))
+    finally:
+        # Stops when no browser has the callback set.
+        if watching:
+            ScheduleNetworkIdleCheck()
+
+cdef cpp_bool WaitForBrowserNetworkIdle(PyBrowser pyBrowser, int idleMs,
+        int maxInflight, double timeout) except *:
+    cdef NetworkIdleWatch watch = NetworkIdleWatch(idleMs, maxInflight)
+    cdef int browserId = pyBrowser.GetIdentifier()
+    cdef py_bool multiThreaded = IsMultiThreadedMessageLoop()
+    cdef double start = time.time()
+    cdef double now = start
+    if multiThreaded and IsThread(TID_UI):
+        raise Exception("Browser.WaitForNetworkIdle() failed: may not be "
+                "called on the UI thread when multi_threaded_message_loop "
+                "is enabled")
+    while not watch.Update(browserId, now):
+        if timeout and now - start >= timeout:
+            return False
+        if multiThreaded:
+            time.sleep(NETWORK_IDLE_CHECK_INTERVAL)
+        else:
+            # The page loads only while the message loop runs.
+            MessageLoopWork()
+            time.sleep(0.005)
+        now = time.time()
+    return True
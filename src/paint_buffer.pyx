@@ -13,12 +13,16 @@ cdef PaintBuffer CreatePaintBuffer(const void* buffer_, int width, int height):
     return paintBuffer
 
 cdef class PaintBuffer:
+    # Frame reads count as browser activity, see throttling.pyx.
+    cdef PyBrowser browser
     cdef const void* buffer
     cdef int width
     cdef int height
     cdef Py_ssize_t length
 
     cpdef long long GetIntPointer(self) except *:
+        if g_backgroundThrottling and self.browser is not None:
+            MarkBrowserActivity(self.browser)
         return <long long>self.buffer
 
     cpdef object GetString(self, str mode="bgra", str origin="top-left"):
@@ -26,6 +30,9 @@ cdef class PaintBuffer:
         cdef py_bool dest_alloced = False
         cdef object ret
 
+        if g_backgroundThrottling and self.browser is not None:
+            MarkBrowserActivity(self.browser)
+
         origin = origin.lower()
         mode = mode.lower()
         assert origin in ("top-left", "bottom-left"), "Invalid origin"
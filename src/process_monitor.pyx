@@ -0,0 +1,201 @@
+# Copyright (c) 2012-2014 The CEF Python authors. All rights reserved.
+# License: New BSD License.
+# Website: http://code.google.com/p/cefpython/
+
+# Memory and CPU usage of the Browser process and of its child
+# processes (Renderer, GPU, utility and others), per browser. Renderer
+# processes report their process id with the "OnBrowserCreated" process
+# message, see Browser.GetRendererProcessId(). ProcessMonitor samples
+# /proc on a background thread, it is available only on Linux.
+
+include "cefpython.pyx"
+
+# noinspection PyUnresolvedReferences
+import threading
+
+cdef public void ProcessMonitor_OnBrowserCreated(
+        CefRefPtr[CefBrowser] cefBrowser,
+        int processId
+        ) except * with gil:
+    cdef PyBrowser pyBrowser
+    try:
+        pyBrowser = GetPyBrowser(cefBrowser)
+        pyBrowser.rendererProcessId = processId
+        Debug("ProcessMonitor_OnBrowserCreated(): browserId = %s, " \
+                "renderer processId = %s" % (pyBrowser.GetIdentifier(),
+                        processId))
+    except:
+        (exc_type, exc_value, exc_trace) = sys.exc_info()
+        sys.excepthook(exc_type, exc_value, exc_trace)
+
+cdef dict GetRendererBrowserIds():
+    # renderer processId -> list of browserIds
+    cdef PyBrowser pyBrowser
+    cdef dict browserIds = {}
+    for pyBrowser in list(g_pyBrowsers.values()):
+        if pyBrowser.rendererProcessId:
+            browserIds.setdefault(pyBrowser.rendererProcessId, []).append(
+                    pyBrowser.GetIdentifier())
+    return browserIds
+
+cdef tuple ReadProcStat(int pid):
+    # Returns (parent pid, utime + stime in clock ticks).
+    with open("/proc/%d/stat" % pid) as statFile:
+        stat = statFile.read()
+    # The command name in parentheses may contain spaces.
+    fields = stat[stat.rindex(")") + 2:].split()
+    return (int(fields[1]), int(fields[11]) + int(fields[12]))
+
+cdef py_string ReadProcType(int pid):
+    # Value of the "--type=" switch, eg. "renderer" or "gpu-process".
+    with open("/proc/%d/cmdline" % pid) as cmdlineFile:
+        arguments = cmdlineFile.read().split("\0")
+    for argument in arguments:
+        if argument.startswith("--type="):
+            return argument[len("--type="):]
+    return "other"
+
+class ProcessMonitor(object):
+
+    def __init__(self, interval=5.0, callback=None, rssLimit=0, cpuLimit=0):
+        # callback(processStats, name) is called on the monitor thread
+        # when "rss" (bytes) exceeds rssLimit or "cpu" (percent of
+        # a single core) exceeds cpuLimit. 0 means no limit.
+        if platform.system() != "Linux":
+            raise Exception("ProcessMonitor failed: supported only on Linux")
+        self.interval = interval
+        self.callback = callback
+        self.rssLimit = rssLimit
+        self.cpuLimit = cpuLimit
+        self.pageSize = os.sysconf("SC_PAGE_SIZE")
+        self.clockTicks = os.sysconf("SC_CLK_TCK")
+        self.lock = threading.Lock()
+        self.stopEvent = threading.Event()
+        self.thread = None
+        # pid -> stats dict, see Sample().
+        self.processStats = {}
+        # pid -> (cpu ticks, time) of the previous sample.
+        self.cpuSamples = {}
+        # (pid, name) of the limits currently exceeded, the callback
+        # is called only when a limit gets exceeded.
+        self.exceeded = set()
+
+    def Start(self):
+        if self.thread is not None:
+            raise Exception("ProcessMonitor.Start() failed: already started")
+        self.stopEvent.clear()
+        self.thread = threading.Thread(target=self.Run,
+                name="CefPythonProcessMonitor")
+        self.thread.daemon = True
+        self.thread.start()
+
+    def Stop(self):
+        if self.thread is None:
+            return
+        self.stopEvent.set()
+        if self.thread is not threading.current_thread():
+            self.thread.join()
+        self.thread = None
+
+    def Run(self):
+        while not self.stopEvent.is_set():
+            try:
+                self.Sample()
+            except:
+                (exc_type, exc_value, exc_trace) = sys.exc_info()
+                sys.excepthook(exc_type, exc_value, exc_trace)
+            self.stopEvent.wait(self.interval)
+
+    def GetProcesses(self):
+        # pid -> process type, for this process and its descendants.
+        browserPid = os.getpid()
+        parents = {}
+        for name in os.listdir("/proc"):
+            if not name.isdigit():
+                continue
+            try:
+                parents[int(name)] = ReadProcStat(int(name))[0]
+            except (IOError, OSError, ValueError, IndexError):
+                # Process exited.
+                pass
+        processes = {browserPid: "browser"}
+        # Renderers are children of the zygote process, which is a child
+        # of the Browser process, so walk the tree until no new process
+        # is found.
+        found = True
+        while found:
+            found = False
+            for (pid, parentPid) in parents.items():
+                if parentPid in processes and pid not in processes:
+                    try:
+                        processes[pid] = ReadProcType(pid)
+                    except (IOError, OSError):
+                        continue
+                    found = True
+        return processes
+
+    def Sample(self):
+        # Samples all processes and returns stats, also called
+        # by the monitor thread every "interval" seconds.
+        now = time.time()
+        rendererBrowserIds = GetRendererBrowserIds()
+        processStats = {}
+        cpuSamples = {}
+        for (pid, processType) in self.GetProcesses().items():
+            try:
+                cpuTicks = ReadProcStat(pid)[1]
+                with open("/proc/%d/statm" % pid) as statmFile:
+                    rss = int(statmFile.read().split()[1]) * self.pageSize
+            except (IOError, OSError, ValueError, IndexError):
+                continue
+            cpu = 0.0
+            if pid in self.cpuSamples:
+                (previousTicks, previousTime) = self.cpuSamples[pid]
+                if now > previousTime:
+                    cpu = 100.0 * (cpuTicks - previousTicks) \
+                            / self.clockTicks / (now - previousTime)
+            cpuSamples[pid] = (cpuTicks, now)
+            processStats[pid] = {
+                "pid": pid,
+                "type": processType,
+                "rss": rss,
+                "cpu": cpu,
+                "browserIds": rendererBrowserIds.get(pid, []),
+            }
+        with self.lock:
+            self.processStats = processStats
+        self.cpuSamples = cpuSamples
+        self.CheckLimits(processStats)
+        return processStats
+
+    def CheckLimits(self, processStats):
+        exceeded = set()
+        for stats in processStats.values():
+            for (name, limit) in (("rss", self.rssLimit),
+                                  ("cpu", self.cpuLimit)):
+                if not limit or stats[name] <= limit:
+                    continue
+                exceeded.add((stats["pid"], name))
+                if (stats["pid"], name) in self.exceeded \
+                        or not self.callback:
+                    continue
+                try:
+                    self.callback(stats, name)
+                except:
+                    (exc_type, exc_value, exc_trace) = sys.exc_info()
+                    sys.excepthook(exc_type, exc_value, exc_trace)
+        self.exceeded = exceeded
+
+    def GetProcessStats(self):
+        # pid -> {"pid", "type", "rss", "cpu", "browserIds"}
+        with self.lock:
+            return dict(self.processStats)
+
+    def GetBrowserStats(self):
+        # browserId -> stats of its Renderer process. Browsers sharing
+        # a Renderer process report the same stats.
+        browserStats = {}
+        for stats in self.GetProcessStats().values():
+            for browserId in stats["browserIds"]:
+                browserStats[browserId] = stats
+        return browserStats
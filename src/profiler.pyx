@@ -0,0 +1,234 @@
+# Copyright (c) 2012-2014 The CEF Python authors. All rights reserved.
+# License: New BSD License.
+# Website: http://code.google.com/p/cefpython/
+
+# Opt-in profiling of Python callbacks called by CEF. When enabled,
+# callbacks are wrapped with ProfiledCallback objects that record call
+# counts, exceptions and wall time into log-linear histograms, see
+# GetCallbackStats(). The same wrappers record trace events when
+# tracing is started, see tracing.pyx. When both are disabled callbacks
+# are not wrapped at all, ProfileCallback() returns the callback itself.
+
+include "cefpython.pyx"
+
+# Four linear sub-buckets per power of two of microseconds, relative
+# error of a bucket is at most 25%. 160 buckets cover up to 2^42 us.
+DEF HISTOGRAM_SUB_BUCKETS = 4
+DEF HISTOGRAM_BUCKETS = 160
+
+cdef py_bool g_callbackProfiling = False
+# name -> CallbackProfile
+cdef dict g_callbackProfiles = {}
+# (group, name) -> (full name, CallbackProfile), so that wrapping
+# a callback does not format the name on every call.
+cdef dict g_callbackProfileKeys = {}
+# Nesting level of profiled callbacks, callbacks called from within
+# other callbacks are not counted twice in the handler time. Only
+# callbacks on the UI thread are counted, MessageLoopWork() runs there.
+cdef int g_profiledCallbackDepth = 0
+cdef double g_handlerTime = 0
+cdef long long g_messageLoopWorkCount = 0
+cdef double g_messageLoopWorkTime = 0
+cdef double g_messageLoopWorkHandlerTime = 0
+
+if hasattr(time, "perf_counter"):
+    ProfilerClock = time.perf_counter
+else:
+    ProfilerClock = time.time
+
+cdef int GetHistogramBucket(long long micros) except *:
+    cdef int exponent = 0
+    cdef long long value
+    if micros < 2 * HISTOGRAM_SUB_BUCKETS:
+        return <int>max(micros, 0)
+    value = micros
+    while value > 1:
+        value >>= 1
+        exponent += 1
+    return min(2 * HISTOGRAM_SUB_BUCKETS
+            + (exponent - 3) * HISTOGRAM_SUB_BUCKETS
+            + ((micros >> (exponent - 2)) & (HISTOGRAM_SUB_BUCKETS - 1)),
+            HISTOGRAM_BUCKETS - 1)
+
+cdef long long GetHistogramBucketLimit(int bucket) except *:
+    # Returns the upper limit (exclusive) of the bucket, in microseconds.
+    cdef int exponent
+    cdef int subBucket
+    if bucket < 2 * HISTOGRAM_SUB_BUCKETS:
+        return bucket + 1
+    exponent = (bucket - 2 * HISTOGRAM_SUB_BUCKETS) \
+            // HISTOGRAM_SUB_BUCKETS + 3
+    subBucket = (bucket - 2 * HISTOGRAM_SUB_BUCKETS) % HISTOGRAM_SUB_BUCKETS
+    return <long long>(HISTOGRAM_SUB_BUCKETS + subBucket + 1) \
+            << (exponent - 2)
+
+cdef class CallbackProfile:
+    cdef long long count
+    cdef long long exceptions
+    cdef double totalTime
+    cdef double maxTime
+    cdef long long histogram[HISTOGRAM_BUCKETS]
+
+    cdef void Record(self, double elapsed, py_bool exception) except *:
+        self.count += 1
+        if exception:
+            self.exceptions += 1
+        self.totalTime += elapsed
+        if elapsed > self.maxTime:
+            self.maxTime = elapsed
+        self.histogram[GetHistogramBucket(<long long>(elapsed * 1000000))] \
+                += 1
+
+    cdef double GetPercentile(self, double percentile) except *:
+        # Upper limit of the bucket containing the percentile, seconds.
+        cdef long long threshold = <long long>(self.count * percentile)
+        cdef long long seen = 0
+        cdef int bucket
+        for bucket in range(HISTOGRAM_BUCKETS):
+            seen += self.histogram[bucket]
+            if seen > threshold:
+                return min(GetHistogramBucketLimit(bucket) / 1000000.0,
+                        self.maxTime)
+        return self.maxTime
+
+    cdef dict GetStats(self):
+        cdef list histogram = []
+        cdef int bucket
+        for bucket in range(HISTOGRAM_BUCKETS):
+            if self.histogram[bucket]:
+                histogram.append((
+                        GetHistogramBucketLimit(bucket) / 1000000.0,
+                        self.histogram[bucket]))
+        return {
+            "count": self.count,
+            "exceptions": self.exceptions,
+            "totalTime": self.totalTime,
+            "meanTime": self.totalTime / self.count if self.count else 0,
+            "maxTime": self.maxTime,
+            "p50": self.GetPercentile(0.5),
+            "p90": self.GetPercentile(0.9),
+            "p99": self.GetPercentile(0.99),
+            "histogram": histogram,
+        }
+
+cdef class ProfiledCallback:
+    cdef object callback
+    cdef py_string name
+    cdef CallbackProfile profile
+
+    def __call__(self, *args):
+        global g_profiledCallbackDepth, g_handlerTime
+        cdef double start = ProfilerClock()
+        cdef double elapsed
+        cdef py_bool exception = True
+        # Callbacks on the IO and other threads run concurrently with
+        # MessageLoopWork(), they are not a part of its handler time.
+        cdef cpp_bool onUiThread = CefCurrentlyOn(cef_types.TID_UI)
+        if onUiThread:
+            g_profiledCallbackDepth += 1
+        try:
+            returnValue = self.callback(*args)
+            exception = False
+            return returnValue
+        finally:
+            elapsed = ProfilerClock() - start
+            if onUiThread:
+                g_profiledCallbackDepth -= 1
+                if g_profiledCallbackDepth == 0:
+                    g_handlerTime += elapsed
+            if g_callbackProfiling:
+                self.profile.Record(elapsed, exception)
+            if g_cefpythonTracing:
+                TraceSpan(self.name, "callback", start, elapsed)
+
+cdef object ProfileCallback(object callback, py_string name,
+        py_string group=None):
+    cdef ProfiledCallback profiledCallback
+    cdef CallbackProfile profile
+    cdef tuple key
+    cdef tuple entry
+    # Nothing is allocated when profiling and tracing are disabled.
+    if not (g_callbackProfiling or g_cefpythonTracing) or callback is None:
+        return callback
+    key = (group, name)
+    entry = g_callbackProfileKeys.get(key)
+    if entry is None:
+        if group:
+            name = "%s.%s" % (group, name)
+        profile = g_callbackProfiles.get(name)
+        if profile is None:
+            profile = CallbackProfile()
+            g_callbackProfiles[name] = profile
+        entry = (name, profile)
+        g_callbackProfileKeys[key] = entry
+    else:
+        name = entry[0]
+        profile = entry[1]
+    profiledCallback = ProfiledCallback()
+    profiledCallback.callback = callback
+    profiledCallback.name = name
+    profiledCallback.profile = profile
+    return profiledCallback
+
+cdef void RecordMessageLoopWork(double start) except *:
+    # Called after MessageLoopWork() when profiling or tracing
+    # is enabled.
+    global g_messageLoopWorkCount, g_messageLoopWorkTime
+    global g_messageLoopWorkHandlerTime, g_handlerTime
+    cdef double elapsed = ProfilerClock() - start
+    if g_callbackProfiling:
+        g_messageLoopWorkCount += 1
+        g_messageLoopWorkTime += elapsed
+        g_messageLoopWorkHandlerTime += g_handlerTime
+    if g_cefpythonTracing:
+        TraceSpan("MessageLoopWork", "messageloop", start, elapsed,
+                {"handlerTime": g_handlerTime})
+    g_handlerTime = 0
+
+cdef void RebuildClientCallbackSlots() except *:
+    # Wrap or unwrap client callbacks of existing browsers after
+    # profiling or tracing was enabled or disabled.
+    cdef PyBrowser pyBrowser
+    for pyBrowser in g_pyBrowsers.values():
+        pyBrowser.SetClientCallbacksDict(pyBrowser.clientCallbacks)
+
+def EnableCallbackProfiling(py_bool enabled=True):
+    global g_callbackProfiling
+    if g_callbackProfiling == bool(enabled):
+        return
+    g_callbackProfiling = bool(enabled)
+    RebuildClientCallbackSlots()
+    Debug("EnableCallbackProfiling(): %s" % g_callbackProfiling)
+
+def IsCallbackProfilingEnabled():
+    return g_callbackProfiling
+
+def GetCallbackStats():
+    cdef CallbackProfile profile
+    cdef dict stats = {}
+    for name, profile in g_callbackProfiles.items():
+        stats[name] = profile.GetStats()
+    stats["MessageLoopWork"] = {
+        "count": g_messageLoopWorkCount,
+        "totalTime": g_messageLoopWorkTime,
+        "handlerTime": g_messageLoopWorkHandlerTime,
+        "cefTime": g_messageLoopWorkTime - g_messageLoopWorkHandlerTime,
+    }
+    return stats
+
+def ResetCallbackStats():
+    global g_messageLoopWorkCount, g_messageLoopWorkTime
+    global g_messageLoopWorkHandlerTime, g_handlerTime
+    cdef CallbackProfile profile
+    # Profiles are reset in place, they are referenced by the wrapped
+    # callbacks.
+    for profile in g_callbackProfiles.values():
+        profile.count = 0
+        profile.exceptions = 0
+        profile.totalTime = 0
+        profile.maxTime = 0
+        memset(profile.histogram, 0, sizeof(profile.histogram))
+    g_messageLoopWorkCount = 0
+    g_messageLoopWorkTime = 0
+    g_messageLoopWorkHandlerTime = 0
+    g_handlerTime = 0
@@ -4,8 +4,38 @@
 
 include "cefpython.pyx"
 
+# Python functions passed to javascript are kept in g_pythonCallbacks
+# until the frame or browser they were passed to is released. Long-lived
+# single-page apps that pass lambdas on every update would grow this
+# registry forever, so:
+#  - the same function passed to the same frame is registered only once,
+#    see GetPythonCallbackKey()
+#  - callbacks are indexed by frame and by browser, so that removing them
+#    does not require scanning the whole registry
+#  - bound methods are held with a weak reference to their instance
+#    (when the instance supports it), so that passing a method to
+#    javascript does not keep the whole object alive
+#  - the "python_callbacks_limit" application setting caps the number of
+#    live callbacks, least recently used callbacks are evicted first
+
 cdef int g_pythonCallbackMaxId = 0
-cdef dict g_pythonCallbacks = {}
+
+# callbackId -> PythonCallbackEntry, ordered from least recently used
+# to most recently used.
+cdef object g_pythonCallbacks = collections.OrderedDict()
+# frameId -> set of callbackIds.
+cdef dict g_pythonCallbacksByFrame = {}
+# browserId -> set of frameIds.
+cdef dict g_pythonCallbacksByBrowser = {}
+# (frameId, function key) -> callbackId.
+cdef dict g_pythonCallbackIds = {}
+
+cdef dict g_pythonCallbackStats = {
+    "created": 0,
+    "deduplicated": 0,
+    "evicted": 0,
+    "expired": 0,
+}
 
 # TODO: send callbackId using CefBinaryNamedValue, see:
 # http://www.magpcss.org/ceforum/viewtopic.php?f=6&t=10881
@@ -13,38 +43,141 @@ cdef struct PythonCallback:
     int callbackId
     char uniqueCefBinaryValueSize[16]
 
+cdef class PythonCallbackEntry:
+    cdef int callbackId
+    cdef object browserId
+    cdef object frameId
+    cdef tuple key
+    # Plain functions and methods of objects that do not support
+    # weak references are kept in "function". Methods supporting weak
+    # references have their instance in "instanceRef" and the unbound
+    # function in "function".
+    cdef object function
+    cdef object instanceRef
+    cdef double created
+
+    cdef object GetFunction(self):
+        cdef object instance
+        if self.instanceRef is None:
+            return self.function
+        instance = self.instanceRef()
+        if instance is None:
+            return None
+        return types.MethodType(self.function, instance)
+
+cdef tuple GetPythonCallbackKey(object frameId, object function):
+    # Bound methods are created anew on each attribute access, so they
+    # are identified by their instance and their function.
+    if type(function) == types.MethodType \
+            and function.__self__ is not None:
+        return (frameId, id(function.__self__), id(function.__func__))
+    return (frameId, id(function), 0)
+
+cdef void ExpirePythonCallback(int callbackId) except *:
+    # Called when the instance of a weakly referenced method was
+    # garbage collected.
+    if callbackId in g_pythonCallbacks:
+        g_pythonCallbackStats["expired"] += 1
+        DeletePythonCallback(callbackId)
+        Debug("ExpirePythonCallback(): instance was garbage collected, " \
+                "callbackId = %s" % callbackId)
+
+def OnPythonCallbackInstanceDeleted(int callbackId, object ref):
+    # Weak reference callback, see PutPythonCallback().
+    ExpirePythonCallback(callbackId)
+
+cdef void DeletePythonCallback(int callbackId) except *:
+    cdef PythonCallbackEntry entry = g_pythonCallbacks.pop(callbackId)
+    cdef set frameCallbacks
+    g_pythonCallbackIds.pop(entry.key, None)
+    frameCallbacks = g_pythonCallbacksByFrame.get(entry.frameId)
+    if frameCallbacks is not None:
+        frameCallbacks.discard(callbackId)
+        if not frameCallbacks:
+            del g_pythonCallbacksByFrame[entry.frameId]
+            if entry.browserId in g_pythonCallbacksByBrowser:
+                g_pythonCallbacksByBrowser[entry.browserId].discard(
+                        entry.frameId)
+                if not g_pythonCallbacksByBrowser[entry.browserId]:
+                    del g_pythonCallbacksByBrowser[entry.browserId]
+
+cdef void TouchPythonCallback(int callbackId) except *:
+    # Move to the end of the LRU order. OrderedDict.move_to_end()
+    # is not available in Python 2.
+    g_pythonCallbacks[callbackId] = g_pythonCallbacks.pop(callbackId)
+
+cdef void EvictPythonCallbacks() except *:
+    cdef int limit = int(g_applicationSettings.get(
+            "python_callbacks_limit", 0))
+    cdef int callbackId
+    if limit <= 0:
+        return
+    while len(g_pythonCallbacks) > limit:
+        callbackId = next(iter(g_pythonCallbacks))
+        DeletePythonCallback(callbackId)
+        g_pythonCallbackStats["evicted"] += 1
+        Debug("EvictPythonCallbacks(): evicted python callback, " \
+                "callbackId = %s" % callbackId)
+
 cdef CefRefPtr[CefBinaryValue] PutPythonCallback(
         object browserId,
-        object frameId, 
+        object frameId,
         object function
         ) except *:
-    global g_pythonCallbacks
     global g_pythonCallbackMaxId
     if not browserId:
         raise Exception("PutPythonCallback() FAILED: browserId is empty")
     if not frameId:
         raise Exception("PutPythonCallback() FAILED: frameId is empty")
     cdef PythonCallback pyCallback
+    cdef PythonCallbackEntry entry
+    cdef tuple key = GetPythonCallbackKey(frameId, function)
+    if key in g_pythonCallbackIds:
+        pyCallback.callbackId = g_pythonCallbackIds[key]
+        TouchPythonCallback(pyCallback.callbackId)
+        g_pythonCallbackStats["deduplicated"] += 1
+        return CefBinaryValue_Create(&pyCallback, sizeof(pyCallback))
+
     g_pythonCallbackMaxId += 1
     pyCallback.callbackId = g_pythonCallbackMaxId
-    cdef CefRefPtr[CefBinaryValue] binaryValue = CefBinaryValue_Create(
-            &pyCallback, sizeof(pyCallback))
-    # [0] browserId, [1] frameId, [2] function.
-    g_pythonCallbacks[g_pythonCallbackMaxId] = (browserId, frameId, function)
-    return binaryValue
+    entry = PythonCallbackEntry()
+    entry.callbackId = g_pythonCallbackMaxId
+    entry.browserId = browserId
+    entry.frameId = frameId
+    entry.key = key
+    entry.function = function
+    entry.created = time.time()
+    if type(function) == types.MethodType \
+            and function.__self__ is not None:
+        try:
+            entry.instanceRef = weakref.ref(function.__self__,
+                    functools.partial(OnPythonCallbackInstanceDeleted,
+                            entry.callbackId))
+            entry.function = function.__func__
+        except TypeError:
+            # Instance does not support weak references.
+            pass
+
+    g_pythonCallbacks[entry.callbackId] = entry
+    g_pythonCallbackIds[key] = entry.callbackId
+    g_pythonCallbacksByFrame.setdefault(frameId, set()).add(
+            entry.callbackId)
+    g_pythonCallbacksByBrowser.setdefault(browserId, set()).add(frameId)
+    g_pythonCallbackStats["created"] += 1
+    EvictPythonCallbacks()
+    return CefBinaryValue_Create(&pyCallback, sizeof(pyCallback))
 
 cdef public void RemovePythonCallbacksForFrame(
         int frameId
         ) except * with gil:
-    # Cannot remove elements from g_pythonCallbacks (dict) while iterating.
-    cdef list toRemove = []
+    cdef set frameCallbacks
     try:
-        global g_pythonCallbacks
-        for callbackId, value in g_pythonCallbacks.iteritems():
-            if value[1] == frameId:
-                toRemove.append(callbackId)
-        for callbackId in toRemove:
-            del g_pythonCallbacks[callbackId]
+        frameCallbacks = g_pythonCallbacksByFrame.get(frameId)
+        if not frameCallbacks:
+            return
+        # DeletePythonCallback() modifies the set, iterate over a copy.
+        for callbackId in list(frameCallbacks):
+            DeletePythonCallback(callbackId)
             Debug("RemovePythonCallbacksForFrame(): " \
                     "removed python callback, callbackId = %s" \
                     % callbackId)
@@ -54,40 +187,56 @@ cdef public void RemovePythonCallbacksForFrame(
 
 cdef void RemovePythonCallbacksForBrowser(
         int browserId) except *:
-    cdef list toRemove = []
-    global g_pythonCallbacks
-    for callbackId, value in g_pythonCallbacks.iteritems():
-        if value[0] == browserId:
-            toRemove.append(callbackId)
-    for callbackId in toRemove:
-        del g_pythonCallbacks[callbackId]
-        Debug("RemovePythonCallbacksForBrowser(): " \
-                "removed python callback, callbackId = %s" \
-                % callbackId)
+    cdef set browserFrames = g_pythonCallbacksByBrowser.get(browserId)
+    if not browserFrames:
+        return
+    for frameId in list(browserFrames):
+        for callbackId in list(g_pythonCallbacksByFrame.get(frameId, ())):
+            DeletePythonCallback(callbackId)
+            Debug("RemovePythonCallbacksForBrowser(): " \
+                    "removed python callback, callbackId = %s" \
+                    % callbackId)
+
+cpdef dict GetPythonCallbackStats():
+    return {
+        "live": len(g_pythonCallbacks),
+        "frames": len(g_pythonCallbacksByFrame),
+        "browsers": len(g_pythonCallbacksByBrowser),
+        "limit": int(g_applicationSettings.get("python_callbacks_limit", 0)),
+        "created": g_pythonCallbackStats["created"],
+        "deduplicated": g_pythonCallbackStats["deduplicated"],
+        "evicted": g_pythonCallbackStats["evicted"],
+        "expired": g_pythonCallbackStats["expired"],
+    }
 
 cdef public cpp_bool ExecutePythonCallback(
         CefRefPtr[CefBrowser] cefBrowser,
-        int callbackId, 
+        int callbackId,
         CefRefPtr[CefListValue] cefFunctionArguments,
         ) except * with gil:
+    cdef PythonCallbackEntry entry
     cdef object function
     cdef list functionArguments
-    cdef object returnValue
     try:
-        global g_pythonCallbacks
         if callbackId in g_pythonCallbacks:
-            # [0] browserId, [1] frameId, [2] function.
-            function = g_pythonCallbacks[callbackId][2]
+            entry = g_pythonCallbacks[callbackId]
+            function = entry.GetFunction()
+            if function is None:
+                ExpirePythonCallback(callbackId)
+                Debug("ExecutePythonCallback() FAILED: instance of the " \
+                        "method was garbage collected, callbackId = %s" \
+                        % callbackId)
+                return False
+            TouchPythonCallback(callbackId)
             functionArguments = CefListValueToPyList(
                     cefBrowser, cefFunctionArguments)
-            returnValue = function(*functionArguments)
-            if returnValue is not None:
-                Debug("ExecutePythonCallback() WARNING: function returned" \
-                        "value, but returning values to javascript is not " \
-                        "supported, function name = %s" % function.__name__)
+            DispatchClientCallback(CallFunctionFromJavascript,
+                    (ProfileCallback(function, "PythonCallback"),
+                     getattr(function, "__name__", ""), functionArguments))
             return True
         else:
-            Debug("ExecutePythonCallback() FAILED: callback not found, " \
+            Debug("ExecutePythonCallback() FAILED: callback not found " \
+                    "(frame released or callback evicted), " \
                     "callbackId = %s" % callbackId)
             return False
     except:
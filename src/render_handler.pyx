@@ -19,7 +19,7 @@ cdef public cpp_bool RenderHandler_GetRootScreenRect(
     cdef py_bool ret
     try:
         pyBrowser = GetPyBrowser(cefBrowser)
-        callback = pyBrowser.GetClientCallback("GetRootScreenRect")
+        callback = pyBrowser.clientCallbackSlots[CB_GetRootScreenRect]
         if callback:
             ret = callback(pyBrowser, pyRect)
             if ret:
@@ -46,7 +46,7 @@ cdef public cpp_bool RenderHandler_GetViewRect(
     cdef py_bool ret
     try:
         pyBrowser = GetPyBrowser(cefBrowser)
-        callback = pyBrowser.GetClientCallback("GetViewRect")
+        callback = pyBrowser.clientCallbackSlots[CB_GetViewRect]
         if callback:
             ret = callback(pyBrowser, pyRect)
             if ret:
@@ -73,7 +73,7 @@ cdef public cpp_bool RenderHandler_GetScreenRect(
     cdef py_bool ret
     try:
         pyBrowser = GetPyBrowser(cefBrowser)
-        callback = pyBrowser.GetClientCallback("GetScreenRect")
+        callback = pyBrowser.clientCallbackSlots[CB_GetScreenRect]
         if callback:
             ret = callback(pyBrowser, pyRect)
             if ret:
@@ -102,7 +102,7 @@ cdef public cpp_bool RenderHandler_GetScreenPoint(
     cdef py_bool ret
     try:
         pyBrowser = GetPyBrowser(cefBrowser)
-        callback = pyBrowser.GetClientCallback("GetScreenPoint")
+        callback = pyBrowser.clientCallbackSlots[CB_GetScreenPoint]
         if callback:
             ret = callback(pyBrowser, viewX, viewY, screenCoordinates)
             if ret:
@@ -133,9 +133,9 @@ cdef public void RenderHandler_OnPopupShow(
     cdef PyBrowser pyBrowser
     try:
         pyBrowser = GetPyBrowser(cefBrowser)
-        callback = pyBrowser.GetClientCallback("OnPopupShow")
+        callback = pyBrowser.clientCallbackSlots[CB_OnPopupShow]
         if callback:
-            callback(pyBrowser, show)
+            DispatchClientCallback(callback, (pyBrowser, show))
     except:
         (exc_type, exc_value, exc_trace) = sys.exc_info()
         sys.excepthook(exc_type, exc_value, exc_trace)
@@ -148,10 +148,10 @@ cdef public void RenderHandler_OnPopupSize(
     cdef list pyRect
     try:
         pyBrowser = GetPyBrowser(cefBrowser)
-        callback = pyBrowser.GetClientCallback("OnPopupSize")
+        callback = pyBrowser.clientCallbackSlots[CB_OnPopupSize]
         if callback:
             pyRect = [cefRect.x, cefRect.y, cefRect.width, cefRect.height]
-            callback(pyBrowser, pyRect)
+            DispatchClientCallback(callback, (pyBrowser, pyRect))
     except:
         (exc_type, exc_value, exc_trace) = sys.exc_info()
         sys.excepthook(exc_type, exc_value, exc_trace)
@@ -172,6 +172,8 @@ cdef public void RenderHandler_OnPaint(
     cdef cpp_vector[CefRect].iterator iterator
     cdef CefRect cefRect
     cdef PaintBuffer paintBuffer
+    cdef double paintStart
+    global g_paintsDelivered, g_paintsDropped
     try:
         pyBrowser = GetPyBrowser(cefBrowser)
 
@@ -187,12 +189,24 @@ cdef public void RenderHandler_OnPaint(
         # OFF: | (width, height) = pyBrowser.GetSize(paintElementType)
 
         paintBuffer = CreatePaintBuffer(cefBuffer, width, height)
+        paintBuffer.browser = pyBrowser
 
-        callback = pyBrowser.GetClientCallback("OnPaint")
+        callback = pyBrowser.clientCallbackSlots[CB_OnPaint]
         if callback:
-            callback(pyBrowser, paintElementType, pyDirtyRects, paintBuffer,
-                width, height)
+            g_paintsDelivered += 1
+            if pyBrowser.framePacer is None:
+                callback(pyBrowser, paintElementType, pyDirtyRects,
+                        paintBuffer, width, height)
+            else:
+                paintStart = ProfilerClock()
+                try:
+                    callback(pyBrowser, paintElementType, pyDirtyRects,
+                            paintBuffer, width, height)
+                finally:
+                    pyBrowser.framePacer.Record(pyBrowser,
+                            ProfilerClock() - paintStart)
         else:
+            g_paintsDropped += 1
             return
     except:
         (exc_type, exc_value, exc_trace) = sys.exc_info()
@@ -205,9 +219,9 @@ cdef public void RenderHandler_OnCursorChange(
     cdef PyBrowser pyBrowser
     try:
         pyBrowser = GetPyBrowser(cefBrowser)
-        callback = pyBrowser.GetClientCallback("OnCursorChange")
+        callback = pyBrowser.clientCallbackSlots[CB_OnCursorChange]
         if callback:
-            callback(pyBrowser, <uintptr_t>cursor)
+            DispatchClientCallback(callback, (pyBrowser, <uintptr_t>cursor))
     except:
         (exc_type, exc_value, exc_trace) = sys.exc_info()
         sys.excepthook(exc_type, exc_value, exc_trace)
@@ -218,9 +232,9 @@ cdef public void RenderHandler_OnScrollOffsetChanged(
     cdef PyBrowser pyBrowser
     try:
         pyBrowser = GetPyBrowser(cefBrowser)
-        callback = pyBrowser.GetClientCallback("OnScrollOffsetChanged")
+        callback = pyBrowser.clientCallbackSlots[CB_OnScrollOffsetChanged]
         if callback:
-            callback(pyBrowser)
+            DispatchClientCallback(callback, (pyBrowser,))
     except:
         (exc_type, exc_value, exc_trace) = sys.exc_info()
         sys.excepthook(exc_type, exc_value, exc_trace)
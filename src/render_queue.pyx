@@ -0,0 +1,370 @@
+# Copyright (c) 2012-2014 The CEF Python authors. All rights reserved.
+# License: New BSD License.
+# Website: http://code.google.com/p/cefpython/
+
+# Batch rendering of URLs in off-screen browsers, see RenderQueue.Run().
+# Jobs are driven by load handler callbacks and delayed tasks on the UI
+# thread: a job is complete when the main frame has loaded and the
+# browser is network idle, see network_idle.pyx. Then the extraction
+# steps run, results are passed to the thread consuming the generator
+# through a queue.
+
+include "cefpython.pyx"
+
+if sys.version_info.major == 2:
+    # noinspection PyUnresolvedReferences
+    import Queue as queue
+else:
+    # noinspection PyUnresolvedReferences
+    import queue
+
+class RenderJob(object):
+
+    def __init__(self, index, url):
+        self.index = index
+        self.url = url
+        self.browser = None
+        self.started = time.time()
+        self.loaded = False
+        self.isLoading = True
+        # Incremented on each loading state change, a pending idle
+        # check with a different value does nothing.
+        self.loadingGeneration = 0
+        # NetworkIdleWatch created when the main frame has loaded.
+        self.idleWatch = None
+        self.httpStatusCode = 0
+        # (width, height, rgba bytes) of the last OnPaint, only when
+        # the Screenshot step is used.
+        self.frame = None
+        self.stepsStarted = False
+        self.stepIndex = 0
+        self.results = {}
+        # String visitors are referenced weakly by CEF Python.
+        self.visitors = []
+        self.done = False
+
+class RenderStringVisitor(object):
+
+    def __init__(self):
+        self.future = CreateFuture()
+        self.future.set_running_or_notify_cancel()
+
+    def Visit(self, value):
+        self.future.set_result(value)
+
+def RenderStepSource(browser, job):
+    visitor = RenderStringVisitor()
+    job.visitors.append(visitor)
+    browser.GetMainFrame().GetSource(visitor)
+    return visitor.future
+
+def RenderStepText(browser, job):
+    visitor = RenderStringVisitor()
+    job.visitors.append(visitor)
+    browser.GetMainFrame().GetText(visitor)
+    return visitor.future
+
+def RenderStepScreenshot(browser, job):
+    return job.frame
+
+def RenderStepJavascript(jsCode):
+    def RenderStepJavascriptEvaluate(browser, job):
+        return browser.GetMainFrame().EvaluateJavascript(jsCode)
+    return RenderStepJavascriptEvaluate
+
+def RenderQueueEntryPoint(method):
+    # Tasks and callbacks of RenderQueue, an exception is passed to the
+    # thread consuming the generator, which raises it. Otherwise it would
+    # only be reported and the generator would wait forever.
+    @functools.wraps(method)
+    def RenderQueueEntryPointWrapper(self, *args):
+        try:
+            return method(self, *args)
+        except Exception as exc:
+            self.results.put(exc)
+    return RenderQueueEntryPointWrapper
+
+class RenderQueue(object):
+
+    # Steps for the "steps" argument.
+    Source = staticmethod(RenderStepSource)
+    Text = staticmethod(RenderStepText)
+    Screenshot = staticmethod(RenderStepScreenshot)
+    Javascript = staticmethod(RenderStepJavascript)
+
+    def __init__(self, concurrency=4, timeout=30.0, steps=None,
+            width=1024, height=768, idleMs=500, maxInflight=0,
+            maxJobsPerBrowser=50, browserSettings=None):
+        # steps: list of (name, step) tuples, step(browser, job) returns
+        # a value or a future.
+        if concurrency < 1 or timeout <= 0:
+            raise Exception("RenderQueue failed: concurrency and timeout "
+                    "must be positive")
+        self.concurrency = concurrency
+        self.timeout = timeout
+        if steps is None:
+            steps = [("source", RenderStepSource)]
+        self.steps = list(steps)
+        self.captureFrames = any([step is RenderStepScreenshot
+                for (name, step) in self.steps])
+        self.width = width
+        self.height = height
+        # Validated by NetworkIdleWatch.
+        NetworkIdleWatch(idleMs, maxInflight)
+        self.idleMs = idleMs
+        self.maxInflight = maxInflight
+        self.maxJobsPerBrowser = maxJobsPerBrowser
+        self.browserSettings = browserSettings or {}
+        self.running = False
+
+    def Run(self, urls):
+        # Generator yielding result dicts in the order jobs complete.
+        # Without multi_threaded_message_loop it must be consumed on the
+        # UI thread, it calls MessageLoopWork() while waiting.
+        if self.running:
+            raise Exception("RenderQueue.Run() failed: already running")
+        self.running = True
+        self.closed = False
+        self.urls = iter(urls)
+        self.urlIndex = 0
+        self.exhausted = False
+        self.idleBrowsers = []
+        # browserId -> RenderJob
+        self.jobs = {}
+        # browserId -> number of jobs
+        self.browserJobCounts = {}
+        self.results = queue.Queue()
+        PostPythonTask(TID_UI, self.StartJobs, [])
+        try:
+            while True:
+                result = self.GetResult()
+                if result is None:
+                    break
+                if isinstance(result, Exception):
+                    raise result
+                yield result
+        finally:
+            self.Close()
+            self.running = False
+
+    def GetResult(self):
+        # Every job finishes within "timeout" seconds, so results are
+        # never further apart than that. The margin is for a busy UI
+        # thread, after it the queue is considered stuck.
+        cdef double waitTimeout = self.timeout + 10.0
+        cdef double deadline = time.time() + waitTimeout
+        if IsMultiThreadedMessageLoop():
+            try:
+                return self.results.get(timeout=waitTimeout)
+            except queue.Empty:
+                pass
+        else:
+            while time.time() < deadline:
+                try:
+                    return self.results.get_nowait()
+                except queue.Empty:
+                    pass
+                MessageLoopWork()
+                time.sleep(0.002)
+        return Exception("RenderQueue.Run() failed: no result within "
+                "%s seconds" % waitTimeout)
+
+    @RenderQueueEntryPoint
+    def StartJobs(self):
+        while not self.closed and not self.exhausted \
+                and len(self.jobs) < self.concurrency:
+            try:
+                url = next(self.urls)
+            except StopIteration:
+                self.exhausted = True
+                break
+            self.StartJob(RenderJob(self.urlIndex, url))
+            self.urlIndex += 1
+        if self.exhausted and not self.jobs:
+            while self.idleBrowsers:
+                self.CloseBrowser(self.idleBrowsers.pop())
+            self.results.put(None)
+
+    def StartJob(self, job):
+        if self.idleBrowsers:
+            job.browser = self.idleBrowsers.pop()
+            job.browser.LoadUrl(job.url)
+        else:
+            windowInfo = WindowInfo()
+            windowInfo.SetAsOffscreen(0)
+            job.browser = CreateBrowserSync(windowInfo,
+                    self.browserSettings, job.url)
+            if job.browser is None:
+                raise Exception("RenderQueue failed: CreateBrowserSync() "
+                        "failed")
+            self.browserJobCounts[job.browser.GetIdentifier()] = 0
+            job.browser.SetClientCallbacksDict({
+                "GetViewRect": self.GetViewRect,
+                "OnPaint": self.OnPaint,
+                "OnLoadingStateChange": self.OnLoadingStateChange,
+                "OnLoadEnd": self.OnLoadEnd,
+                "OnLoadError": self.OnLoadError,
+            })
+        self.jobs[job.browser.GetIdentifier()] = job
+        PostPythonTask(TID_UI, self.OnTimeout, [job],
+                <long long>(self.timeout * 1000))
+
+    def FinishJob(self, job, error=None, replaceBrowser=False):
+        browserId = job.browser.GetIdentifier()
+        job.done = True
+        del self.jobs[browserId]
+        self.browserJobCounts[browserId] += 1
+        self.results.put({
+            "index": job.index,
+            "url": job.url,
+            "httpStatusCode": job.httpStatusCode,
+            "results": job.results,
+            "error": error,
+            "time": time.time() - job.started,
+        })
+        # Browsers are closed after "maxJobsPerBrowser" jobs to bound
+        # memory usage, and after errors to not reuse a browser in
+        # an unknown state.
+        if replaceBrowser or self.closed or self.exhausted \
+                or self.browserJobCounts[browserId] >= self.maxJobsPerBrowser:
+            self.CloseBrowser(job.browser)
+        else:
+            self.idleBrowsers.append(job.browser)
+        self.StartJobs()
+
+    def CloseBrowser(self, browser):
+        self.browserJobCounts.pop(browser.GetIdentifier(), None)
+        browser.CloseBrowser(True)
+
+    def GetJob(self, browser):
+        job = self.jobs.get(browser.GetIdentifier())
+        if job is None or job.done:
+            return None
+        return job
+
+    def GetViewRect(self, browser, rect):
+        rect.extend([0, 0, self.width, self.height])
+        return True
+
+    @RenderQueueEntryPoint
+    def OnPaint(self, browser, element, dirtyRects, paintBuffer, width,
+            height):
+        job = self.GetJob(browser)
+        if job and self.captureFrames and element == PET_VIEW:
+            job.frame = (width, height,
+                    paintBuffer.GetString("rgba", "top-left"))
+
+    @RenderQueueEntryPoint
+    def OnLoadingStateChange(self, browser, isLoading, canGoBack,
+            canGoForward):
+        if not IsThread(TID_UI):
+            # Load handler callbacks may be dispatched to other
+            # threads, see SetCallbackDispatcher().
+            PostPythonTask(TID_UI, self.OnLoadingStateChange,
+                    [browser, isLoading, canGoBack, canGoForward])
+            return
+        job = self.GetJob(browser)
+        if job is None:
+            return
+        job.isLoading = isLoading
+        job.loadingGeneration += 1
+        if job.loaded and not isLoading:
+            self.StartIdleCheck(job)
+
+    @RenderQueueEntryPoint
+    def OnLoadEnd(self, browser, frame, httpStatusCode):
+        if not IsThread(TID_UI):
+            PostPythonTask(TID_UI, self.OnLoadEnd,
+                    [browser, frame, httpStatusCode])
+            return
+        job = self.GetJob(browser)
+        if job is None or not frame.IsMain():
+            return
+        job.loaded = True
+        job.httpStatusCode = httpStatusCode
+        if not job.isLoading:
+            self.StartIdleCheck(job)
+
+    @RenderQueueEntryPoint
+    def OnLoadError(self, browser, frame, errorCode, errorTextList,
+            failedUrl):
+        if not IsThread(TID_UI):
+            PostPythonTask(TID_UI, self.OnLoadError,
+                    [browser, frame, errorCode, errorTextList, failedUrl])
+            return
+        job = self.GetJob(browser)
+        if job is None or not frame.IsMain() or errorCode == ERR_ABORTED:
+            return
+        self.FinishJob(job, "load error %s: %s" % (errorCode,
+                errorTextList[0]), True)
+
+    def StartIdleCheck(self, job):
+        # A pending check from an earlier call does nothing.
+        job.loadingGeneration += 1
+        job.idleWatch = NetworkIdleWatch(self.idleMs, self.maxInflight)
+        self.OnIdleCheck(job, job.loadingGeneration)
+
+    @RenderQueueEntryPoint
+    def OnIdleCheck(self, job, loadingGeneration):
+        cdef NetworkIdleWatch idleWatch = job.idleWatch
+        if job.done or job.stepsStarted or job.isLoading \
+                or loadingGeneration != job.loadingGeneration:
+            return
+        if idleWatch.Update(job.browser.GetIdentifier(), time.time()):
+            job.stepsStarted = True
+            self.RunSteps(job)
+            return
+        PostPythonTask(TID_UI, self.OnIdleCheck, [job, loadingGeneration],
+                <long long>(NETWORK_IDLE_CHECK_INTERVAL * 1000))
+
+    def RunSteps(self, job):
+        while job.stepIndex < len(self.steps):
+            (name, step) = self.steps[job.stepIndex]
+            try:
+                value = step(job.browser, job)
+            except Exception as exc:
+                self.FinishJob(job, "step %s failed: %s" % (name, exc))
+                return
+            if hasattr(value, "add_done_callback"):
+                # Continued on the UI thread when the future is done.
+                value.add_done_callback(functools.partial(
+                        self.PostStepDone, job, name))
+                return
+            job.results[name] = value
+            job.stepIndex += 1
+        self.FinishJob(job)
+
+    @RenderQueueEntryPoint
+    def PostStepDone(self, job, name, future):
+        PostPythonTask(TID_UI, self.OnStepDone, [job, name, future])
+
+    @RenderQueueEntryPoint
+    def OnStepDone(self, job, name, future):
+        if job.done:
+            return
+        try:
+            job.results[name] = future.result()
+        except Exception as exc:
+            self.FinishJob(job, "step %s failed: %s" % (name, exc))
+            return
+        job.stepIndex += 1
+        self.RunSteps(job)
+
+    @RenderQueueEntryPoint
+    def OnTimeout(self, job):
+        if job.done:
+            return
+        self.FinishJob(job, "timeout after %s seconds" % self.timeout, True)
+
+    def Close(self):
+        # Closes all browsers, called when the generator finishes
+        # or is closed.
+        if IsMultiThreadedMessageLoop() and not IsThread(TID_UI):
+            return CallOnUiThread("RenderQueue.Close()", self.Close, ())
+        self.closed = True
+        for job in list(self.jobs.values()):
+            job.done = True
+            self.CloseBrowser(job.browser)
+        self.jobs = {}
+        while self.idleBrowsers:
+            self.CloseBrowser(self.idleBrowsers.pop())
@@ -37,6 +37,7 @@ cdef PyRequest CreatePyRequest(CefRefPtr[CefRequest] cefRequest):
     pyRequest.cefRequest = cefRequest
     return pyRequest
 
+@cython.freelist(8)
 cdef class PyRequest:
     cdef CefRefPtr[CefRequest] cefRequest
 
@@ -19,6 +19,7 @@ cdef PyAuthCallback CreatePyAuthCallback(
     pyCallback.cefCallback = cefCallback
     return pyCallback
 
+@cython.freelist(8)
 cdef class PyAuthCallback:
     cdef CefRefPtr[CefAuthCallback] cefCallback
     
@@ -40,6 +41,7 @@ cdef PyRequestCallback CreatePyRequestCallback(
     pyCallback.cefCallback = cefCallback
     return pyCallback
 
+@cython.freelist(8)
 cdef class PyRequestCallback:
     cdef CefRefPtr[CefRequestCallback] cefCallback
 
@@ -66,10 +68,11 @@ cdef public cpp_bool RequestHandler_OnBeforeResourceLoad(
     cdef py_bool returnValue
     try:
         pyBrowser = GetPyBrowser(cefBrowser)
-        pyFrame = GetPyFrame(cefFrame)
-        pyRequest = CreatePyRequest(cefRequest)
-        clientCallback = pyBrowser.GetClientCallback("OnBeforeResourceLoad")
+        clientCallback = pyBrowser.clientCallbackSlots[CB_OnBeforeResourceLoad]
         if clientCallback:
+            # Wrappers are created only when there is a callback.
+            pyFrame = GetPyFrame(cefFrame)
+            pyRequest = CreatePyRequest(cefRequest)
             returnValue = clientCallback(pyBrowser, pyFrame, pyRequest)
             return bool(returnValue)
         else:
@@ -92,11 +95,11 @@ cdef public cpp_bool RequestHandler_OnBeforeBrowse(
     cdef py_bool returnValue
     try:
         pyBrowser = GetPyBrowser(cefBrowser)
-        pyFrame = GetPyFrame(cefFrame)
-        pyRequest = CreatePyRequest(cefRequest)
-        pyIsRedirect = bool(cefIsRedirect)
-        clientCallback = pyBrowser.GetClientCallback("OnBeforeBrowse")
+        clientCallback = pyBrowser.clientCallbackSlots[CB_OnBeforeBrowse]
         if clientCallback:
+            pyFrame = GetPyFrame(cefFrame)
+            pyRequest = CreatePyRequest(cefRequest)
+            pyIsRedirect = bool(cefIsRedirect)
             returnValue = clientCallback(pyBrowser, pyFrame, pyRequest,
                                          pyIsRedirect)
             return bool(returnValue)
@@ -118,10 +121,10 @@ cdef public CefRefPtr[CefResourceHandler] RequestHandler_GetResourceHandler(
     cdef object returnValue
     try:
         pyBrowser = GetPyBrowser(cefBrowser)
-        pyFrame = GetPyFrame(cefFrame)
-        pyRequest = CreatePyRequest(cefRequest)
-        clientCallback = pyBrowser.GetClientCallback("GetResourceHandler")
+        clientCallback = pyBrowser.clientCallbackSlots[CB_GetResourceHandler]
         if clientCallback:
+            pyFrame = GetPyFrame(cefFrame)
+            pyRequest = CreatePyRequest(cefRequest)
             returnValue = clientCallback(pyBrowser, pyFrame, pyRequest)
             if returnValue:
                 return CreateResourceHandler(returnValue)
@@ -148,12 +151,12 @@ cdef public void RequestHandler_OnResourceRedirect(
     cdef object clientCallback
     try:
         pyBrowser = GetPyBrowser(cefBrowser)
-        pyFrame = GetPyFrame(cefFrame)
-        pyOldUrl = CefToPyString(cefOldUrl)
-        pyNewUrlOut = [CefToPyString(cefNewUrl)]
-        pyRequest = CreatePyRequest(cefRequest)
-        clientCallback = pyBrowser.GetClientCallback("OnResourceRedirect")
+        clientCallback = pyBrowser.clientCallbackSlots[CB_OnResourceRedirect]
         if clientCallback:
+            pyFrame = GetPyFrame(cefFrame)
+            pyOldUrl = CefToPyString(cefOldUrl)
+            pyNewUrlOut = [CefToPyString(cefNewUrl)]
+            pyRequest = CreatePyRequest(cefRequest)
             clientCallback(pyBrowser, pyFrame, pyOldUrl, pyNewUrlOut,
                            pyRequest)
             if pyNewUrlOut[0]:
@@ -195,7 +198,7 @@ cdef public cpp_bool RequestHandler_GetAuthCredentials(
         pyAuthCallback = CreatePyAuthCallback(cefAuthCallback)
         pyUsernameOut = [""]
         pyPasswordOut = [""]
-        clientCallback = pyBrowser.GetClientCallback("GetAuthCredentials")
+        clientCallback = pyBrowser.clientCallbackSlots[CB_GetAuthCredentials]
         if clientCallback:
             returnValue = clientCallback(
                     pyBrowser, pyFrame,
@@ -235,7 +238,7 @@ cdef public cpp_bool RequestHandler_OnQuotaRequest(
     try:
         pyBrowser = GetPyBrowser(cefBrowser)
         pyOriginUrl = CefToPyString(cefOriginUrl)
-        clientCallback = pyBrowser.GetClientCallback("OnQuotaRequest")
+        clientCallback = pyBrowser.clientCallbackSlots[CB_OnQuotaRequest]
         if clientCallback:
             returnValue = clientCallback(pyBrowser, pyOriginUrl, long(newSize),
                     CreatePyRequestCallback(cefRequestCallback))
@@ -263,7 +266,7 @@ cdef public CefRefPtr[CefCookieManager] RequestHandler_GetCookieManager(
         pyMainUrl = CefToPyString(cefMainUrl)
         if pyBrowser:
             # Browser may be empty.
-            clientCallback = pyBrowser.GetClientCallback("GetCookieManager")
+            clientCallback = pyBrowser.clientCallbackSlots[CB_GetCookieManager]
         if clientCallback:
             returnValue = clientCallback(pyBrowser, pyMainUrl)
             if returnValue:
@@ -291,7 +294,7 @@ cdef public void RequestHandler_OnProtocolExecution(
         pyBrowser = GetPyBrowser(cefBrowser)
         pyUrl = CefToPyString(cefUrl)
         pyAllowOSExecutionOut = [bool(cefAllowOSExecution)]
-        clientCallback = pyBrowser.GetClientCallback("OnProtocolExecution")
+        clientCallback = pyBrowser.clientCallbackSlots[CB_OnProtocolExecution]
         if clientCallback:
             clientCallback(pyBrowser, pyUrl, pyAllowOSExecutionOut)
             # Since Cython 0.17.4 assigning a value to an argument
@@ -370,10 +373,10 @@ cdef public void RequestHandler_OnRendererProcessTerminated(
     cdef object clientCallback
     try:
         pyBrowser = GetPyBrowser(cefBrowser)
-        clientCallback = pyBrowser.GetClientCallback(
-                "OnRendererProcessTerminated")
+        clientCallback = pyBrowser.clientCallbackSlots[
+                CB_OnRendererProcessTerminated]
         if clientCallback:
-            clientCallback(pyBrowser, cefStatus)
+            DispatchClientCallback(clientCallback, (pyBrowser, cefStatus))
     except:
         (exc_type, exc_value, exc_trace) = sys.exc_info()
         sys.excepthook(exc_type, exc_value, exc_trace)
@@ -391,9 +394,10 @@ cdef public void RequestHandler_OnPluginCrashed(
     cdef object clientCallback
     try:
         pyBrowser = GetPyBrowser(cefBrowser)
-        clientCallback = pyBrowser.GetClientCallback("OnPluginCrashed")
+        clientCallback = pyBrowser.clientCallbackSlots[CB_OnPluginCrashed]
         if clientCallback:
-            clientCallback(pyBrowser, CefToPyString(cefPluginPath))
+            DispatchClientCallback(clientCallback,
+                    (pyBrowser, CefToPyString(cefPluginPath)))
     except:
         (exc_type, exc_value, exc_trace) = sys.exc_info()
         sys.excepthook(exc_type, exc_value, exc_trace)
@@ -66,7 +66,8 @@ cdef class PyResourceHandler:
         if self.userResourceHandler and (
                 hasattr(self.userResourceHandler, funcName) and (
                     callable(getattr(self.userResourceHandler, funcName)))):
-            return getattr(self.userResourceHandler, funcName)
+            return ProfileCallback(getattr(self.userResourceHandler,
+                    funcName), funcName, "ResourceHandler")
 
 # ------------------------------------------------------------------------------
 # ResourceHandler callbacks
@@ -85,11 +86,11 @@ cdef public cpp_bool ResourceHandler_ProcessRequest(
     try:
         assert IsThread(TID_IO), "Must be called on the IO thread"
         pyResourceHandler = GetPyResourceHandler(resourceHandlerId)
-        pyRequest = CreatePyRequest(cefRequest)
-        pyCallback = CreatePyCallback(cefCallback)
         if pyResourceHandler:
             userCallback = pyResourceHandler.GetCallback("ProcessRequest")
             if userCallback:
+                pyRequest = CreatePyRequest(cefRequest)
+                pyCallback = CreatePyCallback(cefCallback)
                 returnValue = userCallback(pyRequest, pyCallback)
                 return bool(returnValue)
         return False
@@ -112,12 +113,12 @@ cdef public void ResourceHandler_GetResponseHeaders(
     try:
         assert IsThread(TID_IO), "Must be called on the IO thread"
         pyResourceHandler = GetPyResourceHandler(resourceHandlerId)
-        pyResponse = CreatePyResponse(cefResponse)
-        responseLengthOut = [cefResponseLength]
-        redirectUrlOut = [CefToPyString(cefRedirectUrl)]
         if pyResourceHandler:
             userCallback = pyResourceHandler.GetCallback("GetResponseHeaders")
             if userCallback:
+                pyResponse = CreatePyResponse(cefResponse)
+                responseLengthOut = [cefResponseLength]
+                redirectUrlOut = [CefToPyString(cefRedirectUrl)]
                 returnValue = userCallback(pyResponse, responseLengthOut,
                         redirectUrlOut)
                 (&cefResponseLength)[0] = <int64>long(responseLengthOut[0])
@@ -145,15 +146,16 @@ cdef public cpp_bool ResourceHandler_ReadResponse(
     cdef char* tempData
     cdef int tempDataLength
     cdef int pyBytesRead
+    global g_resourceHandlerBytes
     try:
         assert IsThread(TID_IO), "Must be called on the IO thread"
         pyResourceHandler = GetPyResourceHandler(resourceHandlerId)
-        dataOut = [""]
-        bytesReadOut = [0]
-        pyCallback = CreatePyCallback(cefCallback)
         if pyResourceHandler:
             userCallback = pyResourceHandler.GetCallback("ReadResponse")
             if userCallback:
+                dataOut = [""]
+                bytesReadOut = [0]
+                pyCallback = CreatePyCallback(cefCallback)
                 returnValue = userCallback(dataOut, bytesToRead, bytesReadOut,
                         pyCallback)
                 pyBytesRead = int(bytesReadOut[0])
@@ -164,6 +166,7 @@ cdef public cpp_bool ResourceHandler_ReadResponse(
                     memcpy(cefDataOut, tempData, len(dataOut[0]))
                     assert pyBytesRead >= 0, "bytesReadOut < 0"
                     (&cefBytesRead)[0] = pyBytesRead
+                    g_resourceHandlerBytes += pyBytesRead
                     # True should be returned now.
                 else:
                     (&cefBytesRead)[0] = 0
@@ -188,10 +191,10 @@ cdef public cpp_bool ResourceHandler_CanGetCookie(
     try:
         assert IsThread(TID_IO), "Must be called on the IO thread"
         pyResourceHandler = GetPyResourceHandler(resourceHandlerId)
-        pyCookie = CreatePyCookie(cefCookie)
         if pyResourceHandler:
             userCallback = pyResourceHandler.GetCallback("CanGetCookie")
             if userCallback:
+                pyCookie = CreatePyCookie(cefCookie)
                 returnValue = userCallback(pyCookie)
                 return bool(returnValue)
         return False
@@ -210,10 +213,10 @@ cdef public cpp_bool ResourceHandler_CanSetCookie(
     try:
         assert IsThread(TID_IO), "Must be called on the IO thread"
         pyResourceHandler = GetPyResourceHandler(resourceHandlerId)
-        pyCookie = CreatePyCookie(cefCookie)
         if pyResourceHandler:
             userCallback = pyResourceHandler.GetCallback("CanSetCookie")
             if userCallback:
+                pyCookie = CreatePyCookie(cefCookie)
                 returnValue = userCallback(pyCookie)
                 return bool(returnValue)
         return False
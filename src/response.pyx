@@ -9,6 +9,7 @@ cdef PyResponse CreatePyResponse(CefRefPtr[CefResponse] cefResponse):
     pyResponse.cefResponse = cefResponse
     return pyResponse
 
+@cython.freelist(8)
 cdef class PyResponse:
     cdef CefRefPtr[CefResponse] cefResponse
 
@@ -39,7 +39,8 @@ cdef class PyStringVisitor:
         if self.userStringVisitor and (
                 hasattr(self.userStringVisitor, funcName) and (
                 callable(getattr(self.userStringVisitor, funcName)))):
-            return getattr(self.userStringVisitor, funcName)
+            return ProfileCallback(getattr(self.userStringVisitor,
+                    funcName), funcName, "StringVisitor")
 
 # -----------------------------------------------------------------------------
 # C++ StringVisitor
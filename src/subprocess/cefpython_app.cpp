@@ -17,6 +17,11 @@
 #include "LOG_DEBUG.h"
 #include <vector>
 #include <algorithm>
+#if defined(OS_WIN)
+#include <windows.h>
+#else
+#include <unistd.h>
+#endif
 #include "v8utils.h"
 #include "javascript_callback.h"
 #include "v8function_handler.h"
@@ -142,6 +147,9 @@ void CefPythonApp::OnRenderThreadCreated(CefRefPtr<CefListValue> extra_info) {
     if (extra_info->GetType(1) == VTYPE_STRING) {
         g_logFile = extra_info->GetString(1).ToString();
     }
+    if (extra_info->GetType(2) == VTYPE_INT) {
+        SetJavascriptCallbacksLimit(extra_info->GetInt(2));
+    }
     if (!commandLineString_.empty()) {
         // See comment in OnBeforeCommandLineProcessing().
         DebugLog(commandLineString_.c_str());
@@ -153,11 +161,24 @@ void CefPythonApp::OnWebKitInitialized() {
 }
 
 void CefPythonApp::OnBrowserCreated(CefRefPtr<CefBrowser> browser) {
+    // Let the Browser process know which Renderer process hosts
+    // the browser, see Browser.GetRendererProcessId(). Called again
+    // in the new Renderer process when navigation swaps processes.
+    CefRefPtr<CefProcessMessage> message = CefProcessMessage::Create(
+            "OnBrowserCreated");
+    CefRefPtr<CefListValue> arguments = message->GetArgumentList();
+#if defined(OS_WIN)
+    arguments->SetInt(0, (int)GetCurrentProcessId());
+#else
+    arguments->SetInt(0, (int)getpid());
+#endif
+    browser->SendProcessMessage(PID_BROWSER, message);
 }
 
 void CefPythonApp::OnBrowserDestroyed(CefRefPtr<CefBrowser> browser) {
     DebugLog("Renderer: OnBrowserDestroyed()");
     RemoveJavascriptBindings(browser);
+    RemoveUserScripts(browser);
 }
 
 bool CefPythonApp::OnBeforeNavigation(CefRefPtr<CefBrowser> browser,
@@ -214,6 +235,7 @@ void CefPythonApp::OnContextCreated(CefRefPtr<CefBrowser> browser,
             }
         }
     }
+    RunUserScriptsForFrame(browser, frame, context);
 }
 
 void CefPythonApp::OnContextReleased(CefRefPtr<CefBrowser> browser,
@@ -307,6 +329,52 @@ bool CefPythonApp::OnProcessMessageReceived(CefRefPtr<CefBrowser> browser,
                     "(int)");
             return false;
         }
+    } else if (messageName == "SetUserScripts") {
+        if (args->GetSize() == 1 && args->GetType(0) == VTYPE_LIST) {
+            SetUserScripts(browser, args->GetList(0)->Copy());
+        } else {
+            DebugLog("Renderer: OnProcessMessageReceived(): invalid arguments,"\
+                    " messageName=SetUserScripts");
+            return false;
+        }
+    } else if (messageName == "EvaluateJavascript"
+            || messageName == "CallFunctionAsync") {
+        // EvaluateJavascript: [requestId, frameId, code]
+        // CallFunctionAsync: [requestId, frameId, functionName, arguments]
+        bool callFunction = (messageName == "CallFunctionAsync");
+        if (args->GetSize() == (callFunction ? 4 : 3)
+                && args->GetType(0) == VTYPE_INT
+                && args->GetType(1) == VTYPE_INT
+                && args->GetType(2) == VTYPE_STRING
+                && (!callFunction || args->GetType(3) == VTYPE_LIST)) {
+            int requestId = args->GetInt(0);
+            int64 frameId = args->GetInt(1);
+            CefRefPtr<CefFrame> frame = browser->GetFrame(frameId);
+            if (!frame.get()) {
+                SendJavascriptResult(browser, requestId, NULL,
+                                     "frame not found");
+            } else if (callFunction) {
+                CallFunctionAsync(browser, frame, requestId,
+                                  args->GetString(2), args->GetList(3));
+            } else {
+                EvaluateJavascript(browser, frame, requestId,
+                                   args->GetString(2));
+            }
+        } else {
+            std::string logMessage = "Renderer: OnProcessMessageReceived: " \
+                    "invalid arguments, messageName=";
+            logMessage.append(messageName);
+            DebugLog(logMessage.c_str());
+            return false;
+        }
+    } else if (messageName == "ReleaseJavascriptCallback") {
+        if (args->GetSize() == 1 && args->GetType(0) == VTYPE_INT) {
+            ReleaseJavascriptCallback(args->GetInt(0));
+        } else {
+            DebugLog("Renderer: OnProcessMessageReceived: invalid arguments," \
+                    " messageName=ReleaseJavascriptCallback");
+            return false;
+        }
     }
     return true;
 }
@@ -599,3 +667,225 @@ void CefPythonApp::DoJavascriptBindingsForFrame(CefRefPtr<CefBrowser> browser,
     if (didEnterContext)
         context->Exit();
 }
+
+// Executes a user script with run_at="document_end", it is added
+// as a "DOMContentLoaded" event listener.
+class UserScriptHandler : public CefV8Handler {
+ public:
+  UserScriptHandler(CefRefPtr<CefFrame> frame, const CefString& source)
+      : frame_(frame), source_(source) {
+  }
+
+  virtual bool Execute(const CefString& name,
+                       CefRefPtr<CefV8Value> object,
+                       const CefV8ValueList& arguments,
+                       CefRefPtr<CefV8Value>& retval,
+                       CefString& exception) OVERRIDE {
+    frame_->ExecuteJavaScript(source_, frame_->GetURL(), 0);
+    return true;
+  }
+
+ private:
+  CefRefPtr<CefFrame> frame_;
+  CefString source_;
+  IMPLEMENT_REFCOUNTING(UserScriptHandler);
+};
+
+// Matches url against a pattern in which "*" matches any sequence
+// of characters. An empty pattern matches all urls.
+bool MatchUrlFilter(const std::string& pattern, const std::string& url) {
+    if (pattern.empty()) {
+        return true;
+    }
+    size_t p = 0, u = 0;
+    size_t starPosition = std::string::npos, matchPosition = 0;
+    while (u < url.size()) {
+        if (p < pattern.size() && pattern[p] == '*') {
+            starPosition = p++;
+            matchPosition = u;
+        } else if (p < pattern.size() && pattern[p] == url[u]) {
+            p++;
+            u++;
+        } else if (starPosition != std::string::npos) {
+            p = starPosition + 1;
+            u = ++matchPosition;
+        } else {
+            return false;
+        }
+    }
+    while (p < pattern.size() && pattern[p] == '*') {
+        p++;
+    }
+    return p == pattern.size();
+}
+
+void CefPythonApp::SetUserScripts(CefRefPtr<CefBrowser> browser,
+                                  CefRefPtr<CefListValue> scripts) {
+    userScripts_[browser->GetIdentifier()] = scripts;
+}
+
+void CefPythonApp::RemoveUserScripts(CefRefPtr<CefBrowser> browser) {
+    userScripts_.erase(browser->GetIdentifier());
+}
+
+void CefPythonApp::RunUserScriptsForFrame(CefRefPtr<CefBrowser> browser,
+                                          CefRefPtr<CefFrame> frame,
+                                          CefRefPtr<CefV8Context> context) {
+    std::map<int, CefRefPtr<CefListValue> >::iterator it = \
+            userScripts_.find(browser->GetIdentifier());
+    if (it == userScripts_.end()) {
+        return;
+    }
+    CefRefPtr<CefListValue> scripts = it->second;
+    std::string url = frame->GetURL().ToString();
+    bool didEnterContext = false;
+    for (size_t i = 0; i < scripts->GetSize(); ++i) {
+        // {"source": .., "runAt": .., "frames": .., "urlFilter": ..}
+        if (scripts->GetType((int)i) != VTYPE_DICTIONARY) {
+            DebugLog("Renderer: RunUserScriptsForFrame() FAILED: " \
+                    "invalid data");
+            continue;
+        }
+        CefRefPtr<CefDictionaryValue> script = \
+                scripts->GetDictionary((int)i);
+        if (!frame->IsMain()
+                && script->GetString("frames").ToString() != "all") {
+            continue;
+        }
+        if (!MatchUrlFilter(script->GetString("urlFilter").ToString(),
+                url)) {
+            continue;
+        }
+        CefString source = script->GetString("source");
+        if (script->GetString("runAt").ToString() == "context_created") {
+            frame->ExecuteJavaScript(source, frame->GetURL(), 0);
+            continue;
+        }
+        // runAt == "document_end"
+        if (!didEnterContext && !CefV8Context::InContext()) {
+            if (!context->IsValid()) {
+                DebugLog("Renderer: RunUserScriptsForFrame() FAILED: " \
+                        "V8 context provided by CEF is invalid");
+                return;
+            }
+            context->Enter();
+            didEnterContext = true;
+        }
+        CefRefPtr<CefV8Value> document = \
+                context->GetGlobal()->GetValue("document");
+        CefRefPtr<CefV8Value> addEventListener;
+        if (document.get() && document->IsObject()) {
+            addEventListener = document->GetValue("addEventListener");
+        }
+        if (!addEventListener.get() || !addEventListener->IsFunction()) {
+            DebugLog("Renderer: RunUserScriptsForFrame() FAILED: " \
+                    "document.addEventListener not found");
+            continue;
+        }
+        CefV8ValueList v8Arguments;
+        v8Arguments.push_back(CefV8Value::CreateString("DOMContentLoaded"));
+        v8Arguments.push_back(CefV8Value::CreateFunction("cefpythonUserScript",
+                new UserScriptHandler(frame, source)));
+        addEventListener->ExecuteFunction(document, v8Arguments);
+    }
+    if (didEnterContext) {
+        context->Exit();
+    }
+}
+
+void CefPythonApp::EvaluateJavascript(CefRefPtr<CefBrowser> browser,
+                                      CefRefPtr<CefFrame> frame,
+                                      int requestId,
+                                      const CefString& code) {
+    CefRefPtr<CefV8Context> context = frame->GetV8Context();
+    if (!context.get() || !context->IsValid()) {
+        SendJavascriptResult(browser, requestId, NULL,
+                             "V8 context is invalid");
+        return;
+    }
+    context->Enter();
+    CefRefPtr<CefV8Value> retval;
+    CefRefPtr<CefV8Exception> exception;
+    if (context->Eval(code, retval, exception)) {
+        SendJavascriptResult(browser, requestId, retval, "");
+    } else if (exception.get()) {
+        SendJavascriptResult(browser, requestId, NULL,
+                             exception->GetMessage());
+    } else {
+        SendJavascriptResult(browser, requestId, NULL, "Eval() failed");
+    }
+    context->Exit();
+}
+
+void CefPythonApp::CallFunctionAsync(CefRefPtr<CefBrowser> browser,
+                                     CefRefPtr<CefFrame> frame,
+                                     int requestId,
+                                     const CefString& functionName,
+                                     CefRefPtr<CefListValue> functionArguments) {
+    CefRefPtr<CefV8Context> context = frame->GetV8Context();
+    if (!context.get() || !context->IsValid()) {
+        SendJavascriptResult(browser, requestId, NULL,
+                             "V8 context is invalid");
+        return;
+    }
+    context->Enter();
+    // Resolve "object.method" names, the object is passed as "this".
+    std::string strFunctionName = functionName.ToString();
+    CefRefPtr<CefV8Value> thisObject = context->GetGlobal();
+    CefRefPtr<CefV8Value> function = thisObject;
+    size_t start = 0;
+    while (function.get() && function->IsObject()) {
+        size_t dotPosition = strFunctionName.find(".", start);
+        thisObject = function;
+        function = thisObject->GetValue(CefString(strFunctionName.substr(
+                start, dotPosition == std::string::npos ? \
+                std::string::npos : dotPosition - start)));
+        if (dotPosition == std::string::npos) {
+            break;
+        }
+        start = dotPosition + 1;
+    }
+    if (!function.get() || !function->IsFunction()) {
+        std::string error = "function not found: ";
+        error.append(strFunctionName);
+        SendJavascriptResult(browser, requestId, NULL, error);
+        context->Exit();
+        return;
+    }
+    CefV8ValueList v8Arguments = CefListValueToCefV8ValueList(
+            functionArguments);
+    CefRefPtr<CefV8Value> retval = function->ExecuteFunction(
+            thisObject, v8Arguments);
+    if (retval.get()) {
+        SendJavascriptResult(browser, requestId, retval, "");
+    } else if (function->HasException()) {
+        SendJavascriptResult(browser, requestId, NULL,
+                             function->GetException()->GetMessage());
+        function->ClearException();
+    } else {
+        SendJavascriptResult(browser, requestId, NULL,
+                             "ExecuteFunction() failed");
+    }
+    context->Exit();
+}
+
+void CefPythonApp::SendJavascriptResult(CefRefPtr<CefBrowser> browser,
+                                        int requestId,
+                                        CefRefPtr<CefV8Value> result,
+                                        const CefString& error) {
+    // [requestId, success, [result], error]
+    // Must be called with the context entered, functions in the
+    // result are converted to javascript callbacks.
+    CefRefPtr<CefProcessMessage> message = \
+            CefProcessMessage::Create("EvaluateJavascriptResult");
+    CefRefPtr<CefListValue> arguments = message->GetArgumentList();
+    CefRefPtr<CefListValue> resultList = CefListValue::Create();
+    arguments->SetInt(0, requestId);
+    arguments->SetBool(1, result.get() != NULL);
+    if (result.get()) {
+        V8ValueAppendToCefListValue(result, resultList);
+    }
+    arguments->SetList(2, resultList);
+    arguments->SetString(3, error);
+    browser->SendProcessMessage(PID_BROWSER, message);
+}
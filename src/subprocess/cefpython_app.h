@@ -24,6 +24,7 @@ class CefPythonApp :
         public CefRenderProcessHandler {
  protected:
   std::map<int, CefRefPtr<CefDictionaryValue> > javascriptBindings_;
+  std::map<int, CefRefPtr<CefListValue> > userScripts_;
   std::string commandLineString_;
   CefRefPtr<CefPrintHandler> print_handler_;
 
@@ -130,6 +131,47 @@ class CefPythonApp :
                                     CefRefPtr<CefFrame> frame,
                                     CefRefPtr<CefV8Context> context);
 
+  // ---------------------------------------------------------------------------
+  // User scripts
+  // ---------------------------------------------------------------------------
+
+  // Scripts added with Browser.AddUserScript() are sent once using the
+  // "SetUserScripts" process message and executed for each new context
+  // in OnContextCreated(), without involving the Browser process.
+
+  virtual void SetUserScripts(CefRefPtr<CefBrowser> browser,
+                              CefRefPtr<CefListValue> scripts);
+
+  virtual void RemoveUserScripts(CefRefPtr<CefBrowser> browser);
+
+  virtual void RunUserScriptsForFrame(CefRefPtr<CefBrowser> browser,
+                                      CefRefPtr<CefFrame> frame,
+                                      CefRefPtr<CefV8Context> context);
+
+  // ---------------------------------------------------------------------------
+  // Javascript evaluation
+  // ---------------------------------------------------------------------------
+
+  // Frame.EvaluateJavascript() and Frame.CallFunctionAsync() in the
+  // Browser process. The result is sent back using the
+  // "EvaluateJavascriptResult" process message.
+
+  virtual void EvaluateJavascript(CefRefPtr<CefBrowser> browser,
+                                  CefRefPtr<CefFrame> frame,
+                                  int requestId,
+                                  const CefString& code);
+
+  virtual void CallFunctionAsync(CefRefPtr<CefBrowser> browser,
+                                 CefRefPtr<CefFrame> frame,
+                                 int requestId,
+                                 const CefString& functionName,
+                                 CefRefPtr<CefListValue> functionArguments);
+
+  virtual void SendJavascriptResult(CefRefPtr<CefBrowser> browser,
+                                    int requestId,
+                                    CefRefPtr<CefV8Value> result,
+                                    const CefString& error);
+
 private:
   IMPLEMENT_REFCOUNTING(CefPythonApp);
 };
@@ -4,10 +4,20 @@
 
 #include "javascript_callback.h"
 #include <map>
+#include <set>
+#include <list>
 #include <sstream>
 #include "DebugLog.h"
 #include "v8utils.h"
 #include "cefpython_app.h"
+#include "include/cef_task.h"
+#include "include/wrapper/cef_closure_task.h"
+#include "include/base/cef_bind.h"
+#if defined(OS_WIN)
+#include <windows.h>
+#else
+#include <unistd.h>
+#endif
 
 template<typename T>
 inline std::string AnyToString(const T& value)
@@ -17,21 +27,82 @@ inline std::string AnyToString(const T& value)
     return oss.str();
 }
 
-typedef std::map<int,
-                 std::pair<CefRefPtr<CefFrame>, CefRefPtr<CefV8Value> > >
-                 JavascriptCallbackMap;
+// Javascript functions passed to Python are kept alive here until
+// the JavascriptCallback object in the Browser process is released,
+// the frame's context is released, or the callback gets evicted
+// when "javascript_callbacks_limit" is exceeded.
+
+struct JavascriptCallbackEntry {
+    CefRefPtr<CefFrame> frame;
+    int64 frameId;
+    CefRefPtr<CefV8Value> function;
+    // Number of JavascriptCallback objects in the Browser process
+    // referring to this callback.
+    int refCount;
+    // Position in g_jsCallbackLru.
+    std::list<int>::iterator lruPosition;
+};
+
+typedef std::map<int, JavascriptCallbackEntry> JavascriptCallbackMap;
+typedef std::map<int64, std::set<int> > JavascriptCallbackFrameIndex;
 
 JavascriptCallbackMap g_jsCallbackMap;
+// frameId -> callbackIds, for O(k) removal when frame is released.
+JavascriptCallbackFrameIndex g_jsCallbackFrameIndex;
+// Least recently used callbacks first.
+std::list<int> g_jsCallbackLru;
 int g_jsCallbackMaxId = 0;
+int g_jsCallbacksLimit = 0;
+JavascriptCallbackStats g_jsCallbackStats = {0, 0, 0, 0, 0};
 
-CefString PutJavascriptCallback(
-        CefRefPtr<CefFrame> frame, CefRefPtr<CefV8Value> jsCallback) {
+// The stats are reported to the Browser process with the
+// "JavascriptCallbackStats" process message, see
+// cefpython.GetJavascriptCallbackStats(). Changes are coalesced, at most
+// one message is sent per JS_CALLBACK_STATS_DELAY_MS. The stats are per
+// process, they are sent through the browser of the latest change.
+const int64 JS_CALLBACK_STATS_DELAY_MS = 100;
+bool g_jsCallbackStatsPending = false;
+CefRefPtr<CefBrowser> g_jsCallbackStatsBrowser;
+
+void SendJavascriptCallbackStats() {
+    g_jsCallbackStatsPending = false;
+    CefRefPtr<CefBrowser> browser = g_jsCallbackStatsBrowser;
+    g_jsCallbackStatsBrowser = NULL;
+    if (!browser.get()) {
+        return;
+    }
+    JavascriptCallbackStats stats = GetJavascriptCallbackStats();
+    CefRefPtr<CefProcessMessage> message = CefProcessMessage::Create(
+            "JavascriptCallbackStats");
+    CefRefPtr<CefListValue> arguments = message->GetArgumentList();
+#if defined(OS_WIN)
+    arguments->SetInt(0, (int)GetCurrentProcessId());
+#else
+    arguments->SetInt(0, (int)getpid());
+#endif
+    arguments->SetInt(1, stats.live);
+    arguments->SetInt(2, stats.created);
+    arguments->SetInt(3, stats.deduplicated);
+    arguments->SetInt(4, stats.released);
+    arguments->SetInt(5, stats.evicted);
+    browser->SendProcessMessage(PID_BROWSER, message);
+}
+
+void ScheduleJavascriptCallbackStats(CefRefPtr<CefBrowser> browser) {
+    g_jsCallbackStatsBrowser = browser;
+    if (g_jsCallbackStatsPending) {
+        return;
+    }
+    g_jsCallbackStatsPending = true;
+    CefPostDelayedTask(TID_RENDERER, CefCreateClosureTask(base::Bind(
+            &SendJavascriptCallbackStats)), JS_CALLBACK_STATS_DELAY_MS);
+}
+
+std::string GetJavascriptCallbackString(int callbackId, int64 frameId,
+                                        const CefString& functionName) {
     // Returns a "####cefpython####" string followed by json encoded data.
     // {"what":"javascript-callback","callbackId":123,
     //  "frameId":123,"functionName":"xx"}
-    int callbackId = ++g_jsCallbackMaxId;
-    int64 frameId = frame->GetIdentifier();
-    CefString functionName = jsCallback->GetFunctionName();
     std::string strCallbackId = "####cefpython####";
     strCallbackId.append("{");
     // JSON format allows only for double quotes.
@@ -41,29 +112,105 @@ CefString PutJavascriptCallback(
     strCallbackId.append(",\"functionName\":\"").append(functionName) \
             .append("\"");
     strCallbackId.append("}");
-    g_jsCallbackMap.insert(std::make_pair(
-            callbackId,
-            std::make_pair(frame, jsCallback)));
     return strCallbackId;
 }
 
+void TouchJavascriptCallback(JavascriptCallbackEntry& jsCallback) {
+    g_jsCallbackLru.splice(g_jsCallbackLru.end(), g_jsCallbackLru,
+                           jsCallback.lruPosition);
+}
+
+void EraseJavascriptCallback(JavascriptCallbackMap::iterator it) {
+    int callbackId = it->first;
+    JavascriptCallbackFrameIndex::iterator frameIt = \
+            g_jsCallbackFrameIndex.find(it->second.frameId);
+    if (frameIt != g_jsCallbackFrameIndex.end()) {
+        frameIt->second.erase(callbackId);
+        if (frameIt->second.empty()) {
+            g_jsCallbackFrameIndex.erase(frameIt);
+        }
+    }
+    g_jsCallbackLru.erase(it->second.lruPosition);
+    g_jsCallbackMap.erase(it);
+}
+
+void EvictJavascriptCallbacks() {
+    if (g_jsCallbacksLimit <= 0) {
+        return;
+    }
+    while ((int)g_jsCallbackMap.size() > g_jsCallbacksLimit) {
+        int callbackId = g_jsCallbackLru.front();
+        JavascriptCallbackMap::iterator it = g_jsCallbackMap.find(callbackId);
+        if (it == g_jsCallbackMap.end()) {
+            // Should never happen, keep the LRU list consistent.
+            g_jsCallbackLru.pop_front();
+            continue;
+        }
+        EraseJavascriptCallback(it);
+        g_jsCallbackStats.evicted++;
+        std::string logMessage = "Renderer: EvictJavascriptCallbacks(): "
+                "evicted js callback, id=";
+        logMessage.append(AnyToString(callbackId));
+        DebugLog(logMessage.c_str());
+    }
+}
+
+CefString PutJavascriptCallback(
+        CefRefPtr<CefFrame> frame, CefRefPtr<CefV8Value> jsCallback) {
+    int64 frameId = frame->GetIdentifier();
+    CefString functionName = jsCallback->GetFunctionName();
+    // The same js function passed again to Python in the same frame
+    // reuses the existing callback.
+    JavascriptCallbackFrameIndex::iterator frameIt = \
+            g_jsCallbackFrameIndex.find(frameId);
+    if (frameIt != g_jsCallbackFrameIndex.end()) {
+        for (std::set<int>::iterator idIt = frameIt->second.begin(); \
+                idIt != frameIt->second.end(); ++idIt) {
+            JavascriptCallbackMap::iterator it = g_jsCallbackMap.find(*idIt);
+            if (it != g_jsCallbackMap.end() \
+                    && it->second.function->IsSame(jsCallback)) {
+                it->second.refCount++;
+                TouchJavascriptCallback(it->second);
+                g_jsCallbackStats.deduplicated++;
+                ScheduleJavascriptCallbackStats(frame->GetBrowser());
+                return GetJavascriptCallbackString(it->first, frameId,
+                                                   functionName);
+            }
+        }
+    }
+    int callbackId = ++g_jsCallbackMaxId;
+    JavascriptCallbackEntry& newCallback = g_jsCallbackMap[callbackId];
+    newCallback.frame = frame;
+    newCallback.frameId = frameId;
+    newCallback.function = jsCallback;
+    newCallback.refCount = 1;
+    newCallback.lruPosition = g_jsCallbackLru.insert(g_jsCallbackLru.end(),
+                                                     callbackId);
+    g_jsCallbackFrameIndex[frameId].insert(callbackId);
+    g_jsCallbackStats.created++;
+    EvictJavascriptCallbacks();
+    ScheduleJavascriptCallbackStats(frame->GetBrowser());
+    return GetJavascriptCallbackString(callbackId, frameId, functionName);
+}
+
 bool ExecuteJavascriptCallback(int callbackId, CefRefPtr<CefListValue> args) {
     if (g_jsCallbackMap.empty()) {
         DebugLog("Renderer: ExecuteJavascriptCallback() FAILED: " \
                  "callback map is empty");
         return false;
     }
-    JavascriptCallbackMap::const_iterator it = g_jsCallbackMap.find(
+    JavascriptCallbackMap::iterator it = g_jsCallbackMap.find(
             callbackId);
     if (it == g_jsCallbackMap.end()) {
         std::string logMessage = "Renderer: ExecuteJavascriptCallback() "
-                "FAILED: callback not found, id=";
+                "FAILED: callback not found (released or evicted), id=";
         logMessage.append(AnyToString(callbackId));
         DebugLog(logMessage.c_str());
         return false;
     }
-    CefRefPtr<CefFrame> frame = it->second.first;
-    CefRefPtr<CefV8Value> callback = it->second.second;
+    TouchJavascriptCallback(it->second);
+    CefRefPtr<CefFrame> frame = it->second.frame;
+    CefRefPtr<CefV8Value> callback = it->second.function;
     CefRefPtr<CefV8Context> context = frame->GetV8Context();
     context->Enter();
     CefV8ValueList v8Arguments = CefListValueToCefV8ValueList(args);
@@ -80,25 +227,53 @@ bool ExecuteJavascriptCallback(int callbackId, CefRefPtr<CefListValue> args) {
     }
 }
 
+void ReleaseJavascriptCallback(int callbackId) {
+    JavascriptCallbackMap::iterator it = g_jsCallbackMap.find(callbackId);
+    if (it == g_jsCallbackMap.end()) {
+        // Already removed along with its frame, or evicted.
+        return;
+    }
+    if (--it->second.refCount > 0) {
+        return;
+    }
+    ScheduleJavascriptCallbackStats(it->second.frame->GetBrowser());
+    EraseJavascriptCallback(it);
+    g_jsCallbackStats.released++;
+    std::string logMessage = "Renderer: ReleaseJavascriptCallback(): "
+            "removed js callback, id=";
+    logMessage.append(AnyToString(callbackId));
+    DebugLog(logMessage.c_str());
+}
+
 void RemoveJavascriptCallbacksForFrame(CefRefPtr<CefFrame> frame) {
-    if (g_jsCallbackMap.empty()) {
+    JavascriptCallbackFrameIndex::iterator frameIt = \
+            g_jsCallbackFrameIndex.find(frame->GetIdentifier());
+    if (frameIt == g_jsCallbackFrameIndex.end()) {
         return;
     }
-    JavascriptCallbackMap::iterator it = g_jsCallbackMap.begin();
-    int64 frameId = frame->GetIdentifier();
-    while (it != g_jsCallbackMap.end()) {
-        if (it->second.first->GetIdentifier() == frameId) {
-            // Pass current iterator and increment it after passing
-            // to the function, but before erase() is called, this 
-            // is important for it to work in a loop. You can't do this:
-            // | if (..) erase(it);
-            // | ++it;
-            // This would cause an infinite loop.
-            g_jsCallbackMap.erase(it++);
-            DebugLog("Renderer: RemoveJavascriptCallbacksForFrame(): " \
-                    "removed js callback from the map");
-        } else {
-            ++it;
+    // EraseJavascriptCallback() modifies the index, make a copy.
+    std::set<int> callbackIds = frameIt->second;
+    for (std::set<int>::iterator idIt = callbackIds.begin(); \
+            idIt != callbackIds.end(); ++idIt) {
+        JavascriptCallbackMap::iterator it = g_jsCallbackMap.find(*idIt);
+        if (it != g_jsCallbackMap.end()) {
+            EraseJavascriptCallback(it);
         }
     }
+    ScheduleJavascriptCallbackStats(frame->GetBrowser());
+    std::string logMessage = "Renderer: RemoveJavascriptCallbacksForFrame(): "
+            "removed js callbacks from the map, count=";
+    logMessage.append(AnyToString(callbackIds.size()));
+    DebugLog(logMessage.c_str());
+}
+
+void SetJavascriptCallbacksLimit(int limit) {
+    g_jsCallbacksLimit = limit;
+    EvictJavascriptCallbacks();
+}
+
+JavascriptCallbackStats GetJavascriptCallbackStats() {
+    JavascriptCallbackStats stats = g_jsCallbackStats;
+    stats.live = (int)g_jsCallbackMap.size();
+    return stats;
 }
@@ -10,4 +10,25 @@ CefString PutJavascriptCallback(
 
 bool ExecuteJavascriptCallback(int callbackId, CefRefPtr<CefListValue> args);
 
+// Called when the JavascriptCallback object in the Browser process
+// was released. Callbacks that were put multiple times (the same js
+// function passed to Python again) are reference counted.
+void ReleaseJavascriptCallback(int callbackId);
+
 void RemoveJavascriptCallbacksForFrame(CefRefPtr<CefFrame> frame);
+
+// Maximum number of live callbacks, least recently used callbacks
+// are evicted first. Zero means no limit. Set in OnRenderThreadCreated().
+void SetJavascriptCallbacksLimit(int limit);
+
+struct JavascriptCallbackStats {
+    int live;
+    int created;
+    int deduplicated;
+    int released;
+    int evicted;
+};
+
+// The stats of this Renderer process, they are also sent to the Browser
+// process with the "JavascriptCallbackStats" process message.
+JavascriptCallbackStats GetJavascriptCallbackStats();
@@ -4,59 +4,193 @@
 
 include "cefpython.pyx"
 
-g_taskMaxId = 0
-g_tasks = {}
+cdef int g_taskMaxId = 0
+# taskId -> PyTask
+cdef dict g_tasks = {}
+
+cdef class PyTask:
+    cdef object func
+    cdef list params
+    # None when the concurrent.futures module is not available.
+    cdef object future
+    # Tasks posted with PostTasks() run as a single CEF task,
+    # func is None then.
+    cdef list batch
+    cdef double created
+    # Whether an exception is also reported with sys.excepthook,
+    # False for ThreadExecutor tasks whose futures are always consumed.
+    cdef py_bool reportExceptions
 
 def PostTask(int threadId, object func, *args):
-    global g_tasks, g_taskMaxId
+    return PostDelayedTask(threadId, 0, func, *args)
 
-    # Validate threadId.
+def PostDelayedTask(int threadId, long long delayMs, object func, *args):
+    # Validate threadId. Renderer threads run in a different process,
+    # tasks can't be posted there.
     if threadId not in g_browserProcessThreads:
-        raise Exception("PoastTask failed: requires a browser process thread")
+        raise Exception("PostTask failed: requires a browser process thread")
 
     # Validate func.
     if not IsFunctionOrMethod(type(func)):
         raise Exception("PostTask failed: not a function nor method")
 
-    # Params.
-    cdef list params = list(args)
+    if delayMs < 0:
+        raise Exception("PostDelayedTask failed: delay must not be negative")
+
+    return PostPythonTask(threadId, func, list(args), delayMs)
+
+def PostTasks(int threadId, object tasks):
+    # tasks: iterable of (func, args) tuples.
+    cdef PyTask batchTask
+    cdef PyTask task
+    cdef list futures = []
+    if threadId not in g_browserProcessThreads:
+        raise Exception("PostTasks failed: requires a browser process thread")
+    batchTask = PyTask()
+    batchTask.batch = []
+    batchTask.created = time.time()
+    for (func, args) in tasks:
+        if not IsFunctionOrMethod(type(func)):
+            raise Exception("PostTasks failed: not a function nor method: "
+                    "%s" % func)
+        task = CreatePyTask(func, list(args))
+        batchTask.batch.append(task)
+        futures.append(task.future)
+    PutPyTask(threadId, batchTask, 0)
+    return futures
+
+cdef PyTask CreatePyTask(object func, list params,
+        py_bool reportExceptions=True):
+    cdef PyTask task = PyTask()
+    task.func = func
+    task.params = params
+    task.created = time.time()
+    task.reportExceptions = reportExceptions
+    if concurrent_futures:
+        task.future = concurrent_futures.Future()
+    return task
+
+cdef object PostPythonTask(int threadId, object func, list params,
+        long long delayMs=0, py_bool reportExceptions=True):
+    # No validation of func, used internally also for bound methods
+    # of extension types. Returns a future or None.
+    cdef PyTask task = CreatePyTask(func, params, reportExceptions)
+    PutPyTask(threadId, task, delayMs)
+    return task.future
+
+cdef void PutPyTask(int threadId, PyTask task, long long delayMs) except *:
+    global g_taskMaxId
 
-    # Keep func and params until PyTaskRunnable is called.
+    # Keep the task until PyTaskRunnable is called.
     g_taskMaxId += 1
-    g_tasks[str(g_taskMaxId)] = {
-        "func": func,
-        "params": params
-    }
+    cdef int cTaskId = g_taskMaxId
+    g_tasks[cTaskId] = task
 
     # Call C++ wrapper.
-    cdef int cTaskId = int(g_taskMaxId)
     with nogil:
-        PostTaskWrapper(threadId, cTaskId)
+        PostDelayedTaskWrapper(threadId, cTaskId, delayMs)
+    ScheduleMessagePumpWork()
 
 cdef public void PyTaskRunnable(int taskId) except * with gil:
-    cdef object func
-    cdef list params
-    cdef object task
+    cdef PyTask task
+    cdef PyTask batchItem
 
     try:
-        global g_tasks
-
         # Validate if task exist.
-        if str(taskId) not in g_tasks:
+        task = g_tasks.pop(taskId, None)
+        if task is None:
             raise Exception("PyTaskRunnable failed: invalid taskId=%s" \
                     % taskId)
 
-        # Fetch task: func and params.
-        task = g_tasks[str(taskId)]
-        func = task["func"]
-        params = task["params"]
-        del g_tasks[str(taskId)]
-
-        # Execute user func.
-        Debug("PyTaskRunnable: taskId=%s, func=%s" % (taskId, func.__name__))
-        func(*params)
+        if task.batch is None:
+            RunPyTask(taskId, task)
+            return
+        Debug("PyTaskRunnable: taskId=%s, batch of %s tasks" % (taskId,
+                len(task.batch)))
+        for batchItem in task.batch:
+            try:
+                RunPyTask(taskId, batchItem)
+            except:
+                # Without futures an exception in one task must not
+                # prevent the rest of the batch from running.
+                (exc_type, exc_value, exc_trace) = sys.exc_info()
+                sys.excepthook(exc_type, exc_value, exc_trace)
 
     except:
         (exc_type, exc_value, exc_trace) = sys.exc_info()
         sys.excepthook(exc_type, exc_value, exc_trace)
 
+cdef void RunPyTask(int taskId, PyTask task) except *:
+    cdef double traceStart
+    if g_cefpythonTracing:
+        traceStart = ProfilerClock()
+        try:
+            RunPyTaskUntraced(taskId, task)
+        finally:
+            TraceSpan(str(getattr(task.func, "__name__", task.func)),
+                    "task", traceStart, ProfilerClock() - traceStart,
+                    {"taskId": taskId})
+    else:
+        RunPyTaskUntraced(taskId, task)
+
+cdef void RunPyTaskUntraced(int taskId, PyTask task) except *:
+    cdef object returnValue
+
+    # Task cancelled with Future.cancel().
+    if task.future is not None \
+            and not task.future.set_running_or_notify_cancel():
+        Debug("PyTaskRunnable: task cancelled, taskId=%s" % taskId)
+        return
+
+    # Execute user func.
+    Debug("PyTaskRunnable: taskId=%s, func=%s" % (taskId,
+            getattr(task.func, "__name__", task.func)))
+    if task.future is None:
+        task.func(*task.params)
+        return
+    try:
+        returnValue = task.func(*task.params)
+    except:
+        (exc_type, exc_value, exc_trace) = sys.exc_info()
+        Debug("PyTaskRunnable: task raised an exception, taskId=%s" \
+                "\n%s" % (taskId, "".join(traceback.format_exception(
+                        exc_type, exc_value, exc_trace))))
+        task.future.set_exception(exc_value)
+        # Most callers never look at the future, do not lose the error.
+        if task.reportExceptions:
+            sys.excepthook(exc_type, exc_value, exc_trace)
+    else:
+        task.future.set_result(returnValue)
+
+class ThreadExecutor(concurrent_futures.Executor if concurrent_futures
+                     else object):
+    # Executor running functions on a CEF browser process thread,
+    # eg. ThreadExecutor(TID_IO).map(func, items).
+
+    def __init__(self, int threadId):
+        if not concurrent_futures:
+            raise Exception("ThreadExecutor failed: the concurrent.futures "
+                    "module is not available. On Python 2 install the "
+                    "\"futures\" package.")
+        if threadId not in g_browserProcessThreads:
+            raise Exception("ThreadExecutor failed: requires a browser "
+                    "process thread")
+        self.threadId = threadId
+        self.pendingFutures = set()
+        self.isShutdown = False
+
+    def submit(self, fn, *args, **kwargs):
+        if self.isShutdown:
+            raise RuntimeError("cannot schedule new futures after shutdown")
+        if kwargs:
+            fn = functools.partial(fn, **kwargs)
+        future = PostPythonTask(self.threadId, fn, list(args), 0, False)
+        self.pendingFutures.add(future)
+        future.add_done_callback(self.pendingFutures.discard)
+        return future
+
+    def shutdown(self, wait=True):
+        self.isShutdown = True
+        # Waiting on the executor's own thread would block the tasks.
+        if wait and not IsThread(self.threadId):
+            concurrent_futures.wait(list(self.pendingFutures))
@@ -0,0 +1,160 @@
+# Copyright (c) 2012-2014 The CEF Python authors. All rights reserved.
+# License: New BSD License.
+# Website: http://code.google.com/p/cefpython/
+
+# Background throttling of off-screen browsers. A browser that had
+# no input events (Browser.Send*Event) and no frame reads (PaintBuffer
+# GetString/GetIntPointer) for "idleTime" seconds gets its windowless
+# frame rate lowered, and after "hideTime" seconds it is hidden with
+# WasHidden(True), which also suspends its timers. The browser is
+# restored on the next input event or frame read. The policy is
+# checked periodically on the UI thread, see
+# EnableBackgroundThrottling().
+
+include "cefpython.pyx"
+
+DEF THROTTLE_ACTIVE = 0
+DEF THROTTLE_FRAME_RATE = 1
+DEF THROTTLE_HIDDEN = 2
+
+cdef py_bool g_backgroundThrottling = False
+cdef double g_throttleIdleTime = 10
+cdef double g_throttleHideTime = 0
+cdef int g_throttledFrameRate = 1
+cdef double g_throttleCheckInterval = 1
+# Incremented when throttling is enabled or disabled, a pending check
+# with a different id does nothing.
+cdef int g_throttleCheckId = 0
+
+cdef void MarkBrowserActivity(PyBrowser pyBrowser) except *:
+    # Called on input events and frame reads when throttling
+    # is enabled, on any thread.
+    pyBrowser.lastActivity = time.time()
+    if pyBrowser.throttleState != THROTTLE_ACTIVE:
+        if IsThread(TID_UI):
+            UnthrottleBrowser(pyBrowser)
+        elif not pyBrowser.unthrottlePending:
+            # At most one task per browser, e.g. for a stream of mouse
+            # move events. The flag is checked and set with the GIL held.
+            pyBrowser.unthrottlePending = True
+            PostPythonTask(TID_UI, RunUnthrottleBrowser, [pyBrowser])
+
+def RunUnthrottleBrowser(PyBrowser pyBrowser):
+    pyBrowser.unthrottlePending = False
+    if pyBrowser.GetIdentifier() in g_pyBrowsers:
+        UnthrottleBrowser(pyBrowser)
+
+cdef void ThrottleBrowser(PyBrowser pyBrowser, int state) except *:
+    cdef CefRefPtr[CefBrowserHost] cefBrowserHost = \
+            pyBrowser.GetCefBrowserHost()
+    if pyBrowser.throttleState == THROTTLE_ACTIVE:
+        pyBrowser.unthrottledFrameRate = \
+                cefBrowserHost.get().GetWindowlessFrameRate()
+        cefBrowserHost.get().SetWindowlessFrameRate(g_throttledFrameRate)
+    if state == THROTTLE_HIDDEN and not pyBrowser.hiddenByApp:
+        cefBrowserHost.get().WasHidden(True)
+    pyBrowser.throttleState = state
+    Debug("ThrottleBrowser(): browserId = %s, state = %s" % (
+            pyBrowser.GetIdentifier(), GetThrottleStateName(state)))
+
+cdef void UnthrottleBrowser(PyBrowser pyBrowser) except *:
+    cdef CefRefPtr[CefBrowserHost] cefBrowserHost
+    if pyBrowser.throttleState == THROTTLE_ACTIVE:
+        return
+    cefBrowserHost = pyBrowser.GetCefBrowserHost()
+    if pyBrowser.throttleState == THROTTLE_HIDDEN \
+            and not pyBrowser.hiddenByApp:
+        cefBrowserHost.get().WasHidden(False)
+    cefBrowserHost.get().SetWindowlessFrameRate(
+            pyBrowser.unthrottledFrameRate)
+    pyBrowser.throttleState = THROTTLE_ACTIVE
+    Debug("UnthrottleBrowser(): browserId = %s, frame rate = %s" % (
+            pyBrowser.GetIdentifier(), pyBrowser.unthrottledFrameRate))
+
+cdef py_string GetThrottleStateName(int state):
+    if state == THROTTLE_FRAME_RATE:
+        return "throttled"
+    if state == THROTTLE_HIDDEN:
+        return "hidden"
+    return "active"
+
+cdef dict GetBrowserThrottlingState(PyBrowser pyBrowser):
+    return {
+        "enabled": g_backgroundThrottling,
+        "state": GetThrottleStateName(pyBrowser.throttleState),
+        "idleTime": (time.time() - pyBrowser.lastActivity
+                if pyBrowser.lastActivity else 0),
+    }
+
+def RunThrottlingCheck(int checkId):
+    cdef PyBrowser pyBrowser
+    cdef double now
+    cdef double idleTime
+    cdef int state
+    if checkId != g_throttleCheckId:
+        # Disabled or enabled again.
+        return
+    now = time.time()
+    try:
+        for pyBrowser in list(g_pyBrowsers.values()):
+            if not pyBrowser.IsWindowRenderingDisabled():
+                continue
+            if not pyBrowser.lastActivity:
+                # Browser created since the last check.
+                pyBrowser.lastActivity = now
+            idleTime = now - pyBrowser.lastActivity
+            state = THROTTLE_ACTIVE
+            if g_throttleHideTime and idleTime >= g_throttleHideTime:
+                state = THROTTLE_HIDDEN
+            elif idleTime >= g_throttleIdleTime:
+                state = THROTTLE_FRAME_RATE
+            # Browsers are restored only by activity, see
+            # MarkBrowserActivity().
+            if state > pyBrowser.throttleState:
+                ThrottleBrowser(pyBrowser, state)
+    finally:
+        PostPythonTask(TID_UI, RunThrottlingCheck, [checkId],
+                <long long>(g_throttleCheckInterval * 1000))
+
+def EnableBackgroundThrottling(double idleTime=10.0,
+        int throttledFrameRate=1, double hideTime=0,
+        double checkInterval=1.0):
+    global g_backgroundThrottling, g_throttleIdleTime, g_throttleHideTime
+    global g_throttledFrameRate, g_throttleCheckInterval, g_throttleCheckId
+    if idleTime <= 0 or checkInterval <= 0:
+        raise Exception("EnableBackgroundThrottling() failed: idleTime "
+                "and checkInterval must be positive")
+    if not 1 <= throttledFrameRate <= 60:
+        raise Exception("EnableBackgroundThrottling() failed: "
+                "throttledFrameRate must be between 1 and 60")
+    g_throttleIdleTime = idleTime
+    g_throttleHideTime = hideTime
+    g_throttledFrameRate = throttledFrameRate
+    g_throttleCheckInterval = checkInterval
+    g_backgroundThrottling = True
+    g_throttleCheckId += 1
+    PostPythonTask(TID_UI, RunThrottlingCheck, [g_throttleCheckId],
+            <long long>(checkInterval * 1000))
+    Debug("EnableBackgroundThrottling(): idleTime = %s, hideTime = %s, "
+            "throttledFrameRate = %s" % (idleTime, hideTime,
+                    throttledFrameRate))
+
+def DisableBackgroundThrottling():
+    # Restores all throttled browsers.
+    global g_backgroundThrottling, g_throttleCheckId
+    cdef PyBrowser pyBrowser
+    if not g_backgroundThrottling:
+        return
+    if IsMultiThreadedMessageLoop() and not IsThread(TID_UI):
+        CallOnUiThread("DisableBackgroundThrottling()",
+                DisableBackgroundThrottling, ())
+        return
+    g_backgroundThrottling = False
+    g_throttleCheckId += 1
+    for pyBrowser in list(g_pyBrowsers.values()):
+        UnthrottleBrowser(pyBrowser)
+        pyBrowser.lastActivity = 0
+    Debug("DisableBackgroundThrottling()")
+
+def IsBackgroundThrottlingEnabled():
+    return g_backgroundThrottling
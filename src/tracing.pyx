@@ -0,0 +1,195 @@
+# Copyright (c) 2012-2014 The CEF Python authors. All rights reserved.
+# License: New BSD License.
+# Website: http://code.google.com/p/cefpython/
+
+# Tracing of CEF Python activity in the Chrome trace event format,
+# the file can be loaded in chrome://tracing or Perfetto. Recorded:
+# MessageLoopWork() calls, Python callbacks (wrapped the same way as
+# for profiling, see profiler.pyx), tasks and process messages. Events
+# are serialized and written to the file by a background thread.
+
+include "cefpython.pyx"
+
+# noinspection PyUnresolvedReferences
+import threading
+
+if sys.version_info.major == 2:
+    # noinspection PyUnresolvedReferences
+    import Queue as queue
+    # noinspection PyUnresolvedReferences
+    from thread import get_ident as GetThreadIdent
+else:
+    # noinspection PyUnresolvedReferences
+    import queue
+    # noinspection PyUnresolvedReferences
+    from threading import get_ident as GetThreadIdent
+
+# Read in ClientHandler::OnProcessMessageReceived() without acquiring
+# the GIL, to not call Python for each message when not tracing.
+cdef public int g_cefpythonTracing = 0
+cdef object g_traceWriter = None
+# Thread idents for which the "thread_name" metadata event was written.
+cdef set g_tracedThreads = set()
+
+class TraceWriter(threading.Thread):
+
+    def __init__(self, path):
+        threading.Thread.__init__(self, name="CefPythonTraceWriter")
+        self.daemon = True
+        self.path = path
+        self.events = queue.Queue()
+        self.file = open(path, "w")
+
+    def run(self):
+        first = True
+        self.file.write("[\n")
+        while True:
+            event = self.events.get()
+            if event is None:
+                break
+            if not first:
+                self.file.write(",\n")
+            first = False
+            self.file.write(json.dumps(event))
+        self.file.write("\n]\n")
+        self.file.close()
+
+cdef void AddTraceEvent(dict event) except *:
+    # StopTracing() may be called on another thread after the caller
+    # checked g_cefpythonTracing, events are then dropped.
+    cdef object traceWriter = g_traceWriter
+    cdef long threadIdent = GetThreadIdent()
+    if traceWriter is None:
+        return
+    event["pid"] = os.getpid()
+    event["tid"] = threadIdent
+    if threadIdent not in g_tracedThreads:
+        g_tracedThreads.add(threadIdent)
+        traceWriter.events.put({
+            "name": "thread_name", "ph": "M", "pid": event["pid"],
+            "tid": threadIdent, "args": {"name": GetTraceThreadName()},
+        })
+    traceWriter.events.put(event)
+
+cdef py_string GetTraceThreadName():
+    if IsThread(TID_UI):
+        return "CEF UI thread"
+    if IsThread(TID_IO):
+        return "CEF IO thread"
+    if IsThread(TID_FILE):
+        return "CEF FILE thread"
+    return threading.current_thread().name
+
+cdef void TraceSpan(py_string name, py_string category, double start,
+        double duration, dict args=None) except *:
+    # start and duration in seconds, as returned by ProfilerClock().
+    cdef dict event = {
+        "name": name,
+        "cat": category,
+        "ph": "X",
+        "ts": start * 1000000,
+        "dur": duration * 1000000,
+    }
+    if args:
+        event["args"] = args
+    AddTraceEvent(event)
+
+cdef void TraceInstant(py_string name, py_string category,
+        dict args=None) except *:
+    cdef dict event = {
+        "name": name,
+        "cat": category,
+        "ph": "i",
+        "s": "t",
+        "ts": ProfilerClock() * 1000000,
+    }
+    if args:
+        event["args"] = args
+    AddTraceEvent(event)
+
+cdef size_t GetCefListValueSize(CefRefPtr[CefListValue] cefList) except *:
+    # Approximate payload size in bytes, strings are counted in UTF-8.
+    cdef size_t size = 0
+    cdef int index
+    cdef cef_types.cef_value_type_t valueType
+    for index in range(cefList.get().GetSize()):
+        valueType = cefList.get().GetType(index)
+        if valueType == cef_types.VTYPE_STRING:
+            size += cefList.get().GetString(index).ToString().size()
+        elif valueType == cef_types.VTYPE_BINARY:
+            size += cefList.get().GetBinary(index).get().GetSize()
+        elif valueType == cef_types.VTYPE_LIST:
+            size += GetCefListValueSize(cefList.get().GetList(index))
+        elif valueType == cef_types.VTYPE_DICTIONARY:
+            size += GetCefDictionaryValueSize(
+                    cefList.get().GetDictionary(index))
+        else:
+            size += 8
+    return size
+
+cdef size_t GetCefDictionaryValueSize(
+        CefRefPtr[CefDictionaryValue] cefDict) except *:
+    cdef size_t size = 0
+    cdef cpp_vector[CefString] keys
+    cdef size_t i
+    cdef cef_types.cef_value_type_t valueType
+    cefDict.get().GetKeys(keys)
+    for i in range(keys.size()):
+        size += keys[i].ToString().size()
+        valueType = cefDict.get().GetType(keys[i])
+        if valueType == cef_types.VTYPE_STRING:
+            size += cefDict.get().GetString(keys[i]).ToString().size()
+        elif valueType == cef_types.VTYPE_BINARY:
+            size += cefDict.get().GetBinary(keys[i]).get().GetSize()
+        elif valueType == cef_types.VTYPE_LIST:
+            size += GetCefListValueSize(cefDict.get().GetList(keys[i]))
+        elif valueType == cef_types.VTYPE_DICTIONARY:
+            size += GetCefDictionaryValueSize(
+                    cefDict.get().GetDictionary(keys[i]))
+        else:
+            size += 8
+    return size
+
+cdef void TraceProcessMessage(py_string eventName,
+        CefRefPtr[CefProcessMessage] message) except *:
+    TraceInstant(eventName, "ipc", {
+        "name": CefToPyString(message.get().GetName()),
+        "size": GetCefListValueSize(message.get().GetArgumentList()),
+    })
+
+cdef public void Tracing_OnProcessMessageReceived(
+        CefRefPtr[CefProcessMessage] message
+        ) except * with gil:
+    try:
+        if g_cefpythonTracing:
+            TraceProcessMessage("OnProcessMessageReceived", message)
+    except:
+        (exc_type, exc_value, exc_trace) = sys.exc_info()
+        sys.excepthook(exc_type, exc_value, exc_trace)
+
+def StartTracing(py_string path):
+    global g_cefpythonTracing, g_traceWriter
+    if g_cefpythonTracing:
+        raise Exception("StartTracing() failed: tracing already started")
+    g_traceWriter = TraceWriter(path)
+    g_traceWriter.start()
+    g_tracedThreads.clear()
+    g_cefpythonTracing = 1
+    # Wrap client callbacks of existing browsers.
+    RebuildClientCallbackSlots()
+    Debug("StartTracing(): %s" % path)
+
+def StopTracing():
+    global g_cefpythonTracing, g_traceWriter
+    cdef object traceWriter = g_traceWriter
+    if not g_cefpythonTracing:
+        return
+    g_cefpythonTracing = 0
+    g_traceWriter = None
+    RebuildClientCallbackSlots()
+    traceWriter.events.put(None)
+    traceWriter.join()
+    Debug("StopTracing(): %s" % traceWriter.path)
+
+def IsTracing():
+    return bool(g_cefpythonTracing)
@@ -42,17 +42,11 @@ cpdef py_bool IsThread(int threadID):
 #       This change is required to work with Cython 0.20.
 
 cpdef object Debug(str msg):
+    # Messages are written by a background thread, see log_buffer.pyx.
     if not g_debug:
         return
-    msg = "[CEF Python] "+str(msg)
-    print(msg)
-    if g_debugFile:
-        try:
-            with open(g_debugFile, "a") as file_:
-                file_.write(msg+"\n")
-        except:
-            print("[CEF Python] WARNING: failed writing to debug file: %s" % (
-                    g_debugFile))
+    msg = str(msg)
+    LogMessage(GetMessageLogLevel(msg), "cefpython", msg)
 
 
 cpdef str GetSystemError():
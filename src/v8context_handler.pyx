@@ -23,7 +23,7 @@ cdef public void V8ContextHandler_OnContextCreated(
         pyBrowser.SetUserData("__v8ContextCreated", True)
         pyFrame = GetPyFrame(cefFrame)
         # User defined callback.
-        clientCallback = pyBrowser.GetClientCallback("OnContextCreated")
+        clientCallback = pyBrowser.clientCallbackSlots[CB_OnContextCreated]
         if clientCallback:
             clientCallback(pyBrowser, pyFrame)
     except:
@@ -50,7 +50,8 @@ cdef public void V8ContextHandler_OnContextReleased(
         pyBrowser = GetPyBrowserById(browserId)
         pyFrame = GetPyFrameById(browserId, frameId)
         if pyBrowser and pyFrame:
-            clientCallback = pyBrowser.GetClientCallback("OnContextReleased")
+            clientCallback = pyBrowser.clientCallbackSlots[
+                    CB_OnContextReleased]
             if clientCallback:
                 clientCallback(pyBrowser, pyFrame)
         else:
@@ -60,6 +61,8 @@ cdef public void V8ContextHandler_OnContextReleased(
             if not pyFrame:
                 Debug("V8ContextHandler_OnContextReleased() WARNING: "
                         "pyFrame not found")
+        RejectJavascriptEvaluations(browserId, frameId,
+                "frame's context was released")
         RemovePyFrame(browserId, frameId)
     except:
         (exc_type, exc_value, exc_trace) = sys.exc_info()
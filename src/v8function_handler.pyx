@@ -4,6 +4,16 @@
 
 include "cefpython.pyx"
 
+def CallFunctionFromJavascript(object function, py_string functionName,
+        list functionArguments):
+    # Used for javascript bindings and python callbacks, may run on
+    # the application thread, see DispatchClientCallback().
+    cdef object returnValue = function(*functionArguments)
+    if returnValue is not None:
+        Debug("CallFunctionFromJavascript() WARNING: function returned " \
+                "value, but returning values to javascript is not " \
+                "supported, functionName=%s" % functionName)
+
 cdef public void V8FunctionHandler_Execute(
         CefRefPtr[CefBrowser] cefBrowser,
         CefRefPtr[CefFrame] cefFrame,
@@ -15,7 +25,6 @@ cdef public void V8FunctionHandler_Execute(
     cdef py_string functionName
     cdef object function
     cdef list functionArguments
-    cdef object returnValue
     cdef py_string jsErrorMessage
     try:
         pyBrowser = GetPyBrowser(cefBrowser)
@@ -38,11 +47,10 @@ cdef public void V8FunctionHandler_Execute(
             return
         functionArguments = CefListValueToPyList(cefBrowser, 
                 cefFunctionArguments)
-        returnValue = function(*functionArguments)
-        if returnValue is not None:
-            Debug("V8FunctionHandler_Execute() WARNING: function returned" \
-                    "value, but returning values to javascript is not " \
-                    "supported, functionName=%s" % functionName)
+        DispatchClientCallback(CallFunctionFromJavascript,
+                (ProfileCallback(function, functionName,
+                        "JavascriptBindings"),
+                 functionName, functionArguments))
     except:
         (exc_type, exc_value, exc_trace) = sys.exc_info()
         sys.excepthook(exc_type, exc_value, exc_trace)
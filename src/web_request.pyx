@@ -71,11 +71,13 @@ cdef class PyWebRequest:
     cdef int webRequestId
     cdef CefRefPtr[CefURLRequest] cefWebRequest
     cdef object pyWebRequestClient
+    cdef double created
 
     def __init__(self, PyRequest pyRequest, object pyWebRequestClient):
-        global g_webRequestMaxId
+        global g_webRequestMaxId, g_webRequestsInFlight
         g_webRequestMaxId += 1
         self.webRequestId = g_webRequestMaxId
+        self.created = time.time()
         cdef CefRefPtr[WebRequestClient] cppWebRequestClient = (
                 <CefRefPtr[WebRequestClient]?>new WebRequestClient(
                         self.webRequestId))
@@ -84,11 +86,13 @@ cdef class PyWebRequest:
                 pyRequest.cefRequest,
                 <CefRefPtr[CefURLRequestClient]?>cppWebRequestClient,
                 <CefRefPtr[CefRequestContext]?>NULL))
+        g_webRequestsInFlight += 1
 
     cdef object GetCallback(self, str funcName):
         if hasattr(self.pyWebRequestClient, funcName) and (
                 callable(getattr(self.pyWebRequestClient, funcName))):
-            return getattr(self.pyWebRequestClient, funcName)
+            return ProfileCallback(getattr(self.pyWebRequestClient,
+                    funcName), funcName, "WebRequestClient")
 
     cpdef PyRequest GetRequest(self):
         cdef CefRefPtr[CefRequest] cefRequest = \
@@ -179,7 +183,9 @@ cdef public void WebRequestClient_OnRequestComplete(
         ) except * with gil:
     cdef PyWebRequest webRequest
     cdef object userCallback
+    global g_webRequestsInFlight
     try:
+        g_webRequestsInFlight -= 1
         webRequest = GetPyWebRequest(webRequestId)
         if webRequest:
             userCallback = webRequest.GetCallback("OnRequestComplete")
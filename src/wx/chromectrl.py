@@ -19,19 +19,29 @@ def Debug(msg):
 
 #-------------------------------------------------------------------------------
 
-# Default timer interval when timer used to service CEF message loop
+# Default timer interval when timer used to service CEF message loop.
+# With adaptiveTimer=True it is the maximum interval when CEF is idle,
+# see cefpython.InstallMessagePump().
 DEFAULT_TIMER_MILLIS = 10
 
-# A global timer for CEF message loop processing.
+# A global timer or message pump for CEF message loop processing.
 g_messageLoopTimer = None
 
-def CreateMessageLoopTimer(timerMillis):
+def CreateMessageLoopTimer(timerMillis, adaptiveTimer=False):
     # This function gets called multiple times for each ChromeWindow
-    # instance.
+    # instance, the first call decides the kind of timer.
     global g_messageLoopTimer
     Debug("CreateMesageLoopTimer")
     if g_messageLoopTimer:
         return
+    if cefpython.GetAppSetting("multi_threaded_message_loop"):
+        # CEF runs its own message loop in a separate thread.
+        return
+    if adaptiveTimer:
+        maxInterval = max(timerMillis, 1) / 1000.0
+        g_messageLoopTimer = cefpython.InstallMessagePump("wx",
+                maxInterval=maxInterval)
+        return
     g_messageLoopTimer = wx.Timer()
     g_messageLoopTimer.Start(timerMillis)
     Debug("g_messageLoopTimer.GetId() = "\
@@ -45,9 +55,12 @@ def MessageLoopTimer(event):
 def DestroyMessageLoopTimer():
     global g_messageLoopTimer
     Debug("DestroyMessageLoopTimer")
-    if g_messageLoopTimer:
+    if isinstance(g_messageLoopTimer, wx.Timer):
         g_messageLoopTimer.Stop()
         g_messageLoopTimer = None
+    elif g_messageLoopTimer:
+        g_messageLoopTimer.Uninstall()
+        g_messageLoopTimer = None
     else:
         # There was no browser created during session.
         Debug("DestroyMessageLoopTimer: timer not started")
@@ -130,6 +143,9 @@ class ChromeWindow(wx.Window):
     def __init__(self, parent, url="", useTimer=True,
                  timerMillis=DEFAULT_TIMER_MILLIS, browserSettings=None,
                  size=(-1, -1), *args, **kwargs):
+        # Keyword only, so that wx arguments passed positionally
+        # are not bound to it.
+        adaptiveTimer = kwargs.pop("adaptiveTimer", False)
         wx.Window.__init__(self, parent, id=wx.ID_ANY, size=size,
                            *args, **kwargs)
 
@@ -172,7 +188,7 @@ class ChromeWindow(wx.Window):
 
         self._useTimer = useTimer
         if useTimer:
-            CreateMessageLoopTimer(timerMillis)
+            CreateMessageLoopTimer(timerMillis, adaptiveTimer)
         else:
             # Currently multiple EVT_IDLE events might be registered
             # when creating multiple ChromeWindow instances. This will
@@ -238,14 +254,14 @@ class ChromeWindow(wx.Window):
 class ChromeCtrl(wx.Panel):
     def __init__(self, parent, url="", useTimer=True,
                  timerMillis=DEFAULT_TIMER_MILLIS,
-                 browserSettings=None, hasNavBar=True,
-                 *args, **kwargs):
+                 browserSettings=None, hasNavBar=True, *args, **kwargs):
+        adaptiveTimer = kwargs.pop("adaptiveTimer", False)
         # You also have to set the wx.WANTS_CHARS style for
         # all parent panels/controls, if it's deeply embedded.
         wx.Panel.__init__(self, parent, style=wx.WANTS_CHARS, *args, **kwargs)
 
         self.chromeWindow = ChromeWindow(self, url=str(url), useTimer=useTimer,
-                browserSettings=browserSettings)
+                browserSettings=browserSettings, adaptiveTimer=adaptiveTimer)
         sizer = wx.BoxSizer(wx.VERTICAL)
         self.navigationBar = None
         if hasNavBar: